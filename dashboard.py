@@ -2,33 +2,34 @@
 # -------------------------------------------------------
 # Fitur:
 # - Latar Belakang, Pertanyaan Bisnis, Visualisasi lengkap, Kesimpulan otomatis
-# - Membaca data lokal: data/usage.csv, data/winrate.csv, data/ngrams.csv
+# - Membaca data lokal: data/usage.csv, data/winrate.csv, data/ngrams.csv (+ opsional data/battles.csv)
+#   atau keluaran pipeline ekspor: data/usage.parquet/ (berpartisi), data/battles.parquet
 # - Filter: rentang tanggal, Top-N model, pilih topik, dan opsi stopwords n-gram
 # - Grafik interaktif (Plotly): bar/line/histogram/error bars/heatmap
-# - Robust: aman jika sebagian file tidak tersedia (bisa upload manual)
+# - Robust: aman jika sebagian file tidak tersedia (bisa upload manual; unggahan
+#   dibaca per chunk dengan progress, divalidasi, dibatasi ukurannya, dan di-cache per isi)
+# - Artefak turunan (rollup, topik, indeks n-gram, tabel duel) di-cache di data/cache/
+#   berkunci hash isi data + konfigurasi, jadi restart worker tetap cache hit
+# - Panel "Performance" opsional (sidebar): waktu/memori/hit-miss cache per tahap;
+#   LLM_ANALYTICS_PERF_LOG=<berkas.jsonl|-> menulis span sebagai log JSON per baris
+# - Start cepat: judul & placeholder KPI tampil sebelum data dimuat, plotly diimpor
+#   saat dibutuhkan, indeks n-gram/tabel duel dipanaskan di latar belakang
+#   (LLM_ANALYTICS_WARM=0 mematikan pemanasan)
 #
 # Struktur data yang diharapkan:
 # usage.csv   -> columns: date, model, user_text, topic, tts, is_solved, fit_score
 # winrate.csv -> columns: model, wins, apps, win_rate, wr_lo, wr_hi
 # ngrams.csv  -> columns: term, freq
+# battles.csv -> columns: date, model_a, model_b, winner (model_a/model_b/tie), topic
 
 from __future__ import annotations
 import os
-import io
-import re
-from math import sqrt
+import json
+from importlib.util import find_spec
 from pathlib import Path
-from typing import Tuple, Optional, Dict, Any, List
-
-import numpy as np
-import pandas as pd
-import streamlit as st
-import plotly.express as px
-import plotly.graph_objects as go
+from typing import Tuple, Optional, Dict, Any, List, Callable
 
 # ---- imports & dependency guard ----
-from pathlib import Path
-
 import streamlit as st
 
 # Tampilkan error yang ramah jika ada modul yang hilang
@@ -41,11 +42,9 @@ try:
     import numpy as np
 except Exception as e:
     missing.append(("numpy", str(e)))
-try:
-    import plotly.express as px
-    import plotly.graph_objects as go
-except Exception as e:
-    missing.append(("plotly", str(e)))
+# plotly baru diimpor saat chart pertama dibangun (llm_analytics.figures); di sini cukup dicek ada
+if find_spec("plotly") is None:
+    missing.append(("plotly", "No module named 'plotly'"))
 
 if missing:
     st.set_page_config(page_title="Dashboard Analisis LLMs", page_icon="🤖", layout="wide")
@@ -63,11 +62,31 @@ if missing:
     )
     st.stop()
 
-# Lanjutkan import standar setelah guard
-from __future__ import annotations
-import os, io, re
-from math import sqrt
-from typing import Tuple, Optional, Dict, Any, List
+from llm_analytics.figures import build_payload, payload_figure, preload as preload_figures
+from llm_analytics.cache import ArtifactCache, config_digest, derivation_config, file_digest
+from llm_analytics.fit import MIN_N_LEADER, ROUTE_ANY, ROUTING_FILE
+from llm_analytics.ingest import (
+    USAGE_VIEW_COLUMNS,
+    ensure_ngrams_schema,
+    ensure_usage_schema,
+    ensure_winrate_schema,
+    read_table,
+    resolve_source,
+    source_fingerprint,
+)
+from llm_analytics.models import add_model_title, load_aliases, model_title
+from llm_analytics.ngram_index import NgramIndex, build_ngram_index
+from llm_analytics.ngrams import sanitize_terms
+from llm_analytics.query import Query, Selection, select
+from llm_analytics.rollup import RollupCube, build_rollup
+from llm_analytics.perf import Recorder, add_log_handler, rss_bytes, span, traced
+from llm_analytics.shared import SharedUsage, shared_usage
+from llm_analytics.stream import UsageStream
+from llm_analytics.topics import KeywordCache, TopicClassifier, load_rules, rules_fingerprint
+from llm_analytics.stats import wilson_ci  # noqa: F401  (re-export untuk kompatibilitas)
+from llm_analytics.upload import UploadCache, UploadLimits, upload_digest
+from llm_analytics.warm import Warmer
+from llm_analytics.winrate import BattleTable, build_battle_table
 
 # ----------------------- Konfigurasi Halaman -----------------------
 st.set_page_config(
@@ -97,6 +116,22 @@ DATA_DIR = APP_DIR / "data"
 USAGE_CSV = DATA_DIR / "usage.csv"
 WINRATE_CSV = DATA_DIR / "winrate.csv"
 NGRAMS_CSV = DATA_DIR / "ngrams.csv"
+BATTLES_CSV = DATA_DIR / "battles.csv"
+MODEL_ALIASES_JSON = DATA_DIR / "model_aliases.json"
+USAGE_PARTS_DIR = DATA_DIR / "usage_parts"
+TOPIC_RULES_JSON = DATA_DIR / "topic_rules.json"
+ROUTING_ARROW = DATA_DIR / ROUTING_FILE
+ARTIFACT_DIR = DATA_DIR / "cache"
+ARTIFACT_MAX_BYTES = 2 << 30
+# Log span performa (JSON per baris) ke berkas ini, atau "-" untuk stderr
+PERF_LOG = os.environ.get("LLM_ANALYTICS_PERF_LOG")
+# Pemanasan latar belakang (impor plotly, indeks n-gram, tabel duel); "0" = matikan
+WARM = os.environ.get("LLM_ANALYTICS_WARM", "1") != "0"
+# Batas unggahan: berkas > MB ditolak, > baris diambil sampel acak
+UPLOAD_LIMITS = UploadLimits(
+    max_bytes=int(os.environ.get("LLM_ANALYTICS_UPLOAD_MAX_MB", 200)) << 20,
+    max_rows=int(os.environ.get("LLM_ANALYTICS_UPLOAD_MAX_ROWS", 2_000_000)),
+)
 
 # ----------------------- Utilitas -----------------------
 STOPWORDS_EN_ID = {
@@ -110,88 +145,135 @@ STOPWORDS_EN_ID = {
     "saya","dia","itu","ini","bisa","tidak","iya","dan","atau","jadi","agar","karena","kalau","sehingga"
 }
 
-def wilson_ci(wins: float, n: float, z: float = 1.96) -> Tuple[float, float, float]:
-    """Mengembalikan (p_hat, lo, hi) Wilson 95% CI."""
-    if n <= 0:
-        return np.nan, np.nan, np.nan
-    p = wins / n
-    denom = 1 + z**2/n
-    centre = p + z*z/(2*n)
-    adj = z * np.sqrt((p*(1-p) + z*z/(4*n))/n)
-    lo = max(0.0, (centre - adj)/denom)
-    hi = min(1.0, (centre + adj)/denom)
-    return p, lo, hi
-
-@st.cache_data(show_spinner=False)
-def load_csv(path: Path) -> Optional[pd.DataFrame]:
+@st.cache_resource(show_spinner=False)
+def artifact_cache() -> ArtifactCache:
+    """Cache artefak di disk (data/cache/), dibagi antar sesi, worker, dan notebook."""
+    return ArtifactCache(ARTIFACT_DIR, max_bytes=ARTIFACT_MAX_BYTES)
+
+@traced(st.cache_data(show_spinner=False), name=lambda fp, path: f"dataset_digest:{Path(path).name}")
+def dataset_digest(fingerprint: str, path: Path) -> str:
+    """Digest isi sumber data/<nama>.*; dihitung ulang hanya bila fingerprint (mtime/ukuran) berubah."""
+    # CSV asli bila ada (sidecar bertipe yang dibuat belakangan tidak mengubah digest)
+    src = path if path.exists() else resolve_source(path)
+    return f"{path.stem}:{file_digest(src)}" if src is not None else fingerprint
+
+@traced(st.cache_data(show_spinner=False), name=lambda path, *a, **k: f"load_csv:{Path(path).name}")
+def load_csv(path: Path, version: str, columns: Optional[Tuple[str, ...]] = None) -> Optional[pd.DataFrame]:
+    """Muat data/<nama>.csv secara bertipe (Parquet/Feather/sidecar bila ada); `version` = fingerprint sumber."""
     try:
-        if path.exists():
-            return pd.read_csv(path)
-        return None
+        return read_table(path, kind=path.stem, columns=columns)
     except Exception as e:
         st.warning(f"Gagal membaca {path.name}: {e}")
         return None
 
-def ensure_usage_schema(df: pd.DataFrame) -> pd.DataFrame:
-    """Normalisasi tipe kolom usage.csv."""
-    if df is None or df.empty:
-        return pd.DataFrame(columns=["date","model","user_text","topic","tts","is_solved","fit_score"])
-    # Date
-    if "date" in df.columns:
-        df["date"] = pd.to_datetime(df["date"], errors="coerce")
-    else:
-        df["date"] = pd.NaT
-    # Model
-    if "model" not in df.columns:
-        df["model"] = "unknown"
-    df["model"] = df["model"].astype(str)
-    # Topic
-    if "topic" not in df.columns:
-        df["topic"] = "Lainnya"
-    df["topic"] = df["topic"].fillna("Lainnya").astype(str)
-    # TTS
-    if "tts" in df.columns:
-        df["tts"] = pd.to_numeric(df["tts"], errors="coerce")
-    else:
-        df["tts"] = np.nan
-    # is_solved
-    if "is_solved" in df.columns:
-        df["is_solved"] = pd.to_numeric(df["is_solved"], errors="coerce").round().astype("Int64")
-    else:
-        df["is_solved"] = pd.array([None]*len(df), dtype="Int64")
-    # fit_score
-    if "fit_score" in df.columns:
-        df["fit_score"] = pd.to_numeric(df["fit_score"], errors="coerce")
-    else:
-        df["fit_score"] = np.nan
-    return df
-
-def ensure_winrate_schema(df: pd.DataFrame) -> pd.DataFrame:
-    if df is None or df.empty:
-        return pd.DataFrame(columns=["model","wins","apps","win_rate","wr_lo","wr_hi"])
-    for c in ["wins","apps","win_rate","wr_lo","wr_hi"]:
-        if c in df.columns:
-            df[c] = pd.to_numeric(df[c], errors="coerce")
-    if "win_rate" not in df.columns and {"wins","apps"}.issubset(df.columns):
-        p, lo, hi = zip(*[wilson_ci(w, n) for w, n in df[["wins","apps"]].fillna(0).to_numpy()])
-        df["win_rate"], df["wr_lo"], df["wr_hi"] = p, lo, hi
-    return df
-
-def sanitize_terms(df: pd.DataFrame, use_stopwords: bool, top_k: int) -> pd.DataFrame:
-    if df is None or df.empty:
-        return pd.DataFrame(columns=["term","freq"])
-    work = df.copy()
-    work["term"] = work["term"].astype(str)
-    if use_stopwords:
-        work = work[~work["term"].str.lower().isin(STOPWORDS_EN_ID)]
-    work = work.sort_values("freq", ascending=False).head(top_k)
-    return work
-
-def model_title(s: str) -> str:
-    s = str(s)
-    s = s.replace("gpt-3.5-turbo-0613", "gpt-3.5").replace("gpt-4-0314", "gpt-4")
-    s = re.sub(r"-\d{4,}$", "", s)
-    return s
+@st.cache_resource(show_spinner=False)
+def upload_cache() -> UploadCache:
+    """Hasil parse berkas unggahan per digest isi (dibagi antar rerun & sesi)."""
+    return UploadCache()
+
+def upload_version(file) -> str:
+    """"upload:<digest isi>"; berkas di-hash sekali per unggahan (file_id) per sesi."""
+    memo = st.session_state.setdefault("upload_digests", {})
+    if file.file_id not in memo:
+        memo[file.file_id] = "upload:" + upload_digest(file.getvalue())
+    return memo[file.file_id]
+
+def parse_upload(file, kind: str) -> Optional[str]:
+    """Parse unggahan `kind` per chunk (progress bar saat pertama kali); kembalikan versi, None bila ditolak."""
+    version = upload_version(file)
+    cache = upload_cache()
+    item = cache.get(version)
+    if item is None:
+        bar = st.progress(0.0, f"Membaca {file.name}…")
+        with span(f"upload:{kind}"):
+            item = cache.parse(version, file, kind, UPLOAD_LIMITS, progress=lambda f, msg: bar.progress(f, f"{file.name}: {msg}"))
+        bar.empty()
+    if item.error:
+        st.sidebar.error(f"{file.name}: {item.error}")
+        return None
+    rep = item.report
+    notes = [f"{rep.rows:,} baris"]
+    if rep.sampled:
+        notes.append(f"sampel acak {rep.sample_fraction:.1%} dari {rep.rows_read:,} baris (angka = estimasi)")
+    if rep.invalid:
+        notes.append("nilai tak valid dikosongkan: " + ", ".join(f"{c} ({n:,})" for c, n in rep.invalid.items()))
+    if rep.ignored_columns:
+        notes.append("kolom diabaikan: " + ", ".join(rep.ignored_columns))
+    (st.sidebar.warning if rep.sampled else st.sidebar.caption)(f"{file.name}: " + " • ".join(notes))
+    return version
+
+@traced(st.cache_resource(show_spinner=False, max_entries=4))
+def load_usage(version: str, _load: Callable[[], Optional[pd.DataFrame]]) -> SharedUsage:
+    """usage bertipe (+ topik ulang, model_title) SEKALI per proses & versi, dibagi semua sesi.
+
+    Frame read-only di-memory-map dari data/cache/*.arrow: sesi tidak memegang salinan,
+    dan restart worker hanya memetakan ulang berkas.
+    """
+    def build() -> pd.DataFrame:
+        with span("read:usage"):
+            raw = _load()
+        with span("normalize:usage"):
+            df = ensure_usage_schema(raw)
+        if rules_key and "user_text" in df.columns and df["user_text"].notna().any():
+            # Setelah aturan berubah hanya kata kunci baru yang dipindai (KeywordCache)
+            with span("normalize:topics"):
+                classifier = TopicClassifier(json.loads(rules_key), cache=topic_cache())
+                df["topic"] = classifier.classify(df["user_text"]).astype("category")
+        with span("normalize:model_title"):
+            return add_model_title(df, model_aliases)
+    return shared_usage(artifact_cache(), ArtifactCache.key("usage", version, derive_key), build)
+
+@traced(st.cache_resource(show_spinner=False, max_entries=4))
+def load_rollup(version: str, _usage: pd.DataFrame) -> RollupCube:
+    """Rollup cube per versi dataset (frame `_usage` tidak ikut di-hash; objek dibagi antar sesi)."""
+    key = ArtifactCache.key("rollup", version, derive_key)
+    return artifact_cache().get_or_compute(key, lambda: build_rollup(_usage))
+
+@st.cache_resource(show_spinner=False)
+def topic_cache() -> KeywordCache:
+    """Hasil pindaian kata kunci topik per hash teks (dibagi antar sesi & versi aturan)."""
+    return KeywordCache()
+
+@st.cache_resource(show_spinner=False)
+def usage_stream(source: Path, aliases_key: str, rules_key: Optional[str] = None) -> UsageStream:
+    """Satu cube berjalan per proses & sumber (dibagi antar sesi)."""
+    classifier = TopicClassifier(json.loads(rules_key), cache=topic_cache()) if rules_key else None
+    return UsageStream(source, aliases=json.loads(aliases_key), classifier=classifier)
+
+@st.cache_resource(show_spinner=False)
+def warmer() -> Warmer:
+    """Antrean pemanasan per proses; loader di bawah mengambil hasilnya lewat `get`."""
+    return Warmer(enabled=WARM)
+
+# Builder artefak tanpa API Streamlit: dipanggil loader ter-cache atau thread pemanasan
+def ngram_index_artifact(store: ArtifactCache, version: str, usage: pd.DataFrame, texts: Optional[pd.Series]) -> Optional[NgramIndex]:
+    def compute() -> Optional[NgramIndex]:
+        t = texts
+        if t is None:
+            t = read_table(USAGE_CSV, kind="usage", columns=("user_text",)).get("user_text")
+        if t is None or len(t) != len(usage) or not t.notna().any():
+            return None
+        return build_ngram_index(usage, texts=t)
+    return store.get_or_compute(ArtifactCache.key("ngram_index", version, derive_key), compute)
+
+def battles_artifact(store: ArtifactCache, version: str, aliases_key: str, battles: pd.DataFrame) -> BattleTable:
+    aliases = json.loads(aliases_key)
+    return store.get_or_compute(
+        ArtifactCache.key("battles", version, aliases_key, derive_key),
+        lambda: build_battle_table(battles, normalize=lambda m: model_title(m, aliases)),
+    )
+
+@traced(st.cache_resource(show_spinner=False))
+def load_ngram_index(version: str, _usage: pd.DataFrame, _texts: Optional[pd.Series] = None) -> Optional[NgramIndex]:
+    """Indeks n-gram per versi dataset: user_text ditokenisasi sekali, dibagi antar sesi & restart."""
+    store = artifact_cache()
+    return warmer().get(("ngram_index", version), lambda: ngram_index_artifact(store, version, _usage, _texts))
+
+@traced(st.cache_resource(show_spinner=False))
+def load_battles(version: str, aliases_key: str, _battles: pd.DataFrame) -> BattleTable:
+    """Duel teragregasi per (date, topic, triple) per versi battles.csv, dibagi antar sesi."""
+    store = artifact_cache()
+    return warmer().get(("battles", version, aliases_key), lambda: battles_artifact(store, version, aliases_key, _battles))
 
 def kpi_card(label: str, value: str) -> None:
     st.markdown(
@@ -203,45 +285,160 @@ def kpi_card(label: str, value: str) -> None:
         """, unsafe_allow_html=True
     )
 
+# ----------------------- Shell (tampil sebelum data dimuat) -----------------------
+# Judul, deskripsi, dan placeholder KPI dikirim lebih dulu; muat data & view berat
+# mengisi placeholder setelahnya sehingga worker baru langsung menampilkan halaman.
+st.title("🤖 Dashboard Analisis Penggunaan LLMs")
+
+with st.expander("🚀 Latar Belakang", expanded=True):
+    st.markdown(
+        """
+        Seiring perkembangan *Large Language Models (LLMs)*, memahami bagaimana model digunakan, disukai,
+        dan seberapa efektif menyelesaikan tugas menjadi penting untuk **pemilihan model**, **routing otomatis**,
+        dan **perancangan produk**. Dashboard ini merangkum:
+        - **Popularitas Model** (tren penggunaan),
+        - **Topik Utama / N-gram** (gambaran kebutuhan pengguna),
+        - **Win-Rate** per model (dengan **Wilson 95% CI** sebagai kehati-hatian statistik),
+        - **Turns-to-Solve (TTS)** sebagai proxy efisiensi,
+        - **Fit-for-Purpose** (*Topik × Model*) sebagai proxy kecocokan model per kategori tugas.
+        """
+    )
+
+with st.expander("🎯 Pertanyaan Bisnis", expanded=True):
+    st.markdown(
+        """
+        1) **Model terpopuler** — model mana paling sering dipakai dan bagaimana trennya?  
+        2) **Topik/N-gram** — tema/kata kunci apa yang paling sering diminta?  
+        3) **Win-Rate** — model mana yang paling disukai (dengan interval kepercayaan)?  
+        4) **TTS** — berapa gilirannya hingga *“beres”* dan model mana yang paling efisien?  
+        5) **Fit-for-Purpose** — model mana unggul di tiap kategori (Coding, Penulisan, Analisis Data, Terjemahan, dll.)?
+        """
+    )
+
+KPI_LABELS = ["Total Interaksi", "Model Unik", "Solved Rate (rata2)", "Median TTS"]
+kpi_slots = [col.empty() for col in st.columns(4)]
+for slot, label in zip(kpi_slots, KPI_LABELS):
+    with slot:
+        kpi_card(label, "…")
+st.markdown("<hr class='soft'/>", unsafe_allow_html=True)
+
+# Impor plotly berjalan di latar belakang selama data dimuat
+warmer().submit("plotly", preload_figures)
+
 # ----------------------- Sidebar: Input Pengguna -----------------------
 st.sidebar.header("⚙️ Pengaturan")
 st.sidebar.markdown("<span class='small-muted'>Saring sesuai kebutuhan visual.</span>", unsafe_allow_html=True)
 
+# Instrumentasi: span waktu/memori per tahap; nonaktif = praktis tanpa biaya
+show_perf = st.sidebar.toggle(
+    "Panel performa",
+    value=False,
+    help="Tampilkan waktu, memori, dan hit/miss cache per tahap (muat, normalisasi, filter, tab, chart).",
+)
+if PERF_LOG:
+    add_log_handler(PERF_LOG)
+perf = Recorder(enabled=show_perf or bool(PERF_LOG), log=bool(PERF_LOG)).activate()
+
 # Opsi sumber data: lokal atau upload
 use_local = st.sidebar.toggle("Gunakan data lokal (folder `data/`)", value=True)
+incremental = use_local and st.sidebar.toggle(
+    "Mode inkremental (pantau data baru)",
+    value=False,
+    help="Tail data/usage.csv atau part file di data/usage_parts/; hanya baris baru yang diproses.",
+)
 
-uploaded_usage = uploaded_winrate = uploaded_ngrams = None
+uploaded_usage = uploaded_winrate = uploaded_ngrams = uploaded_battles = None
 if not use_local:
     uploaded_usage = st.sidebar.file_uploader("Upload usage.csv", type=["csv"])
     uploaded_winrate = st.sidebar.file_uploader("Upload winrate.csv (opsional)", type=["csv"])
     uploaded_ngrams = st.sidebar.file_uploader("Upload ngrams.csv (opsional)", type=["csv"])
+    uploaded_battles = st.sidebar.file_uploader("Upload battles.csv (opsional)", type=["csv"])
 
 # ----------------------- Muat Data -----------------------
-usage = None
+load_usage_frame = None
 winrate = None
 ngrams = None
+battles = None
+battles_version = None
+usage_texts = None
+usage_version = "empty"
+
+# Aturan topik kustom (data/topic_rules.json) → topic dihitung ulang dari user_text
+topic_rules = load_rules(TOPIC_RULES_JSON) if TOPIC_RULES_JSON.exists() else None
+rules_key = json.dumps(topic_rules) if topic_rules else None
+
+# Versi artefak = digest isi data (usage_version) + digest konfigurasi derivasi (derive_key)
+model_aliases = load_aliases(MODEL_ALIASES_JSON)
+aliases_key = json.dumps(model_aliases, sort_keys=True)
+derive_key = config_digest(derivation_config(topic_rules, model_aliases, STOPWORDS_EN_ID))
 
 if use_local:
-    usage = load_csv(USAGE_CSV)
-    winrate = load_csv(WINRATE_CSV)
-    ngrams = load_csv(NGRAMS_CSV)
+    if not incremental:
+        usage_fp = source_fingerprint(USAGE_CSV)
+        usage_columns = USAGE_VIEW_COLUMNS + (("user_text",) if rules_key else ())
+        load_usage_frame = lambda: read_table(USAGE_CSV, kind="usage", columns=usage_columns)
+        usage_version = dataset_digest(usage_fp, USAGE_CSV)
+    winrate = load_csv(WINRATE_CSV, source_fingerprint(WINRATE_CSV))
+    ngrams = load_csv(NGRAMS_CSV, source_fingerprint(NGRAMS_CSV))
+    if resolve_source(BATTLES_CSV) is not None:
+        battles_fp = source_fingerprint(BATTLES_CSV)
+        battles = load_csv(BATTLES_CSV, battles_fp)
+        battles_version = dataset_digest(battles_fp, BATTLES_CSV)
 else:
+    # Unggahan diparse per chunk sekali per isi berkas; rerun berikutnya memakai hasil cache
     if uploaded_usage is not None:
-        usage = pd.read_csv(uploaded_usage)
+        version = parse_upload(uploaded_usage, "usage")
+        if version is not None:
+            usage_version = version
+            load_usage_frame = lambda key=version: upload_cache().take(key, uploaded_usage, "usage", UPLOAD_LIMITS)
     if uploaded_winrate is not None:
-        winrate = pd.read_csv(uploaded_winrate)
+        version = parse_upload(uploaded_winrate, "winrate")
+        winrate = upload_cache().frame(version, uploaded_winrate, "winrate", UPLOAD_LIMITS) if version else None
     if uploaded_ngrams is not None:
-        ngrams = pd.read_csv(uploaded_ngrams)
-
-usage = ensure_usage_schema(usage)
-winrate = ensure_winrate_schema(winrate)
-if ngrams is None:
-    ngrams = pd.DataFrame(columns=["term","freq"])
+        version = parse_upload(uploaded_ngrams, "ngrams")
+        ngrams = upload_cache().frame(version, uploaded_ngrams, "ngrams", UPLOAD_LIMITS) if version else None
+    if uploaded_battles is not None:
+        battles_version = parse_upload(uploaded_battles, "battles")
+        battles = upload_cache().frame(battles_version, uploaded_battles, "battles", UPLOAD_LIMITS) if battles_version else None
+
+with span("normalize:winrate_ngrams"):
+    winrate = ensure_winrate_schema(winrate)
+    ngrams = ensure_ngrams_schema(ngrams)
+
+    # Judul model kanonis: dihitung sekali atas nama unik, disimpan sebagai categorical
+    winrate = add_model_title(winrate, model_aliases)
+
+if incremental:
+    # Cube berjalan per proses; setiap rerun hanya menyerap baris baru
+    stream = usage_stream(USAGE_PARTS_DIR if USAGE_PARTS_DIR.is_dir() else USAGE_CSV, aliases_key, rules_key)
+    st.sidebar.button("🔄 Periksa data baru")
+    with span("stream:poll"):
+        new_rows = stream.poll()
+    st.sidebar.caption(f"Baris terserap: {stream.rows:,} (+{new_rows:,} baru)")
+    cube = stream.cube
+    usage_version = stream.version + ":" + aliases_key + (":topics:" + rules_fingerprint(topic_rules) if rules_key else "")
+    if winrate.empty:
+        winrate = stream.winrate()
+    usage = ensure_usage_schema(None)
+else:
+    # Frame usage bersama (read-only): filter per sesi berjalan atas cube/indeks, bukan salinan
+    if rules_key:
+        usage_version += ":topics:" + rules_fingerprint(topic_rules)
+    usage_version += ":" + aliases_key
+    shared = load_usage(usage_version, load_usage_frame or (lambda: None))
+    usage, usage_texts = shared.frame, shared.texts
+    cube = load_rollup(usage_version, usage)
+    # Indeks n-gram & tabel duel belum dibutuhkan tampilan awal: bangun/muat di latar belakang
+    store = artifact_cache()
+    if not usage.empty and (usage_texts is not None or use_local):
+        warmer().submit(("ngram_index", usage_version), lambda: ngram_index_artifact(store, usage_version, usage, usage_texts))
+    if battles is not None and not battles.empty:
+        warmer().submit(("battles", battles_version, aliases_key), lambda: battles_artifact(store, battles_version, aliases_key, battles))
 
 # Siapkan daftar model & rentang tanggal
-all_models = sorted(usage["model"].dropna().astype(str).map(model_title).unique().tolist()) if not usage.empty else []
-min_date = pd.to_datetime(usage["date"].min()) if "date" in usage.columns and usage["date"].notna().any() else None
-max_date = pd.to_datetime(usage["date"].max()) if "date" in usage.columns and usage["date"].notna().any() else None
+all_models = sorted(cube.keys["model"].astype(str).unique().tolist())
+min_date = pd.to_datetime(cube.keys["date"].min()) if cube.keys["date"].notna().any() else None
+max_date = pd.to_datetime(cube.keys["date"].max()) if cube.keys["date"].notna().any() else None
 
 # Filter di sidebar
 if min_date and max_date:
@@ -255,302 +452,293 @@ else:
     date_range = None
 
 top_n_models = st.sidebar.slider("Top-N model (untuk chart)", min_value=3, max_value=20, value=10, step=1)
-topics_available = sorted(usage["topic"].dropna().unique().tolist())
+topics_available = sorted(cube.keys["topic"].astype(str).unique().tolist())
 topics_selected = st.sidebar.multiselect("Pilih topik", options=topics_available, default=topics_available)
 apply_stopwords = st.sidebar.toggle("Bersihkan stopwords n-gram", value=True)
 top_k_terms = st.sidebar.slider("Banyak term n-gram ditampilkan", 10, 50, 30, 5)
-
-# Terapkan filter ke usage
-filtered = usage.copy()
-if date_range and all(date_range):
-    start_d, end_d = [pd.to_datetime(d) for d in date_range]
-    filtered = filtered[filtered["date"].between(start_d, end_d)]
-if topics_selected:
-    filtered = filtered[filtered["topic"].isin(topics_selected)]
-
-# ----------------------- Header & Deskripsi -----------------------
-st.title("🤖 Dashboard Analisis Penggunaan LLMs")
-
-with st.expander("🚀 Latar Belakang", expanded=True):
-    st.markdown(
-        """
-        Seiring perkembangan *Large Language Models (LLMs)*, memahami bagaimana model digunakan, disukai,
-        dan seberapa efektif menyelesaikan tugas menjadi penting untuk **pemilihan model**, **routing otomatis**,
-        dan **perancangan produk**. Dashboard ini merangkum:
-        - **Popularitas Model** (tren penggunaan),
-        - **Topik Utama / N-gram** (gambaran kebutuhan pengguna),
-        - **Win-Rate** per model (dengan **Wilson 95% CI** sebagai kehati-hatian statistik),
-        - **Turns-to-Solve (TTS)** sebagai proxy efisiensi,
-        - **Fit-for-Purpose** (*Topik × Model*) sebagai proxy kecocokan model per kategori tugas.
-        """
-    )
-
-with st.expander("🎯 Pertanyaan Bisnis", expanded=True):
-    st.markdown(
-        """
-        1) **Model terpopuler** — model mana paling sering dipakai dan bagaimana trennya?  
-        2) **Topik/N-gram** — tema/kata kunci apa yang paling sering diminta?  
-        3) **Win-Rate** — model mana yang paling disukai (dengan interval kepercayaan)?  
-        4) **TTS** — berapa gilirannya hingga *“beres”* dan model mana yang paling efisien?  
-        5) **Fit-for-Purpose** — model mana unggul di tiap kategori (Coding, Penulisan, Analisis Data, Terjemahan, dll.)?
-        """
-    )
-
-# ----------------------- KPI Ringkas -----------------------
-col_k1, col_k2, col_k3, col_k4 = st.columns(4)
-total_interactions = int(len(filtered))
-unique_models = int(filtered["model"].nunique())
-overall_solved_rate = np.nan
-if "is_solved" in filtered.columns and filtered["is_solved"].notna().any():
-    overall_solved_rate = float(filtered["is_solved"].mean())
-
-median_tts = float(filtered["tts"].median()) if "tts" in filtered.columns and filtered["tts"].notna().any() else np.nan
-
-with col_k1: kpi_card("Total Interaksi", f"{total_interactions:,}")
-with col_k2: kpi_card("Model Unik", f"{unique_models:,}")
-with col_k3: kpi_card("Solved Rate (rata2)", f"{overall_solved_rate*100:,.1f}%" if not np.isnan(overall_solved_rate) else "—")
-with col_k4: kpi_card("Median TTS", f"{median_tts:,.2f}" if not np.isnan(median_tts) else "—")
-
-st.markdown("<hr class='soft'/>", unsafe_allow_html=True)
-
-# ----------------------- Tabs Visual -----------------------
-tab_overview, tab_ngrams, tab_winrate, tab_tts, tab_fit, tab_summary = st.tabs(
-    ["📈 Overview", "🧩 Topik & N-gram", "🏆 Win-Rate", "⏱️ TTS", "🎛️ Fit-for-Purpose", "✅ Kesimpulan"]
+lazy_tabs = st.sidebar.toggle(
+    "Hitung hanya tampilan aktif",
+    value=True,
+    help="Mode lazy: hanya tab yang dibuka yang dihitung & dikirim ke browser.",
 )
 
-# ----- 📈 Overview -----
-with tab_overview:
+@traced(st.cache_resource(show_spinner=False, max_entries=64))
+def filtered_view(key: Tuple, _cube: RollupCube) -> Selection:
+    """Seleksi cube per tuple filter persis (dibagi antar sesi & tab; pengelompokan antara di-memo)."""
+    _, start, end, topics = key
+    return select(_cube, Query(start, end, topics))
+
+# Terapkan filter: binary search tanggal + indeks topik atas cube (tanpa copy frame).
+# Widget lain (Top-N, stopwords, term n-gram) tidak ikut dalam kunci filter.
+with span("filter"):
+    start_d = end_d = None
+    if date_range and len(date_range) == 2 and all(date_range):
+        start_d, end_d = [pd.to_datetime(d) for d in date_range]
+    # Urutan pilihan topik tidak relevan; semua topik terpilih = tanpa filter topik
+    topic_key = None
+    if topics_selected and set(topics_selected) != set(topics_available):
+        topic_key = tuple(sorted(topics_selected))
+    view_key = (usage_version, start_d, end_d, topic_key)
+    view = filtered_view(view_key, cube)
+    view_keys = view.keys
+    has_dates = bool(view_keys["date"].notna().any())
+    has_tts = int(view_keys["tts_n"].sum()) > 0
+    has_solved = int(view_keys["solved_n"].sum()) > 0
+
+# ----------------------- KPI Ringkas (isi placeholder shell) -----------------------
+with span("kpi"):
+    kpi = view.kpis()
+total_interactions = kpi["total"]
+unique_models = kpi["models"]
+overall_solved_rate = kpi["solved_rate"]
+median_tts = kpi["median_tts"]
+
+kpi_values = [
+    f"{total_interactions:,}",
+    f"{unique_models:,}",
+    f"{overall_solved_rate*100:,.1f}%" if not np.isnan(overall_solved_rate) else "—",
+    f"{median_tts:,.2f}" if not np.isnan(median_tts) else "—",
+]
+for slot, label, value in zip(kpi_slots, KPI_LABELS, kpi_values):
+    with slot:
+        kpi_card(label, value)
+
+# ----------------------- View Ter-memo (per tab) -----------------------
+# Kunci memo: `view_key` (fingerprint dataset, rentang tanggal, topik). Hanya tab
+# yang aktif (mode lazy) yang memanggil fungsi-fungsi ini.
+
+# Agregat berasal dari `Selection` (llm_analytics.query), API yang sama dengan layanan headless.
+
+@traced(st.cache_data(show_spinner=False, max_entries=64))
+def overview_view(key: Tuple, top_n: int, _view: Selection) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    # Tren: hanya top-N model (berdasarkan total bertanggal)
+    return _view.popularity(top_n), _view.trend(top_n)
+
+@traced(st.cache_data(show_spinner=False, max_entries=64))
+def topic_view(key: Tuple, _view: Selection) -> pd.DataFrame:
+    return _view.topics()
+
+@traced(st.cache_data(show_spinner=False, max_entries=64))
+def tts_stats_view(key: Tuple, _view: Selection) -> pd.DataFrame:
+    """n, median, p75, p90 per model dari gabungan histogram TTS (tab TTS & Kesimpulan)."""
+    return _view.tts()
+
+@traced(st.cache_data(show_spinner=False, max_entries=64))
+def tts_view(key: Tuple, top_n: int, _view: Selection) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    return _view.tts_hist(), tts_stats_view(key, _view).head(top_n)
+
+@traced(st.cache_data(show_spinner=False, max_entries=64))
+def fit_view(key: Tuple, top_n: int, _view: Selection) -> pd.DataFrame:
+    # Kolom = model top-N berdasarkan jumlah interaksi agar heatmap tidak terlalu lebar
+    return _view.fit(top_n)
+
+@traced(st.cache_data(show_spinner=False, max_entries=64))
+def summary_view(key: Tuple, _view: Selection) -> Tuple[pd.DataFrame, pd.Series, pd.DataFrame]:
+    tts_rank = tts_stats_view(key, _view).set_index("model")["median"].head(3)
+    # Juara per topik: batas bawah Wilson tertinggi di antara model dengan N >= MIN_N_LEADER
+    return _view.popularity(), tts_rank, _view.fit_winners(MIN_N_LEADER)
+
+@traced(st.cache_data(show_spinner=False, max_entries=64))
+def routing_view(key: Tuple, _view: Selection) -> pd.DataFrame:
+    """Topik → model terurut (batas bawah Wilson, N >= MIN_N_LEADER) dari matriks Fit-for-Purpose yang sama."""
+    return _view.routing(MIN_N_LEADER)
+
+@traced(st.cache_data(show_spinner=False, max_entries=64))
+def ngram_view(key: Tuple, top_k: int, use_stopwords: bool, _index: NgramIndex) -> pd.DataFrame:
+    """Top-k n-gram untuk filter `key` = penjumlahan partisi indeks (stopword via mask term id)."""
+    _, start, end, topics = key
+    exclude = _index.term_mask(STOPWORDS_EN_ID) if use_stopwords else None
+    return _index.top(_index.select(start, end, topics), k=top_k, exclude=exclude)
+
+@traced(st.cache_data(show_spinner=False, max_entries=64))
+def battle_view(key: Tuple, _table: BattleTable) -> pd.DataFrame:
+    """Win-rate (Wilson) + Elo dari battles untuk filter tanggal/topik `key`."""
+    _, start, end, topics = key
+    return _table.leaderboard(_table.select(start, end, topics))
+
+def winrate_table() -> Tuple[pd.DataFrame, bool]:
+    """(tabel win-rate berkolom `model`, mengikuti filter?) — battles bila ada, selain itu winrate.csv."""
+    if battles is not None and not battles.empty and not incremental:
+        table = load_battles(battles_version, aliases_key, battles)
+        if not table.empty:
+            return battle_view((battles_version + ":" + aliases_key, start_d, end_d, topic_key), table), True
+    if winrate is None or winrate.empty:
+        return pd.DataFrame(columns=["model", "win_rate", "wr_lo", "wr_hi"]), False
+    return winrate.assign(model=winrate["model_title"].astype(str)), False
+
+def top_terms(top_k: int) -> pd.DataFrame:
+    """Top n-gram yang mengikuti filter; ngrams.csv statis bila user_text tidak tersedia."""
+    index = None
+    if not incremental and not usage.empty and (usage_texts is not None or use_local):
+        index = load_ngram_index(usage_version, usage, usage_texts)
+    if index is not None and not index.empty:
+        return ngram_view(view_key, top_k, apply_stopwords, index)
+    return sanitize_terms(ngrams, use_stopwords=apply_stopwords, top_k=top_k, stopwords=STOPWORDS_EN_ID)
+
+# ----------------------- Figur (payload ringkas, ter-memo) -----------------------
+# Figur dibangun & dikompakkan (typed array, data di-bin/resample di server) sekali
+# per (jenis chart, kunci input); rerun tanpa perubahan langsung mengirim payload.
+@traced(st.cache_data(show_spinner=False, max_entries=128))
+def chart_payload(kind: str, key: Any, _data: pd.DataFrame) -> Optional[Dict[str, Any]]:
+    return build_payload(kind, _data)
+
+def show_chart(kind: str, key: Any, data: pd.DataFrame) -> None:
+    payload = chart_payload(kind, key, data)
+    if payload is not None:
+        with span("plotly_chart", kind=kind):
+            st.plotly_chart(payload_figure(payload), use_container_width=True)
+
+# ----------------------- Render per Tab -----------------------
+def render_overview() -> None:
     c1, c2 = st.columns([1.1, 1.4])
+    pop, ts = overview_view(view_key, top_n_models, view)
 
     # Popularitas Model (bar top-N)
     with c1:
         st.subheader("Popularitas Model (Top-N)")
-        pop = (
-            filtered
-            .assign(model=lambda d: d["model"].map(model_title))
-            .groupby("model", observed=False)
-            .size()
-            .reset_index(name="count")
-            .sort_values("count", ascending=False)
-            .head(top_n_models)
-        )
         if not pop.empty:
-            fig_bar = px.bar(pop, x="model", y="count", text="count")
-            fig_bar.update_layout(xaxis_title="", yaxis_title="Jumlah Interaksi", bargap=0.2)
-            st.plotly_chart(fig_bar, use_container_width=True)
+            show_chart("popularity", (view_key, top_n_models), pop)
         else:
             st.info("Data tidak tersedia untuk grafik popularitas.")
 
-    # Tren per Tanggal (line)
+    # Tren per Tanggal (line; di-resample ke mingguan/bulanan bila titik terlalu banyak)
     with c2:
         st.subheader("Tren Penggunaan Per Hari")
-        if "date" in filtered.columns and filtered["date"].notna().any():
-            ts = (
-                filtered.assign(model=lambda d: d["model"].map(model_title))
-                .groupby(["date","model"], observed=False)
-                .size()
-                .reset_index(name="count")
-            )
-            # tampilkan hanya top-N model (berdasarkan total)
-            top_models = (
-                ts.groupby("model", observed=False)["count"].sum().sort_values(ascending=False).head(top_n_models).index
-            )
-            ts = ts[ts["model"].isin(top_models)]
-            fig_line = px.line(ts, x="date", y="count", color="model")
-            fig_line.update_layout(xaxis_title="Tanggal", yaxis_title="Jumlah Interaksi")
-            st.plotly_chart(fig_line, use_container_width=True)
+        if has_dates:
+            show_chart("trend", (view_key, top_n_models), ts)
         else:
             st.info("Kolom 'date' tidak tersedia/valid.")
 
-# ----- 🧩 Topik & N-gram -----
-with tab_ngrams:
+def render_ngrams() -> None:
     col_t1, col_t2 = st.columns([1.2, 1.0])
 
     with col_t1:
         st.subheader("Distribusi Topik")
-        topik = (
-            filtered.groupby("topic", observed=False)
-            .size().reset_index(name="count")
-            .sort_values("count", ascending=False)
-        )
+        topik = topic_view(view_key, view)
         if not topik.empty:
-            fig_topik = px.bar(topik, x="topic", y="count", text="count")
-            fig_topik.update_layout(xaxis_title="", yaxis_title="Jumlah Interaksi")
-            st.plotly_chart(fig_topik, use_container_width=True)
+            show_chart("topics", view_key, topik)
         else:
             st.info("Data topik tidak tersedia.")
 
     with col_t2:
         st.subheader("Top N-gram")
-        grams = sanitize_terms(ngrams, use_stopwords=apply_stopwords, top_k=top_k_terms)
+        grams = top_terms(top_k_terms)
         if not grams.empty:
-            fig_grams = px.bar(grams.sort_values("freq"), x="freq", y="term", orientation="h", text="freq")
-            fig_grams.update_layout(xaxis_title="Frekuensi", yaxis_title="", margin=dict(l=10, r=10, t=40, b=20))
-            st.plotly_chart(fig_grams, use_container_width=True)
+            # Tabel kecil (≤ 50 baris): isinya sendiri jadi kunci memo
+            show_chart("ngrams", grams, grams)
         else:
             st.info("File ngrams.csv tidak tersedia atau kosong.")
 
-# ----- 🏆 Win-Rate -----
-with tab_winrate:
+def render_winrate() -> None:
     st.subheader("Win-Rate per Model (dengan Wilson 95% CI)")
 
-    if winrate is not None and not winrate.empty:
-        wr = winrate.copy()
-        wr["model"] = wr["model"].map(model_title)
+    wr, from_battles = winrate_table()
+    if not wr.empty:
         # sort & potong top-N
         wr = wr.sort_values("win_rate", ascending=False).head(top_n_models)
 
-        # Siapkan error bar asimetris
-        err_plus = (wr["wr_hi"] - wr["win_rate"]).clip(lower=0)
-        err_minus = (wr["win_rate"] - wr["wr_lo"]).clip(lower=0)
-
-        fig_wr = go.Figure()
-        fig_wr.add_trace(go.Bar(
-            x=wr["model"], y=wr["win_rate"],
-            name="Win-Rate",
-            text=(wr["win_rate"]*100).round(1).astype(str) + "%",
-            hovertemplate="Model=%{x}<br>Win-Rate=%{y:.3f}<extra></extra>"
-        ))
-        fig_wr.update_yaxes(title_text="Win-Rate", tickformat=".0%")
-
-        fig_wr.update_layout(barmode="group", xaxis_title="", margin=dict(l=10, r=10, t=40, b=20))
-
-        # Tambahkan error bars
-        fig_wr.update_traces(
-            error_y=dict(
-                type="data", symmetric=False,
-                array=err_plus,
-                arrayminus=err_minus,
-                thickness=1.5,
-                width=3
-            )
-        )
-        st.plotly_chart(fig_wr, use_container_width=True)
+        # Batang + error bar asimetris Wilson; kunci memo = isi tabel top-N
+        plot_cols = ["model", "win_rate", "wr_lo", "wr_hi"]
+        show_chart("winrate", wr[plot_cols], wr[plot_cols])
 
         st.caption("Catatan: Interval kepercayaan menggunakan Wilson 95% CI.")
+        if from_battles:
+            st.caption("Dihitung dari battles.csv sesuai filter tanggal & topik; Elo = rating Bradley–Terry.")
+            st.dataframe(
+                wr[["model", "wins", "apps", "win_rate", "wr_lo", "wr_hi", "elo"]].round(3),
+                use_container_width=True, hide_index=True,
+            )
     else:
         st.info("winrate.csv tidak tersedia.")
 
-# ----- ⏱️ TTS -----
-with tab_tts:
+def render_tts() -> None:
     c_t1, c_t2 = st.columns([1.05, 1.05])
+    if has_tts:
+        hist, summary = tts_view(view_key, top_n_models, view)
 
     with c_t1:
         st.subheader("Distribusi TTS (Histogram)")
-        if "tts" in filtered.columns and filtered["tts"].notna().any():
-            fig_hist = px.histogram(filtered, x="tts", nbins=20)
-            fig_hist.update_layout(xaxis_title="TTS", yaxis_title="Jumlah")
-            st.plotly_chart(fig_hist, use_container_width=True)
+        if has_tts:
+            # Histogram berbobot dari cube, di-bin di server (browser hanya menerima ≤ 20 batang)
+            show_chart("tts_hist", view_key, hist)
         else:
             st.info("Kolom 'tts' tidak tersedia/valid.")
 
     with c_t2:
         st.subheader("Ringkasan TTS per Model (Median & p75)")
-        if "tts" in filtered.columns and filtered["tts"].notna().any():
-            summary = (
-                filtered.assign(model=lambda d: d["model"].map(model_title))
-                .groupby("model", observed=False)["tts"]
-                .agg(median="median", p75=lambda s: s.quantile(0.75))
-                .reset_index()
-                .sort_values("median", ascending=True)
-                .head(top_n_models)
-            )
-            fig_tts = go.Figure(data=[
-                go.Bar(name="Median", x=summary["model"], y=summary["median"]),
-                go.Bar(name="p75", x=summary["model"], y=summary["p75"])
-            ])
-            fig_tts.update_layout(barmode="group", yaxis_title="TTS", xaxis_title="")
-            st.plotly_chart(fig_tts, use_container_width=True)
+        if has_tts:
+            show_chart("tts_summary", (view_key, top_n_models), summary)
 
             st.dataframe(summary, use_container_width=True, hide_index=True)
         else:
             st.info("Kolom 'tts' tidak tersedia/valid.")
 
-# ----- 🎛️ Fit-for-Purpose (Topik × Model) -----
-with tab_fit:
+def render_fit() -> None:
     st.subheader("Heatmap Solved-Rate: Topik × Model")
-    if not filtered.empty and "is_solved" in filtered.columns and filtered["is_solved"].notna().any():
-        work = filtered.assign(model=lambda d: d["model"].map(model_title))
-        # Ambil model top-N berdasarkan jumlah interaksi agar heatmap tidak terlalu lebar
-        top_models_for_heat = (
-            work.groupby("model", observed=False).size().sort_values(ascending=False).head(top_n_models).index
-        )
-        work = work[work["model"].isin(top_models_for_heat)]
-
-        pivot = (
-            work.groupby(["topic","model"], observed=False)["is_solved"]
-            .mean().reset_index().pivot(index="topic", columns="model", values="is_solved")
-            .reindex(index=sorted(work["topic"].unique()))
-        )
+    if not view.empty and has_solved:
+        pivot = fit_view(view_key, top_n_models, view)
 
         if pivot.notna().any().any():
-            fig_heat = px.imshow(
-                pivot,
-                aspect="auto",
-                color_continuous_scale="Blues",
-                labels=dict(x="Model", y="Topik", color="Solved Rate"),
-                zmin=0, zmax=1
-            )
-            st.plotly_chart(fig_heat, use_container_width=True)
+            show_chart("heatmap", (view_key, top_n_models), pivot)
             st.caption("Semakin gelap → solved rate lebih tinggi.")
         else:
             st.info("Data solved-rate tidak mencukupi untuk membuat heatmap.")
+
+        with st.expander("🧭 Tabel Routing (Topik → Model)"):
+            routing = routing_view(view_key, view)
+            if routing.empty:
+                st.info(f"Belum ada pasangan topik × model dengan N ≥ {MIN_N_LEADER} label solved.")
+            else:
+                st.dataframe(routing, use_container_width=True, hide_index=True)
+                st.caption(
+                    f"Hanya pasangan dengan N ≥ {MIN_N_LEADER}, diurutkan menurut batas bawah Wilson 95%; "
+                    f"topik `{ROUTE_ANY}` = fallback lintas topik. Tabel ini mengikuti filter aktif; router membaca "
+                    f"tabel tanpa filter `data/{ROUTING_FILE}` (ditulis `export_dataset` atau `python -m llm_analytics.fit`, "
+                    f"memory-map via `llm_analytics.fit.load_routing`)"
+                    + ("." if ROUTING_ARROW.exists() else " — berkas belum ada.")
+                )
     else:
         st.info("Butuh kolom 'is_solved' untuk menghitung solved-rate.")
 
-# ----- ✅ Kesimpulan Otomatis -----
-with tab_summary:
+def render_summary() -> None:
     st.subheader("Ringkasan & Rekomendasi")
     bullets: List[str] = []
+    pop2, tts_rank, winners = summary_view(view_key, view)
 
     # 1) Popularitas
-    pop2 = (
-        filtered.assign(model=lambda d: d["model"].map(model_title))
-        .groupby("model", observed=False).size().reset_index(name="count")
-        .sort_values("count", ascending=False)
-    )
     if not pop2.empty:
         top3 = pop2.head(3)
         pop_line = ", ".join(f"{r['model']} ({int(r['count'])}x)" for _, r in top3.iterrows())
         bullets.append(f"**Popularitas** — Tertinggi: {pop_line}.")
 
     # 2) N-gram
-    grams2 = sanitize_terms(ngrams, use_stopwords=apply_stopwords, top_k=10)
+    grams2 = top_terms(10)
     if not grams2.empty:
         g_line = ", ".join(grams2["term"].head(8).tolist())
         bullets.append(f"**Topik/N-gram** — Kata/tema yang sering muncul: {g_line}.")
 
     # 3) Win-Rate
-    if winrate is not None and not winrate.empty:
-        wr2 = winrate.copy()
-        wr2["model"] = wr2["model"].map(model_title)
+    wr2, _ = winrate_table()
+    if not wr2.empty:
         top_wr = wr2.sort_values("win_rate", ascending=False).head(3)
         wr_line = ", ".join(f"{r['model']} ({r['win_rate']*100:.1f}% WR)" for _, r in top_wr.iterrows())
         bullets.append(f"**Win-Rate** — Tertinggi: {wr_line} (lihat Wilson 95% CI untuk kehati-hatian).")
 
     # 4) TTS
-    if "tts" in filtered.columns and filtered["tts"].notna().any():
-        tts_rank = (
-            filtered.assign(model=lambda d: d["model"].map(model_title))
-            .groupby("model", observed=False)["tts"].median().sort_values(ascending=True).head(3)
-        )
+    if has_tts:
         tts_line = ", ".join(f"{m} (Median {v:.2f})" for m, v in tts_rank.items())
         bullets.append(f"**Efisiensi (TTS)** — Lebih cepat (median lebih kecil): {tts_line}.")
 
     # 5) Fit-for-Purpose
-    if not filtered.empty and "is_solved" in filtered.columns and filtered["is_solved"].notna().any():
-        fit = (
-            filtered.assign(model=lambda d: d["model"].map(model_title))
-            .groupby(["topic","model"], observed=False)["is_solved"].mean().reset_index()
-        )
-        # untuk tiap topik, ambil juara solved-rate
-        winners = (
-            fit.sort_values(["topic","is_solved"], ascending=[True, False])
-            .groupby("topic", observed=False).head(1)
-        )
+    if not view.empty and has_solved:
         if not winners.empty:
-            fit_line = "; ".join(f"{r['topic']}: {r['model']} ({r['is_solved']*100:.1f}%)" for _, r in winners.iterrows())
-            bullets.append(f"**Fit-for-Purpose** — Juara per topik: {fit_line}.")
+            fit_line = "; ".join(
+                f"{r['topic']}: {r['model']} ({r['solved_rate']*100:.1f}%, batas bawah {r['solved_lo']*100:.1f}%, N={r['n']})"
+                for _, r in winners.iterrows()
+            )
+            bullets.append(f"**Fit-for-Purpose** — Juara per topik (N ≥ {MIN_N_LEADER}, urut batas bawah Wilson): {fit_line}.")
+        else:
+            bullets.append(f"**Fit-for-Purpose** — Belum ada model dengan N ≥ {MIN_N_LEADER} per topik untuk ditetapkan sebagai juara.")
 
     # Tampilkan bullet points
     if bullets:
@@ -567,6 +755,26 @@ with tab_summary:
         """
     )
 
+# ----------------------- Tabs Visual -----------------------
+VIEWS = {
+    "📈 Overview": render_overview,
+    "🧩 Topik & N-gram": render_ngrams,
+    "🏆 Win-Rate": render_winrate,
+    "⏱️ TTS": render_tts,
+    "🎛️ Fit-for-Purpose": render_fit,
+    "✅ Kesimpulan": render_summary,
+}
+
+if lazy_tabs:
+    # Hanya tampilan aktif yang dihitung & dirender (st.tabs hanya menyembunyikan konten)
+    active_view = st.radio("Tampilan", list(VIEWS), horizontal=True, label_visibility="collapsed", key="active_view")
+    with span(f"tab:{active_view}"):
+        VIEWS[active_view]()
+else:
+    for tab, (label, render) in zip(st.tabs(list(VIEWS)), VIEWS.items()):
+        with tab, span(f"tab:{label}"):
+            render()
+
 # ----------------------- Footer kecil -----------------------
 st.markdown("<hr class='soft'/>", unsafe_allow_html=True)
 st.markdown(
@@ -574,3 +782,28 @@ st.markdown(
     unsafe_allow_html=True
 )
 
+# ----------------------- Panel Performa (opsional) -----------------------
+def render_perf_panel() -> None:
+    """Span rerun ini (waktu, memori, hit/miss cache) + unduhan log JSONL."""
+    counts = perf.cache_counts()
+    store = artifact_cache()
+    with st.sidebar.expander("⏱️ Performance", expanded=True):
+        c1, c2, c3 = st.columns(3)
+        c1.metric("Rerun (ms)", f"{perf.elapsed() * 1000:,.0f}")
+        c2.metric("Dalam span (ms)", f"{perf.total_seconds() * 1000:,.0f}")
+        c3.metric("RSS (MB)", f"{rss_bytes() / 2**20:,.0f}")
+        st.caption(
+            f"Cache Streamlit (rerun ini): {counts['hit']} hit / {counts['miss']} miss • "
+            f"Artefak disk (proses): {store.hits} hit / {store.misses} miss"
+        )
+        st.dataframe(perf.frame(), hide_index=True, use_container_width=True)
+        st.download_button(
+            "Unduh log (JSONL)",
+            perf.to_jsonl(version=usage_version),
+            file_name="perf_spans.jsonl",
+            mime="application/x-ndjson",
+        )
+
+if show_perf:
+    render_perf_panel()
+
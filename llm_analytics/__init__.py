@@ -0,0 +1,5 @@
+"""Lapisan analitik bersama untuk dashboard.py dan Proyek_Analisis_Data.ipynb.
+
+Modul di paket ini sengaja tidak bergantung pada Streamlit agar bisa dipakai
+dari notebook, skrip ekspor, maupun layanan lain.
+"""
@@ -0,0 +1,343 @@
+"""Benchmark headless per tahap dashboard & notebook di atas data sintetis.
+
+    python -m llm_analytics.bench --rows 10k,1M,10M --out bench.json
+    python -m llm_analytics.bench --compare lama.json baru.json --fail-above 1.25
+    python -m llm_analytics.bench --rows "" --import-budget     # hanya anggaran start
+
+Dataset dibuat sekali per skala oleh `synthetic.ensure_dataset` di data/bench/<skala>/
+(deterministik, dipakai ulang antar run/commit). Setiap tahap diukur `repeat`
+kali dengan input segar dan dicatat waktu terbaik & median:
+
+- dashboard: baca CSV (dingin → sidecar) / sidecar, `ensure_usage_schema`,
+  `add_model_title`, tulis & map frame bersama, `build_rollup`, indeks filter,
+  seleksi cube & `SharedUsage.rows`, agregasi tiap tab (`query.Selection`) dan
+  satu kueri batch `QueryEngine.query`, indeks & top n-gram,
+  `sanitize_terms`, `build_payload` tiap figur;
+- notebook: `add_derived_columns`, `count_ngrams`, `compute_tts`, `solve_curve` atas tabel duel
+  sintetis (maks. `--conversations` baris);
+- startup: waktu impor jalur start dashboard.py (`DASHBOARD_IMPORTS`) dan impor
+  plotly yang ditunda, masing-masing di interpreter baru. `--import-budget` gagal
+  (exit 1) bila jalur start melebihi `IMPORT_BUDGET_S` atau plotly.express ikut
+  termuat; `--compare` juga melacak tahap ini antar commit.
+
+Hasil ditulis sebagai JSON (`meta` commit/versi/mesin + `results` per tahap) agar
+dua versi bisa dibandingkan dengan `--compare`. Pada skala besar hanya
+`--text-rows` baris pertama yang berisi user_text (memori tokenisasi/CSV tetap wajar).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from llm_analytics.figures import build_payload
+from llm_analytics.ingest import (
+    USAGE_VIEW_COLUMNS,
+    ensure_ngrams_schema,
+    ensure_usage_schema,
+    ensure_winrate_schema,
+    read_table,
+    sidecar_path,
+)
+from llm_analytics.models import add_model_title
+from llm_analytics.ngram_index import build_ngram_index
+from llm_analytics.ngrams import STOPWORDS, count_ngrams, sanitize_terms
+from llm_analytics.query import Query, QueryEngine, Selection, select
+from llm_analytics.rollup import build_rollup
+from llm_analytics.derive import add_derived_columns
+from llm_analytics.filters import build_filter_index
+from llm_analytics.shared import SharedUsage, map_frame, write_frame
+from llm_analytics.synthetic import SyntheticConfig, ensure_dataset, generate_conversations, parse_scale
+from llm_analytics.tts import compute_tts
+from llm_analytics.turns import solve_curve
+
+BENCH_DIR = Path("data") / "bench"
+DEFAULT_SCALES = ("10k", "1M", "10M")
+DEFAULT_REPEAT = 3
+TEXT_ROWS = 1_000_000
+CONVERSATIONS = 200_000
+TOP_N = 10
+TOP_K_TERMS = 30
+FAIL_ABOVE = 1.25
+# Selisih di bawah ini dianggap derau pengukuran saat membandingkan
+MIN_DELTA_S = 0.005
+# Jalur impor dashboard.py sampai shell tampil (plotly sengaja tidak termasuk)
+DASHBOARD_IMPORTS = (
+    "streamlit", "numpy", "pandas",
+    "llm_analytics.cache", "llm_analytics.figures", "llm_analytics.fit", "llm_analytics.ingest",
+    "llm_analytics.models", "llm_analytics.ngram_index", "llm_analytics.ngrams", "llm_analytics.perf",
+    "llm_analytics.query", "llm_analytics.rollup", "llm_analytics.shared", "llm_analytics.stats",
+    "llm_analytics.stream", "llm_analytics.topics", "llm_analytics.warm", "llm_analytics.winrate",
+)
+# Modul yang baru boleh dimuat saat chart pertama dibangun
+DEFERRED_IMPORTS = ("plotly.express",)
+# Anggaran waktu impor jalur start (detik, interpreter baru; ±0,7 s di mesin CI 1 vCPU)
+IMPORT_BUDGET_S = 1.0
+
+
+@dataclass
+class StageResult:
+    scale: str
+    rows: int
+    group: str
+    stage: str
+    best_s: float
+    median_s: float
+    repeat: int
+
+
+class Bench:
+    """Pengukur tahap: `run(stage, fn, setup)` memanggil `fn(*setup())` `repeat` kali."""
+
+    def __init__(self, scale: str, rows: int, repeat: int, verbose: bool = True) -> None:
+        self.scale = scale
+        self.rows = rows
+        self.repeat = repeat
+        self.verbose = verbose
+        self.group = "dashboard"
+        self.results: List[StageResult] = []
+
+    def run(self, stage: str, fn: Callable[..., Any], setup: Optional[Callable[[], tuple]] = None, repeat: Optional[int] = None) -> Any:
+        times, value = [], None
+        for _ in range(repeat or self.repeat):
+            args = setup() if setup is not None else ()
+            t0 = time.perf_counter()
+            value = fn(*args)
+            times.append(time.perf_counter() - t0)
+        self.record(stage, times)
+        return value
+
+    def record(self, stage: str, times: Sequence[float]) -> StageResult:
+        """Catat waktu yang diukur di luar `run` (mis. di subproses)."""
+        res = StageResult(self.scale, self.rows, self.group, stage, min(times), statistics.median(times), len(times))
+        self.results.append(res)
+        if self.verbose:
+            print(f"  {self.scale:>5} {self.group:<9} {stage:<28} {res.best_s * 1000:10.1f} ms", file=sys.stderr)
+        return res
+
+
+# ----------------------- Tahap start (impor) -----------------------
+def _fresh_time(stmt: str, setup: str = "pass", watch: Sequence[str] = ()) -> Tuple[float, List[str]]:
+    """Waktu `stmt` (setelah `setup`) di interpreter baru + modul `watch` yang termuat sesudahnya."""
+    code = (
+        f"import sys, time; {setup}; t = time.perf_counter(); {stmt}; "
+        "print(time.perf_counter() - t); "
+        f"print(','.join(m for m in {list(watch)!r} if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=Path(__file__).resolve().parent.parent,
+    )
+    seconds, loaded = (out.stdout.splitlines() + [""])[:2]
+    return float(seconds), [m for m in loaded.split(",") if m]
+
+
+def bench_startup(b: Bench) -> List[str]:
+    """Impor jalur start dashboard & impor plotly (ditunda); kembalikan modul tunda yang termuat terlalu awal."""
+    eager: List[str] = []
+    times = []
+    for _ in range(b.repeat):
+        seconds, eager = _fresh_time(f"import {', '.join(DASHBOARD_IMPORTS)}", watch=DEFERRED_IMPORTS)
+        times.append(seconds)
+    b.record("import_dashboard", times)
+    # Biaya yang dipindah ke chart pertama / thread pemanasan
+    preload = lambda: _fresh_time("figures.preload()", setup="import pandas, llm_analytics.figures as figures")[0]
+    b.record("import_plotly", [preload() for _ in range(b.repeat)])
+    return eager
+
+
+def check_import_budget(report: Dict[str, Any], budget: float) -> List[str]:
+    """Pelanggaran anggaran start: impor jalur dashboard > `budget` detik atau modul tunda termuat."""
+    problems = [f"{m} diimpor saat start (seharusnya ditunda)" for m in report["startup"]["eager_imports"]]
+    for r in report["results"]:
+        if r["group"] == "startup" and r["stage"] == "import_dashboard" and r["best_s"] > budget:
+            problems.append(f"impor dashboard {r['best_s']:.3f} s > anggaran {budget:.3f} s")
+    return problems
+
+
+# ----------------------- Tahap dashboard -----------------------
+def _filter_args(cube) -> tuple:
+    """Filter representatif: 50% rentang tanggal tengah, semua topik kecuali satu."""
+    dates = cube.keys["date"].dropna()
+    lo, hi = dates.min(), dates.max()
+    span = hi - lo
+    topics = sorted(cube.keys["topic"].astype(str).unique())
+    return lo + span / 4, hi - span / 4, topics[:-1] if len(topics) > 1 else topics
+
+
+def bench_dashboard(b: Bench, paths: Dict[str, Path], work_dir: Path) -> None:
+    usage_csv = paths["usage"]
+
+    def drop_sidecar() -> tuple:
+        sidecar_path(usage_csv).unlink(missing_ok=True)
+        return ()
+
+    b.run("read_csv_cold", lambda: read_table(usage_csv, kind="usage", columns=USAGE_VIEW_COLUMNS), drop_sidecar)
+    usage = b.run("read_sidecar", lambda: read_table(usage_csv, kind="usage", columns=USAGE_VIEW_COLUMNS))
+    raw = pd.read_csv(usage_csv, usecols=list(USAGE_VIEW_COLUMNS))
+    b.run("ensure_usage_schema", ensure_usage_schema, lambda: (raw.copy(),))
+    del raw
+    usage = b.run("add_model_title", add_model_title, lambda: (usage.copy(),))
+
+    arrow = work_dir / "usage.arrow"
+    b.run("write_shared_frame", write_frame, lambda: (usage, arrow))
+    frame = b.run("map_shared_frame", map_frame, lambda: (arrow,))
+    shared = SharedUsage(frame=frame)
+
+    cube = b.run("build_rollup", build_rollup, lambda: (frame,))
+    start, end, topics = _filter_args(cube)
+    b.run("filter_index", build_filter_index, lambda: (cube.keys["date"], cube.keys["topic"]))
+    q = Query(start, end, tuple(topics), top_n=TOP_N)
+    view = b.run("cube_slice", select, lambda: (cube, q))
+    models = view.popularity()["model"].astype(str).head(5).tolist()
+    shared.rows()
+    b.run("shared_rows", shared.rows, lambda: (start, end, topics, models))
+
+    # Tiap tab diukur atas Selection segar (tanpa pengelompokan yang sudah di-memo)
+    fresh = lambda: (Selection(view.cube),)
+    pop, ts = b.run("tab_overview", lambda s: (s.popularity(TOP_N), s.trend(TOP_N)), fresh)
+    topic_df = b.run("tab_topics", Selection.topics, fresh)
+    hist = b.run("tab_tts_hist", Selection.tts_hist, fresh)
+    summary = b.run("tab_tts_summary", Selection.tts, lambda: (Selection(view.cube), TOP_N))
+    pivot = b.run("tab_fit", Selection.fit, lambda: (Selection(view.cube), TOP_N))
+    b.run("fit_routing", Selection.routing, fresh)
+    b.run("tab_summary", lambda s: (s.kpis(), s.popularity(), s.tts().head(3), s.fit_winners()), fresh)
+    b.run("query_batch", lambda e: e.query(q), lambda: (QueryEngine(cube),))
+
+    grams = pd.DataFrame(columns=["term", "freq"])
+    texts = read_table(usage_csv, kind="usage", columns=("user_text",))
+    texts = texts["user_text"] if texts is not None and "user_text" in texts.columns else None
+    if texts is not None and texts.notna().any():
+        index = b.run("ngram_index_build", build_ngram_index, lambda: (usage, texts), repeat=1)
+        sel = index.select(start, end, topics)
+        grams = b.run("ngram_index_top", lambda: index.top(sel, k=TOP_K_TERMS, exclude=index.term_mask(STOPWORDS)))
+    del texts
+
+    ngrams = ensure_ngrams_schema(read_table(paths["ngrams"], kind="ngrams"))
+    b.run("sanitize_terms", sanitize_terms, lambda: (ngrams, True, TOP_K_TERMS))
+    winrate = add_model_title(ensure_winrate_schema(read_table(paths["winrate"], kind="winrate")))
+    winrate = winrate.assign(model=winrate["model_title"].astype(str))
+
+    figures = {
+        "popularity": pop, "topics": topic_df, "trend": ts, "ngrams": grams,
+        "winrate": winrate, "tts_hist": hist, "tts_summary": summary, "heatmap": pivot,
+    }
+    for kind, data in figures.items():
+        b.run(f"figure_{kind}", build_payload, lambda kind=kind, data=data: (kind, data))
+
+
+# ----------------------- Tahap notebook -----------------------
+def bench_notebook(b: Bench, cfg: SyntheticConfig, n: int) -> None:
+    duels = generate_conversations(cfg, n)
+    df = duels.rename(columns={"model_a": "model", "conversation_a": "conversation"})[["model", "conversation"]]
+    del duels
+    derived = b.run("add_derived_columns", add_derived_columns, lambda: (df,))
+    b.run("count_ngrams", lambda: count_ngrams(derived["user_text"]).top(20))
+    b.run("compute_tts", compute_tts, lambda: (derived,))
+    b.run("solve_curve", lambda: solve_curve(derived["solve_turn"], derived["model_norm"]))
+
+
+# ----------------------- Runner & perbandingan -----------------------
+def _git_commit() -> Optional[str]:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def metadata(args: argparse.Namespace) -> Dict[str, Any]:
+    import pyarrow
+    import plotly
+
+    return {
+        "commit": _git_commit(),
+        "created": pd.Timestamp.now(tz="UTC").isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "pyarrow": pyarrow.__version__,
+        "plotly": plotly.__version__,
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "text_rows": args.text_rows,
+        "conversations": args.conversations,
+        "seed": args.seed,
+    }
+
+
+def run(scales: Sequence[str], args: argparse.Namespace) -> Dict[str, Any]:
+    b = Bench("start", 0, args.repeat)
+    b.group = "startup"
+    eager = bench_startup(b)
+    results: List[StageResult] = list(b.results)
+    for scale in scales:
+        rows = parse_scale(scale)
+        cfg = SyntheticConfig(rows=rows, seed=args.seed, text_rows=args.text_rows if rows > args.text_rows else None)
+        out_dir = Path(args.data_dir) / scale
+        print(f"[{scale}] data → {out_dir}", file=sys.stderr)
+        paths = ensure_dataset(cfg, out_dir)
+        b = Bench(scale, rows, args.repeat)
+        bench_dashboard(b, paths, out_dir)
+        b.group = "notebook"
+        bench_notebook(b, replace(cfg, text_rows=None), min(rows, args.conversations))
+        results.extend(b.results)
+    return {"meta": metadata(args), "startup": {"eager_imports": eager}, "results": [r.__dict__ for r in results]}
+
+
+def compare(old_path: Path, new_path: Path, fail_above: float) -> int:
+    """Tabel rasio waktu terbaik baru/lama per (skala, grup, tahap); exit 1 bila ada yang > `fail_above`."""
+    load = lambda p: pd.DataFrame(json.loads(Path(p).read_text(encoding="utf-8"))["results"])
+    keys = ["scale", "group", "stage"]
+    merged = load(old_path).merge(load(new_path), on=keys, how="outer", suffixes=("_old", "_new"))
+    merged["ratio"] = merged["best_s_new"] / merged["best_s_old"]
+    slow = (merged["ratio"] > fail_above) & ((merged["best_s_new"] - merged["best_s_old"]) > MIN_DELTA_S)
+    merged["flag"] = np.where(slow, "REGRESI", "")
+    cols = keys + ["best_s_old", "best_s_new", "ratio", "flag"]
+    with pd.option_context("display.max_rows", None, "display.width", 160):
+        print(merged[cols].to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    return 1 if slow.any() else 0
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m llm_analytics.bench", description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", default=",".join(DEFAULT_SCALES), help="skala dipisah koma, mis. 10k,1M,10M")
+    parser.add_argument("--out", default="bench.json", help="berkas hasil JSON")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=SyntheticConfig.seed)
+    parser.add_argument("--text-rows", type=int, default=TEXT_ROWS, help="maks. baris usage yang berisi user_text")
+    parser.add_argument("--conversations", type=int, default=CONVERSATIONS, help="maks. baris duel untuk tahap notebook")
+    parser.add_argument("--data-dir", default=str(BENCH_DIR))
+    parser.add_argument("--compare", nargs=2, metavar=("LAMA", "BARU"), help="bandingkan dua berkas hasil")
+    parser.add_argument("--fail-above", type=float, default=FAIL_ABOVE, help="rasio baru/lama yang dianggap regresi")
+    parser.add_argument(
+        "--import-budget", type=float, nargs="?", const=IMPORT_BUDGET_S, default=None, metavar="DETIK",
+        help=f"exit 1 bila impor jalur start dashboard melebihi anggaran (default {IMPORT_BUDGET_S} s) atau plotly termuat saat start",
+    )
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        return compare(Path(args.compare[0]), Path(args.compare[1]), args.fail_above)
+    report = run([s.strip() for s in args.rows.split(",") if s.strip()], args)
+    Path(args.out).write_text(json.dumps(report, indent=1), encoding="utf-8")
+    print(f"hasil → {args.out}", file=sys.stderr)
+    if args.import_budget is not None:
+        problems = check_import_budget(report, args.import_budget)
+        for p in problems:
+            print(f"ANGGARAN START: {p}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+"""Cache artefak turunan di disk (default data/cache/), dibagi notebook & dashboard.
+
+Kunci artefak = jenis + hash JSON dari bagian kunci, biasanya:
+- digest ISI berkas sumber (`file_digest`; bukan path/mtime, jadi salinan berkas
+  yang sama tetap hit dan berkas yang berubah tidak pernah basi),
+- digest konfigurasi derivasi (`derivation_config`: OK_PAT, aturan topik,
+  stopwords, alias model, versi cache).
+
+Nilai DataFrame disimpan sebagai Parquet (fallback pickle), lainnya pickle
+(cube rollup, indeks n-gram, tabel duel). Penulisan atomik (tmp + rename) sehingga
+aman dipakai beberapa worker Streamlit/kernel sekaligus. Ukuran total dibatasi
+`max_bytes`: setiap hit memperbarui mtime berkas dan yang paling lama tidak
+dipakai (LRU) dihapus lebih dulu.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import pickle
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Mapping, Optional, Tuple
+
+import pandas as pd
+
+from llm_analytics.derive import OK_PAT, TOPIC_DEFAULT
+from llm_analytics.ingest import HAS_ARROW
+
+# Naikkan bila semantik derivasi berubah agar artefak lama tidak terpakai
+CACHE_VERSION = 2
+DEFAULT_MAX_BYTES = 2 << 30
+# Akhiran berkas yang dihitung & dieviksi (".arrow" = frame memory-mapped, lihat `shared`)
+ARTIFACT_SUFFIXES = (".parquet", ".pkl", ".arrow")
+_READ_BLOCK = 1 << 20
+
+_digests: Dict[Tuple[str, int, int], str] = {}
+_digest_lock = threading.Lock()
+
+
+def _jsonable(obj: Any) -> Any:
+    if isinstance(obj, re.Pattern):
+        return {"pattern": obj.pattern, "flags": int(obj.flags)}
+    if isinstance(obj, (set, frozenset)):
+        return sorted(map(str, obj))
+    if isinstance(obj, Path):
+        return str(obj)
+    if isinstance(obj, pd.Timestamp):
+        return obj.isoformat()
+    return repr(obj)
+
+
+def config_digest(*parts: Any) -> str:
+    """Hash stabil (antar proses) dari struktur JSON-able (pola regex, set, path diperbolehkan)."""
+    raw = json.dumps(parts, sort_keys=True, default=_jsonable, ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def derivation_config(
+    rules: Optional[Mapping] = None,
+    aliases: Optional[Mapping[str, str]] = None,
+    stopwords: Optional[Iterable[str]] = None,
+    **extra: Any,
+) -> Dict[str, Any]:
+    """Konfigurasi yang memengaruhi kolom turunan; masuk ke kunci setiap artefak."""
+    from llm_analytics.topics import DEFAULT_RULES, normalize_rules
+
+    return {
+        "version": CACHE_VERSION,
+        "ok_pat": OK_PAT,
+        "topic_rules": normalize_rules(DEFAULT_RULES if rules is None else rules),
+        "topic_default": TOPIC_DEFAULT,
+        "aliases": dict(aliases or {}),
+        "stopwords": sorted(stopwords) if stopwords is not None else None,
+        **extra,
+    }
+
+
+def _files_of(path: Path) -> Iterable[Path]:
+    if path.is_dir():
+        return sorted(p for p in path.rglob("*") if p.is_file())
+    return [path]
+
+
+def file_digest(path: Path) -> str:
+    """Digest isi berkas (folder dataset: semua berkas + path relatifnya).
+
+    Dimemo per (path, mtime, ukuran) dalam proses, jadi rerun tidak membaca ulang berkas.
+    """
+    path = Path(path)
+    files = list(_files_of(path))
+    stats = [f.stat() for f in files]
+    memo = (str(path), max((s.st_mtime_ns for s in stats), default=0), sum(s.st_size for s in stats))
+    with _digest_lock:
+        if memo in _digests:
+            return _digests[memo]
+    h = hashlib.blake2b(digest_size=16)
+    for f in files:
+        if path.is_dir():
+            h.update(str(f.relative_to(path)).encode("utf-8"))
+        with open(f, "rb") as fh:
+            for block in iter(lambda: fh.read(_READ_BLOCK), b""):
+                h.update(block)
+    digest = h.hexdigest()
+    with _digest_lock:
+        _digests[memo] = digest
+    return digest
+
+
+class ArtifactCache:
+    """Penyimpanan artefak berkunci hash dengan batas ukuran (LRU via mtime)."""
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(kind: str, *parts: Any) -> str:
+        """Nama artefak: `<jenis>-<hash bagian kunci>`."""
+        return f"{kind}-{config_digest(*parts)[:24]}"
+
+    def _paths(self, key: str) -> Tuple[Path, Path]:
+        return self.root / f"{key}.parquet", self.root / f"{key}.pkl"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        for path in self._paths(key):
+            if not path.exists():
+                continue
+            try:
+                value = pd.read_parquet(path) if path.suffix == ".parquet" else pickle.loads(path.read_bytes())
+            except Exception:
+                # Berkas rusak/terpotong: anggap miss dan buang
+                path.unlink(missing_ok=True)
+                continue
+            try:
+                os.utime(path)
+            except OSError:
+                pass
+            self.record(hit=True)
+            return value
+        self.record(hit=False)
+        return default
+
+    def record(self, hit: bool) -> None:
+        """Catat hit/miss (juga dipakai penyimpanan lain di folder yang sama)."""
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+    def put(self, key: str, value: Any) -> Any:
+        """Simpan `value` (atomik) lalu jalankan eviksi; kembalikan `value`."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        parquet, pkl = self._paths(key)
+        target = pkl
+        tmp = self.root / f".{key}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            if HAS_ARROW and isinstance(value, pd.DataFrame):
+                try:
+                    value.to_parquet(tmp)
+                    target = parquet
+                except Exception:
+                    tmp.unlink(missing_ok=True)
+            if target is pkl:
+                tmp.write_bytes(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            os.replace(tmp, target)
+        except OSError:
+            # Folder read-only / disk penuh: cache hanya optimasi
+            tmp.unlink(missing_ok=True)
+            return value
+        self.evict()
+        return value
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any]) -> Any:
+        sentinel = object()
+        value = self.get(key, sentinel)
+        if value is sentinel:
+            value = self.put(key, compute())
+        return value
+
+    def entries(self) -> list:
+        """(path, ukuran, mtime) semua artefak, terlama dulu."""
+        if not self.root.is_dir():
+            return []
+        out = []
+        for p in self.root.iterdir():
+            if p.suffix in ARTIFACT_SUFFIXES and not p.name.startswith("."):
+                try:
+                    s = p.stat()
+                except OSError:
+                    continue
+                out.append((p, s.st_size, s.st_mtime_ns))
+        return sorted(out, key=lambda e: e[2])
+
+    def size(self) -> int:
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Hapus artefak paling lama tak dipakai sampai total ≤ batas; kembalikan jumlah yang dihapus."""
+        limit = self.max_bytes if max_bytes is None else max_bytes
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for path, size, _ in entries:
+            if total <= limit:
+                break
+            try:
+                path.unlink(missing_ok=True)
+            except OSError:
+                # Mis. berkas masih di-memory-map di Windows; coba lagi pada eviksi berikutnya
+                continue
+            total -= size
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        self.evict(max_bytes=0)
@@ -0,0 +1,216 @@
+"""Derivasi kolom percakapan satu-lintasan (pengganti `.apply` per baris di notebook).
+
+Percakapan (list of {role, content}) diratakan SEKALI menjadi tabel pesan kolumnar
+(row, pos, role, content). Dari tabel itu user_text, is_solved (pesan user terakhir),
+turn, metrik turn (`turns`: solve_turn, TTS eksak), dan topik dihitung dengan operasi
+string/NumPy tervektorisasi. Untuk dataset penuh, pekerjaan bisa dipecah ke process
+pool (`n_jobs`).
+"""
+from __future__ import annotations
+
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    HAS_ARROW = True
+except Exception:
+    HAS_ARROW = False
+
+# Regex proxy 'beres'
+OK_PAT = re.compile(
+    r"(thanks|thank you|terima kasih|berhasil|works|solved|mantap|fixed?|oke+|ok|done|clear|yes|sip|resolved|great|perfect)",
+    re.IGNORECASE,
+)
+
+# Aturan kategorisasi topik (urutan = prioritas)
+TOPIC_RULES = {
+    "Coding": re.compile(r"\b(code|coding|bug|function|class|method|api|regex|python|javascript|java|ts|typescript|cpp|golang|php|html|css|framework|compile|error)\b", re.I),
+    "Analisis Data": re.compile(r"\b(data|dataset|pandas|numpy|stat(istik|s)?|regression|cluster|model(ing)?|visualisasi|plot|chart|csv|etl|eda)\b", re.I),
+    "Terjemahan": re.compile(r"\b(translate|translat(e|ion)|terjemah|alih ?bahasa|english to indonesian|indonesian to english|b\.?inggris|b\.?indonesia)\b", re.I),
+    "Penulisan": re.compile(r"\b(tulis|menulis|writing|essay|artikel|copy|caption|paragraf|ringkas|rangkuman|summary|email|surat|konten)\b", re.I),
+}
+TOPIC_DEFAULT = "Lainnya"
+
+
+def non_capturing(pattern: str) -> str:
+    """Ubah grup `( ... )` menjadi `(?: ... )` (hindari peringatan & biaya capture)."""
+    return re.sub(r"(?<!\\)\((?!\?)", "(?:", pattern)
+
+
+def _lower_pattern(pat: re.Pattern) -> re.Pattern:
+    """Versi case-sensitive & non-capturing dari `pat` untuk teks yang sudah di-lowercase.
+
+    Setara dengan `re.I` karena kata kunci aturan berupa huruf kecil ASCII, tetapi jauh
+    lebih cepat (re.I mematikan pencarian literal cepat di modul `re`).
+    """
+    return re.compile(non_capturing(pat.pattern))
+
+
+_OK_LOWER = _lower_pattern(OK_PAT)
+
+MESSAGE_COLUMNS = ["row", "pos", "role", "content"]
+
+
+def normalize_model_name(m: str) -> str:
+    if m is None: return ""
+    m = str(m).strip()
+    m = m.replace(" - ", "-")
+    m = re.sub(r"\s+", " ", m)
+    return m
+
+
+def normalize_model_names(s: pd.Series) -> pd.Series:
+    """`normalize_model_name` atas nama unik saja, dipetakan balik lewat kode kategori."""
+    cat = s.astype("category")
+    names = cat.cat.categories.astype(str)
+    norm = names.str.strip().str.replace(" - ", "-", regex=False).str.replace(r"\s+", " ", regex=True)
+    out = pd.Series(np.asarray(norm, dtype=object)[cat.cat.codes.to_numpy()], index=s.index)
+    return out.where(cat.cat.codes.to_numpy() >= 0, "")
+
+
+# ----------------------- Tabel pesan -----------------------
+def _is_seq(conv) -> bool:
+    return isinstance(conv, (list, tuple, np.ndarray))
+
+
+def _flatten_arrow(values) -> Optional[pd.DataFrame]:
+    try:
+        if isinstance(values, pa.ChunkedArray):
+            values = values.combine_chunks()
+        arr = values if isinstance(values, pa.Array) else pa.array(values, from_pandas=True)
+        if not pa.types.is_list(arr.type) or not pa.types.is_struct(arr.type.value_type):
+            return None
+        if arr.offset or len(arr.values) != arr.value_lengths().fill_null(0).to_numpy().sum():
+            arr = pa.array(arr.to_pylist())  # buang slicing/offset agar flatten sejajar
+        flat = arr.flatten()
+        role = flat.field("role").to_numpy(zero_copy_only=False)
+        content = flat.field("content").to_numpy(zero_copy_only=False)
+    except Exception:
+        return None
+    lens = arr.value_lengths().fill_null(0).to_numpy()
+    return _message_frame(lens, role, content)
+
+
+def _flatten_python(values: np.ndarray) -> pd.DataFrame:
+    lens = np.zeros(len(values), dtype=np.int64)
+    role, content = [], []
+    for i, conv in enumerate(values):
+        if not _is_seq(conv):
+            continue
+        lens[i] = len(conv)
+        for msg in conv:
+            if isinstance(msg, dict):
+                role.append(msg.get("role"))
+                content.append(msg.get("content"))
+            else:
+                role.append(None)
+                content.append(None)
+    return _message_frame(lens, np.asarray(role, dtype=object), np.asarray(content, dtype=object))
+
+
+def _message_frame(lens: np.ndarray, role: np.ndarray, content: np.ndarray) -> pd.DataFrame:
+    row = np.repeat(np.arange(len(lens)), lens)
+    starts = np.repeat(np.cumsum(lens) - lens, lens)
+    return pd.DataFrame({
+        "row": row,
+        "pos": np.arange(len(row)) - starts,
+        "role": pd.Categorical(role),
+        "content": pd.Series(content, dtype=object),
+    })
+
+
+def flatten_conversations(conv) -> pd.DataFrame:
+    """Ratakan kolom percakapan → tabel pesan (row, pos, role, content), satu lintasan.
+
+    `conv` boleh Series (termasuk dtype `pd.ArrowDtype`) atau array pyarrow (mis.
+    langsung dari record batch Parquet). `row` adalah posisi baris (0..n-1) pada
+    `conv`, bukan label index.
+    """
+    if HAS_ARROW and isinstance(getattr(conv, "dtype", None), pd.ArrowDtype):
+        conv = pa.array(conv.array)
+    if HAS_ARROW and isinstance(conv, (pa.Array, pa.ChunkedArray)):
+        out = _flatten_arrow(conv)
+        return out if out is not None else _flatten_python(np.asarray(conv.to_pylist(), dtype=object))
+    values = conv.to_numpy()
+    out = _flatten_arrow(values) if HAS_ARROW else None
+    return out if out is not None else _flatten_python(values)
+
+
+def join_by_row(rows: np.ndarray, text: np.ndarray, n: int, sep: str = " ") -> np.ndarray:
+    """Gabung teks per `row` (rows terurut naik) → array panjang n ('' bila kosong)."""
+    out = np.full(n, "", dtype=object)
+    if not len(rows):
+        return out
+    bounds = np.flatnonzero(np.diff(rows)) + 1
+    starts = np.concatenate(([0], bounds))
+    ends = np.concatenate((bounds, [len(rows)]))
+    out[rows[starts]] = [sep.join(text[s:e]) for s, e in zip(starts.tolist(), ends.tolist())]
+    return out
+
+
+def conversation_lengths(conv: pd.Series) -> pd.Series:
+    """Jumlah pesan per percakapan; NaN bila bukan list."""
+    return pd.Series([len(c) if _is_seq(c) else np.nan for c in conv.to_numpy()], index=conv.index)
+
+
+def _seq_mask(conv: pd.Series) -> np.ndarray:
+    """True bila baris berisi list pesan (kolom Arrow: cukup mask null)."""
+    if isinstance(conv.dtype, pd.ArrowDtype):
+        return conv.notna().to_numpy()
+    return np.fromiter((_is_seq(c) for c in conv.to_numpy()), dtype=bool, count=len(conv))
+
+
+# ----------------------- Klasifikasi topik (vektor) -----------------------
+def topic_categories(text: pd.Series, classifier=None) -> pd.Series:
+    """Kategori topik per teks: aturan pertama yang cocok (lihat `topics.TopicClassifier`)."""
+    if classifier is None:
+        from llm_analytics.topics import default_classifier
+        classifier = default_classifier()
+    return classifier.classify(text)
+
+
+# ----------------------- Derivasi -----------------------
+def derive_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """Hitung model_norm, user_text, is_solved, topic_category, turn, solve_turn, tts dalam satu lintasan."""
+    from llm_analytics.turns import turn_metrics, turn_table
+
+    df = df.copy()
+    n = len(df)
+    msgs = flatten_conversations(df["conversation"])
+    # OK_PAT sekali per pesan user; is_solved = pesan user terakhir, plus konfirmasi pertama
+    metrics = turn_metrics(turn_table(msgs), n)
+    user = msgs[msgs["role"] == "user"]
+    content = user["content"].fillna("").astype(str)
+
+    # user_text: gabungan semua pesan user per percakapan
+    user_text = join_by_row(user["row"].to_numpy(), content.str.strip().to_numpy(), n)
+
+    lens = metrics.n_messages.astype(float)
+    invalid = ~_seq_mask(df["conversation"])
+    lens[invalid] = np.nan
+    tts = metrics.tts.copy()
+    tts[invalid] = np.nan
+
+    df["model_norm"] = normalize_model_names(df["model"])
+    df["user_text"] = user_text
+    df["is_solved"] = metrics.solved
+    df["topic_category"] = topic_categories(df["user_text"])
+    df["turn"] = lens if np.isnan(lens).any() else lens.astype(np.int64)
+    df["solve_turn"] = metrics.solve_turn
+    df["tts"] = tts
+    return df
+
+
+def add_derived_columns(df: pd.DataFrame, n_jobs: Optional[int] = None) -> pd.DataFrame:
+    """Kolom turunan notebook; `n_jobs > 1` membagi baris ke process pool."""
+    if not n_jobs or n_jobs <= 1 or len(df) < 2 * n_jobs:
+        return derive_columns(df)
+    chunks = np.array_split(np.arange(len(df)), n_jobs)
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        parts = list(pool.map(derive_columns, [df.iloc[idx] for idx in chunks]))
+    return pd.concat(parts)
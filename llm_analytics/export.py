@@ -0,0 +1,283 @@
+"""Pipeline ekspor dataset arena → data/ untuk dashboard (tanpa sampling).
+
+Sumber Parquet (cache lokal atau dataset penuh) dibaca per record batch dan
+setiap batch diproses di process pool (jumlah batch yang sedang diproses
+dibatasi, jadi memori sebanding ukuran batch, bukan ukuran dataset):
+- derivasi kolom (`derive.derive_columns` langsung atas kolom Arrow) → baris usage,
+- tabel duel (`winrate.battles_from_raw`) → battles,
+- tally wins/apps per model dan `NgramCounter` per batch → digabung di proses induk.
+
+Keluaran (semua ditulis ke folder sementara lalu diganti sekaligus):
+- usage.parquet/  dataset Parquet berpartisi hive (default date/model),
+- battles.parquet, winrate.csv, ngrams.csv (ukuran kecil, hasil gabungan),
+- routing.arrow  tabel routing topik → model tanpa filter (`fit.ROUTING_FILE`),
+  dihitung dari keluaran di atas lewat `QueryEngine`; path stabil untuk router.
+`ingest.read_table` membaca usage.parquet/ dan battles.parquet secara otomatis.
+"""
+from __future__ import annotations
+
+import os
+import shutil
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Iterator, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from llm_analytics.derive import derive_columns, normalize_model_name, normalize_model_names, topic_categories
+from llm_analytics.fit import ROUTING_FILE
+from llm_analytics.ngrams import STOPWORDS, NgramCounter
+from llm_analytics.query import QueryEngine
+from llm_analytics.stats import wilson_interval
+from llm_analytics.winrate import battles_from_raw
+
+BATCH_ROWS = 8_192
+SYNTHETIC_DAYS = 90
+RANDOM_SEED = 42
+PARTITION_COLUMNS = ("date", "model")
+# Batas partisi per batch tulis (min.) & berkas terbuka bersamaan untuk dataset usage berpartisi
+MAX_PARTITIONS = 1024
+MAX_OPEN_FILES = 512
+NGRAM_TOP_K = 20
+
+CONVERSATION_COLUMNS = ["model_a", "model_b", "conversation_a", "conversation_b"]
+PAIRWISE_COLUMNS = ["model_a", "model_b", "prompt", "winner_model_a", "winner_model_b", "winner_tie"]
+WINNER_COLUMNS = ["winner", "winner_model", "winner_model_a", "winner_model_b", "winner_tie"]
+
+USAGE_SCHEMA = pa.schema([
+    ("date", pa.string()),
+    ("model", pa.string()),
+    ("user_text", pa.string()),
+    ("topic", pa.string()),
+    ("tts", pa.float32()),
+    ("is_solved", pa.int8()),
+    ("fit_score", pa.float32()),
+])
+BATTLES_SCHEMA = pa.schema([
+    ("date", pa.string()),
+    ("model_a", pa.string()),
+    ("model_b", pa.string()),
+    ("winner", pa.string()),
+    ("topic", pa.string()),
+])
+
+
+@dataclass
+class ExportResult:
+    battles: int
+    usage_rows: int
+    models: int
+    terms: int
+    out_dir: Path
+    routing: Optional[Path] = None
+
+
+def detect_schema(columns: Sequence[str]) -> str:
+    cols = set(columns)
+    if set(CONVERSATION_COLUMNS).issubset(cols):
+        return "conversation"
+    if set(PAIRWISE_COLUMNS).issubset(cols):
+        return "pairwise"
+    raise ValueError("Skema dataset tidak dikenali: kolom kunci tidak lengkap.")
+
+
+def synthetic_dates(n: int, batch_no: int, days: int, seed: int, today: date) -> np.ndarray:
+    """Tanggal sintetis per duel (deterministik per (seed, batch), tanpa loop Python)."""
+    rng = np.random.default_rng([seed, batch_no])
+    offsets = rng.integers(0, max(0, days) + 1, size=n)
+    return (np.datetime64(today, "D") - offsets.astype("timedelta64[D]")).astype(str)
+
+
+def _sides(batch: pa.RecordBatch, schema: str) -> list:
+    """Kolom turunan per sisi (a, b) yang sejajar baris duel."""
+    sides = []
+    if schema == "conversation":
+        for side in ("a", "b"):
+            conv = batch.column(f"conversation_{side}")
+            df = pd.DataFrame({
+                "model": batch.column(f"model_{side}").to_pandas(),
+                "conversation": pd.Series(pd.arrays.ArrowExtensionArray(conv)),
+            })
+            out = derive_columns(df)
+            out["keep"] = out["model"].notna().to_numpy() & conv.is_valid().to_numpy(zero_copy_only=False)
+            sides.append(out.drop(columns="conversation"))
+        return sides
+    # Pairwise: satu prompt + satu respons per sisi → turn = 2, is_solved = menang (seri → 0)
+    frame = batch.to_pandas()
+    prompt = frame["prompt"].astype(str)
+    topic = topic_categories(prompt)
+    tie = pd.to_numeric(frame["winner_tie"], errors="coerce").fillna(0).to_numpy() == 1
+    for side in ("a", "b"):
+        won = pd.to_numeric(frame[f"winner_model_{side}"], errors="coerce").fillna(0).to_numpy() == 1
+        sides.append(pd.DataFrame({
+            "model": frame[f"model_{side}"],
+            "model_norm": normalize_model_names(frame[f"model_{side}"]),
+            "user_text": prompt,
+            "is_solved": won & ~tie,
+            "topic_category": topic,
+            "turn": 2,
+            "tts": 2.0,
+            "keep": frame[f"model_{side}"].notna().to_numpy(),
+        }))
+    return sides
+
+
+def process_batch(batch: pa.RecordBatch, batch_no: int, schema: str, days: int, seed: int, today: date, max_n: int = 2):
+    """Satu record batch → (tabel usage Arrow, tabel battles Arrow, tally per model, NgramCounter)."""
+    n = batch.num_rows
+    dates = synthetic_dates(n, batch_no, days, seed, today)
+    a, b = _sides(batch, schema)
+
+    # Battles: satu baris per duel, tanggal & topik dari sisi model_a
+    winner_cols = [c for c in WINNER_COLUMNS if c in batch.schema.names]
+    if winner_cols:
+        raw = batch.select(["model_a", "model_b"] + winner_cols).to_pandas()
+        battles = battles_from_raw(raw, normalize=normalize_model_name)
+        battles_tbl = pa.table({
+            "date": dates,
+            "model_a": battles["model_a"].astype(str).to_numpy(),
+            "model_b": battles["model_b"].astype(str).to_numpy(),
+            "winner": battles["winner"].astype(str).to_numpy(),
+            "topic": a["topic_category"].astype(str).to_numpy(),
+        }, schema=BATTLES_SCHEMA)
+    else:
+        battles_tbl = BATTLES_SCHEMA.empty_table()
+
+    # Usage: baris sisi a lalu sisi b (urutan sama dengan long format notebook)
+    long = pd.concat([a.assign(date=dates), b.assign(date=dates)], ignore_index=True)
+    long = long[long["keep"]]
+    # TTS eksak (pesan sampai konfirmasi 'beres' pertama; tanpa konfirmasi = panjang percakapan)
+    tts = pd.to_numeric(long["tts"], errors="coerce").fillna(2).clip(lower=1)
+    solved = long["is_solved"].astype(np.int8).to_numpy()
+    usage = pa.table({
+        "date": long["date"].to_numpy(),
+        "model": long["model_norm"].astype(str).to_numpy(),
+        "user_text": long["user_text"].astype(str).to_numpy(),
+        "topic": long["topic_category"].astype(str).to_numpy(),
+        "tts": tts.to_numpy(dtype=np.float32),
+        "is_solved": solved,
+        "fit_score": (solved * 100).astype(np.float32),
+    }, schema=USAGE_SCHEMA)
+
+    tally = (
+        pd.DataFrame({"model": usage.column("model").to_numpy(zero_copy_only=False), "wins": solved})
+        .groupby("model", sort=False)["wins"].agg(["sum", "size"])
+        .rename(columns={"sum": "wins", "size": "apps"})
+    )
+    counter = NgramCounter(max_n=max_n, stopwords=STOPWORDS)
+    counter.update(long["user_text"].astype(str))
+    return usage, battles_tbl, tally, counter
+
+
+def _process_args(args):
+    return process_batch(*args)
+
+
+def _results(source: Path, schema: str, batch_rows: int, n_jobs: int, days: int, seed: int, today: date) -> Iterator[tuple]:
+    """Hasil per batch (berurutan); paling banyak 2×n_jobs batch diproses bersamaan."""
+    pf = pq.ParquetFile(source)
+    cols = CONVERSATION_COLUMNS if schema == "conversation" else PAIRWISE_COLUMNS
+    cols = cols + [c for c in WINNER_COLUMNS if c in pf.schema_arrow.names and c not in cols]
+    tasks = ((batch, i, schema, days, seed, today) for i, batch in enumerate(pf.iter_batches(batch_size=batch_rows, columns=cols)))
+    if n_jobs <= 1:
+        for task in tasks:
+            yield process_batch(*task)
+        return
+    with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+        pending: deque = deque()
+        for task in tasks:
+            pending.append(pool.submit(_process_args, task))
+            if len(pending) >= 2 * n_jobs:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _discard(path: Path) -> None:
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def _replace(tmp: Path, target: Path) -> None:
+    _discard(target)
+    os.replace(tmp, target)
+
+
+def export_dataset(
+    source: Path,
+    out_dir: Path,
+    batch_rows: int = BATCH_ROWS,
+    n_jobs: Optional[int] = None,
+    days: int = SYNTHETIC_DAYS,
+    seed: int = RANDOM_SEED,
+    partition_cols: Sequence[str] = PARTITION_COLUMNS,
+    top_k: int = NGRAM_TOP_K,
+    today: Optional[date] = None,
+    routing: bool = True,
+) -> ExportResult:
+    """Ekspor penuh `source` (Parquet) → out_dir/{usage.parquet/, battles.parquet, winrate.csv, ngrams.csv, routing.arrow}."""
+    source, out_dir = Path(source), Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    schema = detect_schema(pq.read_schema(source).names)
+    n_jobs = n_jobs or os.cpu_count() or 1
+    today = today or date.today()
+
+    usage_tmp = out_dir / "usage.parquet.tmp"
+    battles_tmp = out_dir / "battles.parquet.tmp"
+    _discard(usage_tmp)
+    tally = pd.DataFrame(columns=["wins", "apps"], dtype="int64")
+    counter = NgramCounter(max_n=2, stopwords=STOPWORDS)
+    n_battles = n_usage = 0
+
+    try:
+        with pq.ParquetWriter(battles_tmp, BATTLES_SCHEMA) as battles_writer:
+
+            def usage_batches() -> Iterator[pa.RecordBatch]:
+                nonlocal tally, n_battles, n_usage
+                for usage, battles, part, part_counter in _results(source, schema, batch_rows, n_jobs, days, seed, today):
+                    battles_writer.write_table(battles)
+                    tally = tally.add(part, fill_value=0)
+                    counter.merge(part_counter)
+                    n_battles += battles.num_rows
+                    n_usage += usage.num_rows
+                    yield from usage.to_batches()
+
+            ds.write_dataset(
+                usage_batches(),
+                usage_tmp,
+                schema=USAGE_SCHEMA,
+                format="parquet",
+                partitioning=ds.partitioning(pa.schema([USAGE_SCHEMA.field(c) for c in partition_cols]), flavor="hive"),
+                basename_template="part-{i}.parquet",
+                existing_data_behavior="overwrite_or_ignore",
+                # Satu batch usage (≤ 2×batch_rows baris) paling banyak menyentuh partisi sebanyak barisnya;
+                # batas bawaan pyarrow (1024) sudah terlewati oleh ±12 model × 90 hari
+                max_partitions=max(MAX_PARTITIONS, 2 * batch_rows),
+                max_open_files=MAX_OPEN_FILES,
+            )
+
+        _replace(usage_tmp, out_dir / "usage.parquet")
+        _replace(battles_tmp, out_dir / "battles.parquet")
+    finally:
+        # Ekspor gagal → jangan tinggalkan keluaran setengah jadi di out_dir
+        _discard(usage_tmp)
+        _discard(battles_tmp)
+
+    wr = tally.astype("int64").rename_axis("model").reset_index()
+    wr["win_rate"], wr["wr_lo"], wr["wr_hi"] = wilson_interval(wr["wins"], wr["apps"])
+    wr.to_csv(out_dir / "winrate.csv", index=False)
+    terms = counter.top(top_k)
+    terms.to_csv(out_dir / "ngrams.csv", index=False)
+    routing_path = QueryEngine.from_dir(out_dir).export_routing(out_dir / ROUTING_FILE) if routing else None
+    return ExportResult(
+        battles=n_battles, usage_rows=n_usage, models=len(wr), terms=len(terms), out_dir=out_dir, routing=routing_path,
+    )
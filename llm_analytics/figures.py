@@ -0,0 +1,278 @@
+"""Figur Plotly ringkas untuk dashboard: data dikurangi di server, array dikirim biner.
+
+- Tren harian di-resample otomatis ke mingguan/bulanan bila jumlah titik
+  (tanggal × seri) melewati `POINT_BUDGET`.
+- Histogram TTS di-bin di server (`prebin`, bin selebar bilangan bulat) dan
+  dikirim sebagai batang; browser tidak menerima nilai mentah.
+- `compact` mengubah figur menjadi payload dict dengan array numerik/tanggal
+  sebagai typed array base64 (`{"dtype", "bdata", "shape"}`, didukung plotly.js
+  bawaan Streamlit). Payload ini kecil & mudah di-cache (`st.cache_data`) per
+  kunci view, lalu dibungkus `PayloadFigure` saat dikirim sehingga tidak
+  divalidasi/diserialisasi ulang setiap rerun.
+
+Builder di `FIGURES` menerima tabel hasil view (kecil) dan mengembalikan `go.Figure`.
+Plotly baru diimpor saat figur pertama dibangun (`_plotly`), jadi mengimpor modul
+ini — dan menyajikan payload yang sudah di-cache — tidak memuat plotly.express.
+"""
+from __future__ import annotations
+
+import base64
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
+
+# Batas titik per chart garis sebelum resample (tanggal × seri)
+POINT_BUDGET = 3_000
+# Urutan resolusi tren: (frekuensi periode pandas, judul sumbu)
+TREND_FREQS = (("D", "Tanggal"), ("W", "Minggu"), ("M", "Bulan"))
+HIST_BINS = 20
+
+# dtype numpy → dtype typed array plotly.js
+_TYPED = {
+    np.dtype("int8"): "i1", np.dtype("uint8"): "u1",
+    np.dtype("int16"): "i2", np.dtype("uint16"): "u2",
+    np.dtype("int32"): "i4", np.dtype("uint32"): "u4",
+    np.dtype("float32"): "f4", np.dtype("float64"): "f8",
+}
+_ARRAY_KEYS = {"x", "y", "z", "width", "base", "array", "arrayminus", "customdata"}
+
+
+def _plotly():
+    """(plotly.express, plotly.graph_objects), diimpor saat pertama dibutuhkan."""
+    import plotly.express as px
+    import plotly.graph_objects as go
+    return px, go
+
+
+# ----------------------- Reduksi data -----------------------
+def resample_counts(ts: pd.DataFrame, budget: int = POINT_BUDGET) -> Tuple[pd.DataFrame, str]:
+    """(date, model, count) → resolusi terhalus yang muat dalam `budget` titik; kembalikan (frame, judul sumbu)."""
+    if ts.empty:
+        return ts, TREND_FREQS[0][1]
+    n_series = max(ts["model"].nunique(), 1)
+    dates = pd.to_datetime(ts["date"])
+    for freq, label in TREND_FREQS:
+        bucket = dates.dt.to_period(freq)
+        if bucket.nunique() * n_series <= budget:
+            break
+    if freq == "D":
+        return ts, label
+    out = (
+        ts.assign(date=bucket.dt.start_time)
+        .groupby(["date", "model"], observed=True, sort=True)["count"].sum()
+        .reset_index()
+    )
+    return out, label
+
+
+def prebin(values: np.ndarray, weights: np.ndarray, nbins: int = HIST_BINS) -> Tuple[np.ndarray, np.ndarray, float]:
+    """Histogram berbobot di server: (pusat bin, jumlah, lebar); bin bilangan bulat bila data bulat."""
+    values = np.asarray(values, dtype="float64")
+    weights = np.asarray(weights, dtype="float64")
+    ok = np.isfinite(values)
+    values, weights = values[ok], weights[ok]
+    if not len(values):
+        return np.empty(0), np.empty(0), 1.0
+    lo, hi = values.min(), values.max()
+    integral = np.all(values == np.round(values))
+    if integral:
+        width = float(max(1, int(np.ceil((hi - lo + 1) / nbins))))
+        edges = np.arange(lo - 0.5, hi + 0.5 + width, width)
+    else:
+        edges = np.histogram_bin_edges(values, bins=nbins, range=(lo, hi if hi > lo else lo + 1))
+        width = float(edges[1] - edges[0])
+    counts, edges = np.histogram(values, bins=edges, weights=weights)
+    if np.all(weights == np.round(weights)):
+        counts = counts.round().astype(np.int64)
+    return (edges[:-1] + edges[1:]) / 2, counts, width
+
+
+# ----------------------- Payload ringkas -----------------------
+def typed_array(values: Any) -> Any:
+    """Array numerik/tanggal → spesifikasi typed array plotly.js; selain itu dikembalikan apa adanya."""
+    if isinstance(values, (list, tuple)):
+        if not values or not all(isinstance(v, (int, float, np.number)) and not isinstance(v, bool) for v in values):
+            return values
+        values = np.asarray(values)
+    if not isinstance(values, np.ndarray) or values.ndim not in (1, 2) or values.dtype.kind not in "iufbM":
+        return values
+    if values.dtype.kind == "M":
+        # Tanggal → milidetik epoch (sumbu bertipe date menafsirkannya sebagai waktu)
+        values = values.astype("datetime64[ms]").astype("int64").astype("float64")
+    elif values.dtype.kind == "b":
+        values = values.astype("uint8")
+    elif values.dtype not in _TYPED:
+        small = values.dtype.kind in "iu" and len(values) and np.abs(values).max() < 2**31
+        values = values.astype("int32" if small or not len(values) else "float64")
+    values = np.ascontiguousarray(values)
+    spec = {"dtype": _TYPED[values.dtype], "bdata": base64.b64encode(values.tobytes()).decode("ascii")}
+    if values.ndim == 2:
+        spec["shape"] = f"{values.shape[0]},{values.shape[1]}"
+    return spec
+
+
+def _axis_name(ref: str, letter: str) -> str:
+    return f"{letter}axis{ref[1:]}"
+
+
+def _compact_trace(trace: Dict[str, Any], layout: Dict[str, Any]) -> Dict[str, Any]:
+    out = {}
+    for k, v in trace.items():
+        if isinstance(v, dict):
+            out[k] = _compact_trace(v, layout)
+            continue
+        if k in ("x", "y") and isinstance(v, np.ndarray) and v.dtype.kind == "M":
+            axis = _axis_name(trace.get(f"{k}axis", k), k)
+            layout.setdefault(axis, {})["type"] = "date"
+        out[k] = typed_array(v) if k in _ARRAY_KEYS else v
+    return out
+
+
+def compact(fig: go.Figure) -> Dict[str, Any]:
+    """Figur → payload dict siap kirim (typed array untuk kolom numerik & tanggal)."""
+    d = fig.to_dict()
+    layout = d.get("layout", {})
+    d["data"] = [_compact_trace(t, layout) for t in d.get("data", [])]
+    d["layout"] = layout
+    return d
+
+
+@lru_cache(maxsize=None)
+def _payload_class() -> type:
+    _, go = _plotly()
+
+    class PayloadFigure(go.Figure):
+        """`go.Figure` tipis di atas payload `compact`: `to_dict()` mengembalikan payload apa adanya.
+
+        `st.plotly_chart` memanggil `to_dict()` lalu langsung men-JSON-kan hasilnya tanpa
+        validasi ulang, sehingga typed array lolos dan tidak ada konversi array per rerun.
+        """
+
+        def __init__(self, payload: Dict[str, Any]):
+            super().__init__()
+            self._payload = payload
+
+        def to_dict(self) -> Dict[str, Any]:
+            return self._payload
+
+    return PayloadFigure
+
+
+def payload_figure(payload: Dict[str, Any]) -> go.Figure:
+    """Bungkus payload untuk `st.plotly_chart` (kelas `PayloadFigure` dibuat saat pertama dipakai)."""
+    return _payload_class()(payload)
+
+
+def preload() -> None:
+    """Impor plotly & siapkan `PayloadFigure` lebih awal (mis. di thread pemanasan)."""
+    _payload_class()
+
+
+def __getattr__(name: str) -> Any:
+    # Kompatibilitas: `from llm_analytics.figures import PayloadFigure` tetap bekerja
+    if name == "PayloadFigure":
+        return _payload_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# ----------------------- Builder per chart -----------------------
+def count_bars(df: pd.DataFrame, x: str = "model", bargap: Optional[float] = 0.2) -> go.Figure:
+    px, _ = _plotly()
+    fig = px.bar(df, x=x, y="count", text="count")
+    fig.update_layout(xaxis_title="", yaxis_title="Jumlah Interaksi", bargap=bargap)
+    return fig
+
+
+def trend_lines(ts: pd.DataFrame, budget: int = POINT_BUDGET) -> go.Figure:
+    """Garis jumlah interaksi per model; resolusi mengikuti `resample_counts`."""
+    ts, label = resample_counts(ts, budget)
+    px, _ = _plotly()
+    fig = px.line(ts, x="date", y="count", color="model")
+    fig.update_layout(xaxis_title=label, yaxis_title="Jumlah Interaksi")
+    return fig
+
+
+def term_bars(grams: pd.DataFrame) -> go.Figure:
+    px, _ = _plotly()
+    fig = px.bar(grams.sort_values("freq"), x="freq", y="term", orientation="h", text="freq")
+    fig.update_layout(xaxis_title="Frekuensi", yaxis_title="", margin=dict(l=10, r=10, t=40, b=20))
+    return fig
+
+
+def winrate_bars(wr: pd.DataFrame) -> go.Figure:
+    """Batang win-rate + error bar asimetris Wilson (kolom win_rate, wr_lo, wr_hi)."""
+    _, go = _plotly()
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        x=wr["model"], y=wr["win_rate"],
+        name="Win-Rate",
+        text=(wr["win_rate"]*100).round(1).astype(str) + "%",
+        hovertemplate="Model=%{x}<br>Win-Rate=%{y:.3f}<extra></extra>",
+        error_y=dict(
+            type="data", symmetric=False,
+            array=(wr["wr_hi"] - wr["win_rate"]).clip(lower=0),
+            arrayminus=(wr["win_rate"] - wr["wr_lo"]).clip(lower=0),
+            thickness=1.5,
+            width=3,
+        ),
+    ))
+    fig.update_yaxes(title_text="Win-Rate", tickformat=".0%")
+    fig.update_layout(barmode="group", xaxis_title="", margin=dict(l=10, r=10, t=40, b=20))
+    return fig
+
+
+def tts_hist(hist: pd.DataFrame, nbins: int = HIST_BINS) -> go.Figure:
+    """Histogram TTS yang sudah di-bin di server dari (tts, count) cube."""
+    centers, counts, width = prebin(hist["tts"].to_numpy(), hist["count"].to_numpy(), nbins)
+    _, go = _plotly()
+    fig = go.Figure(go.Bar(
+        x=centers, y=counts, width=width,
+        hovertemplate="TTS=%{x}<br>Jumlah=%{y}<extra></extra>",
+    ))
+    fig.update_layout(xaxis_title="TTS", yaxis_title="Jumlah", bargap=0)
+    return fig
+
+
+def tts_bars(summary: pd.DataFrame) -> go.Figure:
+    _, go = _plotly()
+    fig = go.Figure(data=[
+        go.Bar(name="Median", x=summary["model"], y=summary["median"]),
+        go.Bar(name="p75", x=summary["model"], y=summary["p75"]),
+    ])
+    fig.update_layout(barmode="group", yaxis_title="TTS", xaxis_title="")
+    return fig
+
+
+def solved_heatmap(pivot: pd.DataFrame) -> go.Figure:
+    px, _ = _plotly()
+    return px.imshow(
+        pivot,
+        aspect="auto",
+        color_continuous_scale="Blues",
+        labels=dict(x="Model", y="Topik", color="Solved Rate"),
+        zmin=0, zmax=1,
+    )
+
+
+FIGURES: Dict[str, Callable[..., go.Figure]] = {
+    "popularity": count_bars,
+    "topics": lambda df: count_bars(df, x="topic", bargap=None),
+    "trend": trend_lines,
+    "ngrams": term_bars,
+    "winrate": winrate_bars,
+    "tts_hist": tts_hist,
+    "tts_summary": tts_bars,
+    "heatmap": solved_heatmap,
+}
+
+
+def build_payload(kind: str, data: pd.DataFrame, **params: Any) -> Optional[Dict[str, Any]]:
+    """Payload ringkas untuk chart `kind` (None bila data kosong)."""
+    if data is None or data.empty:
+        return None
+    return compact(FIGURES[kind](data, **params))
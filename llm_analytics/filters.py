@@ -0,0 +1,81 @@
+"""Indeks filter: rentang tanggal via binary search + posisi baris per topik.
+
+`FilterIndex` dibangun sekali per tabel (cube atau usage mentah). Seleksi
+mengembalikan array posisi baris (naik), bukan salinan frame:
+- rentang tanggal → `searchsorted` pada tanggal yang sudah terurut,
+- topik → gabungan array posisi per topik yang dipotong ke rentang tanggal.
+Baris dengan tanggal kosong (NaT) ikut hanya bila tidak ada filter tanggal.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class FilterIndex:
+    dates: np.ndarray                # datetime64[ns], urut naik, NaT di akhir
+    n_valid: int                     # jumlah tanggal non-NaT
+    order: Optional[np.ndarray]      # posisi asli per posisi terurut; None bila sudah urut
+    topic_rows: Dict[str, np.ndarray]  # topik → posisi terurut (naik)
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    def select(
+        self,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        topics: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """Posisi baris (asli, naik) yang lolos filter tanggal [start, end] & topik."""
+        lo, hi = 0, len(self.dates)
+        if start is not None and end is not None:
+            valid = self.dates[:self.n_valid]
+            lo = int(np.searchsorted(valid, np.datetime64(pd.Timestamp(start), "ns"), side="left"))
+            hi = int(np.searchsorted(valid, np.datetime64(pd.Timestamp(end), "ns"), side="right"))
+        if topics:
+            parts = []
+            for t in topics:
+                rows = self.topic_rows.get(str(t))
+                if rows is not None:
+                    parts.append(rows[np.searchsorted(rows, lo):np.searchsorted(rows, hi)])
+            pos = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.int64)
+        else:
+            pos = np.arange(lo, hi, dtype=np.int64)
+        if self.order is None:
+            return pos
+        return np.sort(self.order[pos])
+
+
+def build_filter_index(dates: pd.Series, topics: pd.Series) -> FilterIndex:
+    """Bangun indeks dari kolom tanggal & topik yang sejajar (panjang sama)."""
+    d = pd.to_datetime(dates).to_numpy(dtype="datetime64[ns]")
+    nat = np.isnat(d)
+    # Urutkan tanggal (stabil), NaT ditaruh di akhir
+    key = np.where(nat, np.datetime64(np.iinfo(np.int64).max, "ns"), d)
+    order = np.argsort(key, kind="stable")
+    if np.array_equal(order, np.arange(len(d))):
+        order = None
+    sorted_dates = d if order is None else d[order]
+
+    topic = topics.astype("category")
+    codes = topic.cat.codes.to_numpy()
+    if order is not None:
+        codes = codes[order]
+    by_code = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[by_code], np.arange(len(topic.cat.categories) + 1))
+    topic_rows = {
+        str(cat): by_code[bounds[i]:bounds[i + 1]].astype(np.int64)
+        for i, cat in enumerate(topic.cat.categories)
+        if bounds[i + 1] > bounds[i]
+    }
+    return FilterIndex(
+        dates=sorted_dates,
+        n_valid=int((~nat).sum()),
+        order=order,
+        topic_rows=topic_rows,
+    )
@@ -0,0 +1,195 @@
+"""Fit-for-Purpose: matriks padat topik × model sekali per filter.
+
+    fm = build_fit_matrix(cube.keys)          # satu bincount atas kode topik & model
+    fm.heatmap(top_n=10)                      # solved-rate topik × model (tab heatmap)
+    fm.leaders()                              # juara per topik: batas bawah Wilson, N ≥ 30
+    fm.routing_table()                        # topik → model terurut (untuk router)
+
+`count`, `solved_sum`, `solved_n` disimpan sebagai array NumPy (T × M) yang
+diindeks kode kategori topik & model; heatmap, juara, dan tabel routing hanya
+membaca array tersebut, jadi tidak ada groupby kedua per tab.
+
+Juara & routing mengikuti gerbang notebook (`MIN_N_LEADER`): hanya pasangan
+dengan cukup label solved (`solved_n`) yang ikut, lalu diurutkan menurut batas
+bawah Wilson (bukan rata-rata mentah) agar model dengan sampel kecil tidak
+menang karena kebetulan. Grup topik `ROUTE_ANY` berisi urutan lintas topik
+sebagai fallback router.
+
+Tabel routing TANPA filter ditulis ke path stabil `data/routing.arrow`
+(`ROUTING_FILE`, di luar cache artefak jadi tidak pernah dieviksi) oleh langkah
+ekspor (`export.export_dataset`) atau `python -m llm_analytics.fit --data-dir data`,
+lalu dibaca router lewat `load_routing` (memory-map, tanpa salinan). Dashboard
+hanya menampilkan tabel untuk filter aktif; ia tidak menulis artefak.
+"""
+from __future__ import annotations
+
+import argparse
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from llm_analytics.ingest import HAS_ARROW
+from llm_analytics.shared import ARROW_SUFFIX, map_frame, write_frame
+from llm_analytics.stats import wilson_interval
+
+# Ambang N (label solved) untuk juara per topik & tabel routing — sama dengan notebook
+MIN_N_LEADER = 30
+# Nama grup topik berisi urutan model lintas topik (fallback router)
+ROUTE_ANY = "*"
+# Nama berkas tabel routing (tanpa filter) di folder data; path stabil untuk router
+ROUTING_FILE = f"routing{ARROW_SUFFIX}"
+ROUTING_COLUMNS = ["topic", "rank", "model", "n", "solved_rate", "solved_lo", "solved_hi"]
+
+
+@dataclass(frozen=True)
+class FitMatrix:
+    """Hitungan padat topik × model (baris = `topics`, kolom = `models`)."""
+
+    topics: np.ndarray
+    models: np.ndarray
+    count: np.ndarray
+    solved_sum: np.ndarray
+    solved_n: np.ndarray
+
+    @property
+    def empty(self) -> bool:
+        return self.count.size == 0 or not self.count.any()
+
+    @property
+    def rate(self) -> np.ndarray:
+        """Solved-rate per sel (NaN bila tak ada label)."""
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(self.solved_n > 0, self.solved_sum / np.maximum(self.solved_n, 1), np.nan)
+
+    def top_models(self, top_n: Optional[int]) -> np.ndarray:
+        """Indeks kolom top-N model menurut jumlah interaksi (urutan kolom dipertahankan)."""
+        if top_n is None or top_n >= len(self.models):
+            return np.arange(len(self.models))
+        totals = self.count.sum(axis=0)
+        return np.sort(np.argsort(-totals, kind="stable")[:top_n])
+
+    def heatmap(self, top_n: Optional[int] = None) -> pd.DataFrame:
+        """Solved-rate topik × model; kolom = top-N model, baris = topik yang punya data (urut nama)."""
+        cols = self.top_models(top_n)
+        rows = np.flatnonzero(self.count[:, cols].any(axis=1))
+        rows = rows[np.argsort(self.topics[rows], kind="stable")]
+        return pd.DataFrame(
+            self.rate[np.ix_(rows, cols)],
+            index=pd.Index(self.topics[rows], name="topic"),
+            columns=pd.Index(self.models[cols], name="model"),
+        )
+
+    def ranked(self, min_n: int = MIN_N_LEADER, z: float = 1.96) -> pd.DataFrame:
+        """Semua pasangan dengan `solved_n` ≥ `min_n`, per topik diurutkan menurut batas bawah Wilson."""
+        t, m = np.nonzero((self.solved_n >= max(min_n, 1)) & (self.count > 0))
+        n = self.solved_n[t, m]
+        p, lo, hi = wilson_interval(self.solved_sum[t, m], n, z)
+        # Seri: rate lalu N lebih besar menang
+        order = np.lexsort((-n, -p, -lo, t))
+        t, m, n, p, lo, hi = t[order], m[order], n[order], p[order], lo[order], hi[order]
+        start = np.r_[0, np.flatnonzero(np.diff(t)) + 1]
+        rank = np.arange(len(t)) - np.repeat(start, np.diff(np.r_[start, len(t)])) + 1
+        return pd.DataFrame({
+            "topic": self.topics[t],
+            "rank": rank.astype(np.int32),
+            "model": self.models[m],
+            "n": n.astype(np.int64),
+            "solved_rate": p,
+            "solved_lo": lo,
+            "solved_hi": hi,
+        })
+
+    def leaders(self, min_n: int = MIN_N_LEADER, z: float = 1.96) -> pd.DataFrame:
+        """Juara per topik (rank 1 dari `ranked`); topik tanpa model ber-N cukup tidak muncul."""
+        out = self.ranked(min_n, z)
+        out = out[out["rank"] == 1].drop(columns="rank")
+        return out.sort_values("topic", kind="stable").reset_index(drop=True)
+
+    def overall(self) -> "FitMatrix":
+        """Matriks satu baris (`ROUTE_ANY`) = jumlah semua topik."""
+        return FitMatrix(
+            topics=np.array([ROUTE_ANY], dtype=object),
+            models=self.models,
+            count=self.count.sum(axis=0, keepdims=True),
+            solved_sum=self.solved_sum.sum(axis=0, keepdims=True),
+            solved_n=self.solved_n.sum(axis=0, keepdims=True),
+        )
+
+    def routing_table(self, min_n: int = MIN_N_LEADER, z: float = 1.96, per_topic: Optional[int] = None) -> pd.DataFrame:
+        """Topik → model terurut (rank 1 = terbaik) + baris fallback `ROUTE_ANY`; ringkas & bertipe."""
+        out = pd.concat([self.ranked(min_n, z), self.overall().ranked(min_n, z)], ignore_index=True)
+        if per_topic is not None:
+            out = out[out["rank"] <= per_topic].reset_index(drop=True)
+        for col in ("topic", "model"):
+            out[col] = out[col].astype(str).astype("category")
+        return out[ROUTING_COLUMNS]
+
+
+def build_fit_matrix(keys: pd.DataFrame) -> FitMatrix:
+    """Matriks dari baris kunci cube (kolom topic & model categorical + count/solved_sum/solved_n)."""
+    topic = keys["topic"].astype("category") if not isinstance(keys["topic"].dtype, pd.CategoricalDtype) else keys["topic"]
+    model = keys["model"].astype("category") if not isinstance(keys["model"].dtype, pd.CategoricalDtype) else keys["model"]
+    t_codes = topic.cat.codes.to_numpy().astype(np.int64)
+    m_codes = model.cat.codes.to_numpy().astype(np.int64)
+    ok = (t_codes >= 0) & (m_codes >= 0)
+    n_t, n_m = len(topic.cat.categories), len(model.cat.categories)
+    flat = t_codes[ok] * n_m + m_codes[ok]
+
+    def dense(col: str) -> np.ndarray:
+        w = keys[col].to_numpy(dtype=np.float64)[ok]
+        return np.bincount(flat, weights=w, minlength=n_t * n_m).astype(np.int64).reshape(n_t, n_m)
+
+    count, solved_sum, solved_n = dense("count"), dense("solved_sum"), dense("solved_n")
+    # Buang kategori tanpa data (kategori ikut terbawa saat cube dipotong)
+    rows, cols = np.flatnonzero(count.any(axis=1)), np.flatnonzero(count.any(axis=0))
+    pick = np.ix_(rows, cols)
+    return FitMatrix(
+        topics=topic.cat.categories.astype(str).to_numpy(dtype=object)[rows],
+        models=model.cat.categories.astype(str).to_numpy(dtype=object)[cols],
+        count=count[pick],
+        solved_sum=solved_sum[pick],
+        solved_n=solved_n[pick],
+    )
+
+
+# ----------------------- Artefak routing -----------------------
+def export_routing(table: pd.DataFrame, path: Path) -> Optional[Path]:
+    """Tulis tabel routing ke `path` sebagai Arrow IPC (atomik); None bila Arrow tak tersedia/gagal tulis."""
+    if not HAS_ARROW:
+        return None
+    try:
+        return write_frame(table.reset_index(drop=True), Path(path))
+    except (OSError, TypeError, ValueError):
+        return None
+
+
+def load_routing(path: Path) -> pd.DataFrame:
+    """Memory-map tabel routing hasil `export_routing` (read-only, berbagi halaman antar proses)."""
+    return map_frame(path)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from llm_analytics.query import QueryEngine
+
+    parser = argparse.ArgumentParser(prog="python -m llm_analytics.fit", description="Tulis tabel routing (tanpa filter) ke data/routing.arrow")
+    parser.add_argument("--data-dir", default="data", help="folder data dashboard (usage/battles/winrate)")
+    parser.add_argument("--out", default=None, help=f"berkas keluaran (default <data-dir>/{ROUTING_FILE})")
+    parser.add_argument("--min-n", type=int, default=MIN_N_LEADER)
+    parser.add_argument("--per-topic", type=int, default=None, help="maks. model per topik")
+    args = parser.parse_args(argv)
+
+    data_dir = Path(args.data_dir)
+    path = QueryEngine.from_dir(data_dir).export_routing(Path(args.out or data_dir / ROUTING_FILE), args.min_n, args.per_topic)
+    if path is None:
+        print("gagal menulis tabel routing (pyarrow tidak tersedia / folder tidak bisa ditulis)", file=sys.stderr)
+        return 1
+    print(f"routing → {path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
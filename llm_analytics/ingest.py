@@ -0,0 +1,291 @@
+"""Ingestion bertipe untuk usage/winrate/ngrams.
+
+Alur baca `read_table()`:
+1) Parquet/Feather eksplisit di samping CSV (mis. data/usage.parquet) — boleh berupa
+   folder dataset berpartisi hive (mis. data/usage.parquet/date=…/model=…/part-0.parquet),
+2) sidecar Parquet bertipe yang masih segar (mis. data/usage.typed.parquet),
+3) CSV dengan dtype yang dideklarasikan → lalu ditulis ke sidecar sekali saja.
+
+Semua jalur diakhiri normalisasi `ensure_*_schema` yang murah bila tipe sudah benar.
+"""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import is_datetime64_any_dtype, is_numeric_dtype
+
+from llm_analytics.stats import wilson_interval
+
+try:
+    import pyarrow  # noqa: F401  (engine Parquet/Feather & CSV multi-thread)
+    HAS_ARROW = True
+except Exception:
+    HAS_ARROW = False
+
+# ----------------------- Skema -----------------------
+USAGE_COLUMNS = ["date", "model", "user_text", "topic", "tts", "is_solved", "fit_score"]
+WINRATE_COLUMNS = ["model", "wins", "apps", "win_rate", "wr_lo", "wr_hi"]
+NGRAMS_COLUMNS = ["term", "freq"]
+# Satu baris per duel: winner ∈ {model_a, model_b, tie}; date/topic opsional
+BATTLES_COLUMNS = ["date", "model_a", "model_b", "winner", "topic"]
+
+# Kolom usage yang dibutuhkan view dashboard (user_text tidak pernah dimuat)
+USAGE_VIEW_COLUMNS = tuple(c for c in USAGE_COLUMNS if c != "user_text")
+
+USAGE_DTYPES: Dict[str, str] = {
+    "date": "datetime64[ns]",
+    "model": "category",
+    "user_text": "string",
+    "topic": "category",
+    "tts": "float32",
+    "is_solved": "Int8",
+    "fit_score": "float32",
+}
+WINRATE_DTYPES: Dict[str, str] = {
+    "model": "string",
+    "wins": "float64",
+    "apps": "float64",
+    "win_rate": "float64",
+    "wr_lo": "float64",
+    "wr_hi": "float64",
+}
+NGRAMS_DTYPES: Dict[str, str] = {"term": "string", "freq": "int64"}
+BATTLES_DTYPES: Dict[str, str] = {
+    "date": "datetime64[ns]",
+    "model_a": "category",
+    "model_b": "category",
+    "winner": "category",
+    "topic": "category",
+}
+
+
+def _empty_frame(columns: Sequence[str], dtypes: Dict[str, str]) -> pd.DataFrame:
+    return pd.DataFrame({c: pd.Series(dtype=dtypes.get(c, "object")) for c in columns})
+
+
+def _as_category(s: pd.Series, fill: str) -> pd.Series:
+    """Kolom teks → categorical berlabel string (tanpa NaN)."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        if s.isna().any():
+            if fill not in s.cat.categories:
+                s = s.cat.add_categories([fill])
+            s = s.fillna(fill)
+        if s.cat.categories.dtype != object:
+            s = s.cat.rename_categories(s.cat.categories.astype(str))
+        return s
+    return s.fillna(fill).astype(str).astype("category")
+
+
+def _as_datetime(s: pd.Series) -> pd.Series:
+    """Kolom tanggal → datetime64; kolom kategori (mis. partisi hive) di-parse per kategori saja."""
+    if is_datetime64_any_dtype(s):
+        return s
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        cats = pd.to_datetime(pd.Index(s.cat.categories.astype(str)), errors="coerce")
+        codes = s.cat.codes.to_numpy()
+        values = cats.to_numpy()[codes]
+        values[codes < 0] = np.datetime64("NaT")
+        return pd.Series(values, index=s.index, name=s.name)
+    return pd.to_datetime(s, errors="coerce")
+
+
+def _as_numeric(s: pd.Series) -> pd.Series:
+    return s if is_numeric_dtype(s) else pd.to_numeric(s, errors="coerce")
+
+
+def ensure_usage_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalisasi tipe kolom usage.csv."""
+    if df is None or df.empty:
+        return _empty_frame(USAGE_COLUMNS, USAGE_DTYPES)
+    # Date
+    df["date"] = _as_datetime(df["date"]) if "date" in df.columns else pd.NaT
+    # Model & Topic → categorical
+    if "model" not in df.columns:
+        df["model"] = "unknown"
+    df["model"] = _as_category(df["model"], "unknown")
+    if "topic" not in df.columns:
+        df["topic"] = "Lainnya"
+    df["topic"] = _as_category(df["topic"], "Lainnya")
+    # TTS
+    if "tts" in df.columns:
+        df["tts"] = _as_numeric(df["tts"]).astype("float32")
+    else:
+        df["tts"] = np.float32(np.nan)
+    # is_solved
+    if "is_solved" in df.columns:
+        if str(df["is_solved"].dtype) != "Int8":
+            df["is_solved"] = _as_numeric(df["is_solved"]).round().astype("Int8")
+    else:
+        df["is_solved"] = pd.array([None]*len(df), dtype="Int8")
+    # fit_score
+    if "fit_score" in df.columns:
+        df["fit_score"] = _as_numeric(df["fit_score"]).astype("float32")
+    else:
+        df["fit_score"] = np.float32(np.nan)
+    # user_text (hanya bila ikut dimuat)
+    if "user_text" in df.columns and str(df["user_text"].dtype) != "string":
+        df["user_text"] = df["user_text"].astype("string")
+    return df
+
+
+def ensure_winrate_schema(df: pd.DataFrame) -> pd.DataFrame:
+    if df is None or df.empty:
+        return _empty_frame(WINRATE_COLUMNS, WINRATE_DTYPES)
+    if "model" in df.columns:
+        df["model"] = df["model"].astype("string")
+    for c in ["wins","apps","win_rate","wr_lo","wr_hi"]:
+        if c in df.columns:
+            df[c] = _as_numeric(df[c]).astype("float64")
+    if "win_rate" not in df.columns and {"wins","apps"}.issubset(df.columns):
+        df["win_rate"], df["wr_lo"], df["wr_hi"] = wilson_interval(df["wins"].fillna(0), df["apps"].fillna(0))
+    return df
+
+
+def ensure_ngrams_schema(df: pd.DataFrame) -> pd.DataFrame:
+    if df is None or df.empty:
+        return _empty_frame(NGRAMS_COLUMNS, NGRAMS_DTYPES)
+    df["term"] = df["term"].astype("string")
+    df["freq"] = _as_numeric(df["freq"]).fillna(0).astype("int64")
+    return df
+
+
+def ensure_battles_schema(df: pd.DataFrame) -> pd.DataFrame:
+    """Normalisasi battles.csv; winner selain model_a/model_b dianggap seri (tie)."""
+    if df is None or df.empty:
+        return _empty_frame(BATTLES_COLUMNS, BATTLES_DTYPES)
+    df["date"] = _as_datetime(df["date"]) if "date" in df.columns else pd.NaT
+    for c in ["model_a", "model_b"]:
+        df[c] = _as_category(df[c] if c in df.columns else pd.Series("unknown", index=df.index), "unknown")
+    if "winner" not in df.columns:
+        df["winner"] = "tie"
+    if not (isinstance(df["winner"].dtype, pd.CategoricalDtype) and set(df["winner"].cat.categories) <= {"model_a", "model_b", "tie"}):
+        w = df["winner"].astype("string").str.strip().str.lower()
+        df["winner"] = pd.Categorical(w.where(w.isin(["model_a", "model_b"]), "tie"), categories=["model_a", "model_b", "tie"])
+    if "topic" not in df.columns:
+        df["topic"] = "Lainnya"
+    df["topic"] = _as_category(df["topic"], "Lainnya")
+    return df
+
+
+# kind → (kolom, dtype, normalisasi)
+SCHEMAS: Dict[str, tuple] = {
+    "usage": (USAGE_COLUMNS, USAGE_DTYPES, ensure_usage_schema),
+    "winrate": (WINRATE_COLUMNS, WINRATE_DTYPES, ensure_winrate_schema),
+    "ngrams": (NGRAMS_COLUMNS, NGRAMS_DTYPES, ensure_ngrams_schema),
+    "battles": (BATTLES_COLUMNS, BATTLES_DTYPES, ensure_battles_schema),
+}
+
+
+# ----------------------- Sumber & Sidecar -----------------------
+def sidecar_path(path: Path) -> Path:
+    """Lokasi sidecar Parquet bertipe untuk sebuah CSV (usage.csv → usage.typed.parquet)."""
+    return path.with_name(f"{path.stem}.typed.parquet")
+
+
+def resolve_source(path: Path) -> Optional[Path]:
+    """Pilih berkas terbaik: Parquet/Feather eksplisit, sidecar segar, lalu CSV."""
+    path = Path(path)
+    if HAS_ARROW:
+        for ext in (".parquet", ".feather"):
+            alt = path.with_suffix(ext)
+            if alt.exists():
+                return alt
+        side = sidecar_path(path)
+        if side.exists() and (not path.exists() or side.stat().st_mtime >= path.stat().st_mtime):
+            return side
+    return path if path.exists() else None
+
+
+def _source_columns(src: Path) -> List[str]:
+    if src.is_dir():
+        import pyarrow.dataset as ds
+        return list(ds.dataset(src, format="parquet", partitioning="hive").schema.names)
+    if src.suffix == ".parquet":
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(src).names)
+    if src.suffix == ".feather":
+        import pyarrow.ipc as ipc
+        with ipc.open_file(src) as reader:
+            return list(reader.schema.names)
+    return pd.read_csv(src, nrows=0).columns.tolist()
+
+
+def _read_csv_typed(src: Path, usecols: List[str], dtypes: Dict[str, str]) -> pd.DataFrame:
+    # Hanya kolom teks yang dideklarasikan saat parsing; numerik/tanggal dinormalisasi sesudahnya
+    dtype = {c: t for c, t in dtypes.items() if c in usecols and t in ("category", "string")}
+    if HAS_ARROW:
+        try:
+            return pd.read_csv(src, usecols=usecols, dtype=dtype, engine="pyarrow")
+        except Exception:
+            pass
+    return pd.read_csv(src, usecols=usecols, dtype=dtype)
+
+
+def _write_sidecar(df: pd.DataFrame, target: Path) -> None:
+    tmp = target.with_name(target.name + ".tmp")
+    try:
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, target)
+    except Exception:
+        # Folder read-only / tipe tak didukung: cukup lewati, CSV tetap sumber kebenaran
+        if tmp.exists():
+            tmp.unlink()
+
+
+def read_table(
+    path: Path,
+    kind: str,
+    columns: Optional[Sequence[str]] = None,
+    write_sidecar: bool = True,
+) -> Optional[pd.DataFrame]:
+    """Baca tabel `kind` (usage/winrate/ngrams/battles) secara bertipe dengan proyeksi kolom.
+
+    `columns=None` berarti semua kolom. Bila sumbernya CSV dan pyarrow tersedia,
+    seluruh tabel dinormalisasi sekali lalu ditulis ke sidecar Parquet.
+    """
+    path = Path(path)
+    schema_cols, dtypes, normalize = SCHEMAS.get(kind, ([], {}, lambda d: d))
+    src = resolve_source(path)
+    if src is None:
+        return None
+
+    available = _source_columns(src)
+    wanted = [c for c in available if columns is None or c in columns]
+
+    if src.suffix == ".parquet":
+        return normalize(pd.read_parquet(src, columns=wanted))
+    if src.suffix == ".feather":
+        return normalize(pd.read_feather(src, columns=wanted))
+
+    if write_sidecar and HAS_ARROW and kind in SCHEMAS:
+        df = normalize(_read_csv_typed(src, available, dtypes))
+        _write_sidecar(df, sidecar_path(path))
+        if columns is None:
+            return df
+        return df[[c for c in df.columns if c in columns]]
+    return normalize(_read_csv_typed(src, wanted, dtypes))
+
+
+def convert_to_parquet(path: Path, kind: str) -> Optional[Path]:
+    """Konversi satu kali CSV → sidecar Parquet bertipe; kembalikan lokasi sidecar."""
+    df = read_table(path, kind, write_sidecar=True)
+    side = sidecar_path(Path(path))
+    return side if df is not None and side.exists() else None
+
+
+def source_fingerprint(path: Path) -> str:
+    """Versi dataset murah (sumber terpilih + mtime + ukuran) untuk kunci cache turunan."""
+    src = resolve_source(Path(path))
+    if src is None:
+        return f"{path}:missing"
+    if src.is_dir():
+        # Dataset berpartisi: mtime terbaru + total ukuran semua part file
+        stats = [p.stat() for p in src.rglob("*.parquet")]
+        mtime = max((s.st_mtime_ns for s in stats), default=0)
+        return f"{src}:{mtime}:{sum(s.st_size for s in stats)}:{len(stats)}"
+    st_ = src.stat()
+    return f"{src}:{st_.st_mtime_ns}:{st_.st_size}"
@@ -0,0 +1,77 @@
+"""Kanonikalisasi nama model (model_title) lewat tabel kode kategori.
+
+Judul model dihitung sekali per nama mentah yang unik, bukan per baris: kolom
+`model` (categorical) dipetakan ke kolom `model_title` (categorical) lewat kode.
+Aturan alias bisa dikonfigurasi (mis. data/model_aliases.json) tanpa menambah
+regex per baris.
+"""
+from __future__ import annotations
+
+import json
+import re
+from pathlib import Path
+from typing import Dict, Optional, Pattern, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Penggantian substring (berurutan) sebelum sufiks tanggal dibuang
+MODEL_ALIASES: Dict[str, str] = {
+    "gpt-3.5-turbo-0613": "gpt-3.5",
+    "gpt-4-0314": "gpt-4",
+}
+# Sufiks tanggal/versi seperti "-20240101" atau "-0613"
+DATE_SUFFIX = re.compile(r"-\d{4,}$")
+
+
+def load_aliases(path: Optional[Path] = None) -> Dict[str, str]:
+    """Alias bawaan, ditimpa/ditambah isi berkas JSON {"nama-mentah": "judul"} bila ada."""
+    aliases = dict(MODEL_ALIASES)
+    if path is not None and Path(path).exists():
+        with open(path, encoding="utf-8") as fh:
+            aliases.update({str(k): str(v) for k, v in json.load(fh).items()})
+    return aliases
+
+
+def model_title(s: str, aliases: Optional[Dict[str, str]] = None, suffix: Pattern[str] = DATE_SUFFIX) -> str:
+    s = str(s)
+    for old, new in (MODEL_ALIASES if aliases is None else aliases).items():
+        s = s.replace(old, new)
+    s = suffix.sub("", s)
+    return s
+
+
+def title_table(
+    raw: pd.Series,
+    aliases: Optional[Dict[str, str]] = None,
+) -> Tuple[pd.Categorical, pd.DataFrame]:
+    """Petakan kolom model mentah → (Categorical model_title, tabel kode→judul).
+
+    Tabel berisi satu baris per kategori mentah: code, model, model_title, title_code.
+    """
+    cat = raw if isinstance(raw.dtype, pd.CategoricalDtype) else raw.astype(str).astype("category")
+    raw_names = cat.cat.categories.astype(str)
+    titles = pd.Index([model_title(m, aliases) for m in raw_names])
+    title_cats = pd.Index(sorted(titles.unique()))
+    title_codes = title_cats.get_indexer(titles)
+
+    codes = cat.cat.codes.to_numpy()
+    # Kode -1 (NaN) tetap NaN
+    mapped = np.where(codes >= 0, title_codes[np.maximum(codes, 0)], -1) if len(title_codes) else codes
+    column = pd.Categorical.from_codes(mapped, categories=title_cats)
+    table = pd.DataFrame({
+        "code": np.arange(len(raw_names)),
+        "model": raw_names,
+        "model_title": titles,
+        "title_code": title_codes,
+    })
+    return column, table
+
+
+def add_model_title(df: pd.DataFrame, aliases: Optional[Dict[str, str]] = None) -> pd.DataFrame:
+    """Tambah kolom categorical `model_title` (dihitung atas nama unik saja)."""
+    if df is None or "model" not in df.columns:
+        return df
+    column, _ = title_table(df["model"], aliases)
+    df["model_title"] = pd.Series(column, index=df.index)
+    return df
@@ -0,0 +1,206 @@
+"""Indeks n-gram per partisi (date, model, topic) untuk top-k yang mengikuti filter.
+
+user_text ditokenisasi SEKALI per versi dataset (lihat `ngrams.tokenize_documents`).
+Hitungan disimpan sebagai matriks jarang gaya CSR: untuk setiap baris partisi
+(`keys`, sama seperti cube rollup) ada rentang `term_id`/`freq` terurut. Top-k
+untuk filter tanggal/topik/model = penjumlahan rentang partisi terpilih
+(`np.bincount`) lalu `argpartition` — tanpa tokenisasi ulang.
+
+Saat membangun, kosakata (count total, teks) dipegang `NgramCounter` berkapasitas
+yang sama dengan jalur per rerun, dan pasangan (partisi, kunci) per chunk digabung
+berkala (`COMPACT_ROWS`), jadi memori tidak tumbuh dengan kosakata × jumlah chunk.
+
+Stopword tampilan tidak disaring per rerun: `term_mask(stopwords)` menghasilkan
+mask bool per term id (di-cache per himpunan stopword) yang langsung dipakai
+saat memilih top-k.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from llm_analytics.filters import FilterIndex, build_filter_index
+from llm_analytics.ngrams import (
+    CHUNK_DOCS,
+    DEFAULT_CAPACITY,
+    STOPWORDS,
+    NgramCounter,
+    token_hashes,
+    tokenize_documents,
+    window_keys,
+)
+
+KEY_COLUMNS = ["date", "model", "topic"]
+# Term dengan total frekuensi di bawah ini dibuang agar indeks tetap ringkas
+MIN_COUNT = 2
+# Baris pasangan (partisi, kunci) per chunk yang ditampung sebelum digabung ke agregat berjalan
+COMPACT_ROWS = 2_000_000
+
+
+@dataclass
+class NgramIndex:
+    """Partisi (`keys`) × term dalam format CSR: baris i = term_id/freq[indptr[i]:indptr[i+1]]."""
+
+    keys: pd.DataFrame          # date, model, topic, docs
+    terms: np.ndarray           # term id → teks (unigram dulu, lalu bigram; urut kemunculan)
+    order: np.ndarray           # term id → n
+    indptr: np.ndarray
+    term_id: np.ndarray
+    freq: np.ndarray
+    index: Optional[FilterIndex] = field(default=None, repr=False)
+    _masks: Dict[FrozenSet[str], np.ndarray] = field(default_factory=dict, repr=False)
+
+    @property
+    def empty(self) -> bool:
+        return not len(self.term_id)
+
+    def term_mask(self, stopwords: Iterable[str]) -> np.ndarray:
+        """Mask bool per term id: True bila term (lowercase) ada di `stopwords`."""
+        key = frozenset(stopwords)
+        mask = self._masks.get(key)
+        if mask is None:
+            lower = pd.Series(self.terms, dtype=object).str.lower()
+            mask = lower.isin(key).to_numpy()
+            self._masks[key] = mask
+        return mask
+
+    def select(
+        self,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        topics: Optional[Sequence[str]] = None,
+        models: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """Posisi partisi yang lolos filter tanggal [start, end], topik, dan model."""
+        if self.index is None:
+            self.index = build_filter_index(self.keys["date"], self.keys["topic"])
+        rows = self.index.select(start, end, topics)
+        if models is not None:
+            rows = rows[self.keys["model"].astype(str).isin(models).to_numpy()[rows]]
+        return rows
+
+    def totals(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Frekuensi per term id atas partisi `rows` (None = semua)."""
+        if rows is None or len(rows) == len(self.keys):
+            sel = slice(None)
+        else:
+            starts = self.indptr[rows]
+            lens = self.indptr[rows + 1] - starts
+            offsets = np.repeat(starts - np.cumsum(lens) + lens, lens)
+            sel = offsets + np.arange(int(lens.sum()))
+        return np.bincount(self.term_id[sel], weights=self.freq[sel], minlength=len(self.terms)).astype(np.int64)
+
+    def top(
+        self,
+        rows: Optional[np.ndarray] = None,
+        k: int = 20,
+        exclude: Optional[np.ndarray] = None,
+    ) -> pd.DataFrame:
+        """Top-k term (kolom term, freq) atas partisi `rows`; `exclude` = mask term id yang dibuang."""
+        tot = self.totals(rows)
+        if exclude is not None:
+            tot[exclude] = 0
+        cand = np.flatnonzero(tot)
+        if len(cand) > k:
+            kth = np.partition(tot[cand], len(cand) - k)[len(cand) - k]
+            cand = cand[tot[cand] >= kth]
+        # Seri: term id lebih kecil (orde lebih rendah, muncul lebih dulu) menang
+        cand = cand[np.lexsort((cand, -tot[cand]))][:k]
+        return pd.DataFrame({"term": self.terms[cand], "freq": tot[cand]})
+
+
+def _empty_pairs() -> pd.DataFrame:
+    return pd.DataFrame({"part": pd.Series(dtype=np.int64), "key": pd.Series(dtype=np.uint64), "freq": pd.Series(dtype=np.int64)})
+
+
+def _compact(pieces: List[pd.DataFrame], counter: NgramCounter) -> pd.DataFrame:
+    """Gabung potongan (part, key, freq) menjadi satu agregat; buang kunci yang dipangkas counter."""
+    pairs = pd.concat(pieces, ignore_index=True).groupby(["part", "key"], sort=False)["freq"].sum().reset_index()
+    if counter.error:
+        kept = np.concatenate([t.keys for t in counter.tables.values()])
+        pairs = pairs[np.isin(pairs["key"].to_numpy(), kept)].reset_index(drop=True)
+    return pairs
+
+
+def build_ngram_index(
+    usage: pd.DataFrame,
+    texts: Optional[pd.Series] = None,
+    max_n: int = 2,
+    stopwords: Iterable[str] = STOPWORDS,
+    min_count: int = MIN_COUNT,
+    chunk_docs: int = CHUNK_DOCS,
+    capacity: Optional[int] = DEFAULT_CAPACITY,
+    compact_rows: int = COMPACT_ROWS,
+) -> NgramIndex:
+    """Bangun indeks dari usage ternormalisasi + teks sejajar (default kolom `user_text`).
+
+    Memakai `model_title` bila tersedia, seperti `rollup.build_rollup`. Memori dibatasi
+    `capacity` kunci per orde (lihat `ngrams.NgramCounter`; None = eksak tanpa batas).
+    """
+    texts = usage["user_text"] if texts is None else texts
+    model = usage["model_title"] if "model_title" in usage.columns else usage["model"]
+    frame = pd.DataFrame({
+        "date": usage["date"].dt.normalize(),
+        "model": model.astype(str).astype("category"),
+        "topic": usage["topic"].astype(str).astype("category"),
+    })
+    g = frame.groupby(KEY_COLUMNS, observed=True, dropna=False, sort=True)
+    keys = g.size().rename("docs").reset_index()
+    part = g.ngroup().to_numpy()
+    stop = list(stopwords)
+
+    # Kosakata global = `NgramCounter` berkapasitas (sama dengan jalur per rerun): count total,
+    # posisi pertama & teks hanya untuk kunci yang disimpannya. Pasangan (partisi, kunci) per
+    # chunk digabung berkala ke agregat berjalan; kunci yang sudah dipangkas counter dibuang.
+    counter = NgramCounter(max_n=max_n, stopwords=stop, capacity=capacity)
+    pieces: List[pd.DataFrame] = [_empty_pairs()]
+    pending = 0
+    for lo in range(0, len(texts), chunk_docs):
+        flat, doc, n_docs = tokenize_documents(texts.iloc[lo:lo + chunk_docs], stop)
+        hashes = token_hashes(flat)
+        counter.update_tokens(flat, doc, n_docs, hashes)
+        for n in range(1, max_n + 1):
+            start, kh = window_keys(hashes, doc, n)
+            if not len(kh):
+                continue
+            piece = (
+                pd.DataFrame({"part": part[lo + doc[start]], "key": kh})
+                .value_counts(sort=False)
+                .rename("freq")
+                .reset_index()
+            )
+            pieces.append(piece)
+            pending += len(piece)
+        # Ambang ikut ukuran agregat → biaya penggabungan teramortisasi
+        if pending >= max(compact_rows, len(pieces[0])):
+            pieces, pending = [_compact(pieces, counter)], 0
+    pairs = _compact(pieces, counter)
+
+    # Term id: urut (orde, kemunculan pertama); buang term dengan total < min_count
+    tables = [(n, counter.tables[n]) for n in sorted(counter.tables)]
+    meta = pd.DataFrame({
+        "n": np.concatenate([np.full(len(t), n, dtype=np.int8) for n, t in tables]),
+        "first": np.concatenate([t.first for _, t in tables]),
+        "term": np.concatenate([t.names for _, t in tables]),
+        "total": np.concatenate([t.counts for _, t in tables]),
+    }, index=np.concatenate([t.keys for _, t in tables]))
+    meta = meta[(meta["total"] >= min_count) & ~meta.index.duplicated()]
+    meta = meta.sort_values(["n", "first"], kind="stable")
+    term_of = pd.Series(np.arange(len(meta), dtype=np.int32), index=meta.index)
+    pairs = pairs[pairs["key"].isin(term_of.index)]
+    pairs = pairs.assign(term_id=term_of.reindex(pairs["key"]).to_numpy()).sort_values(["part", "term_id"])
+
+    indptr = np.zeros(len(keys) + 1, dtype=np.int64)
+    indptr[1:] = np.cumsum(np.bincount(pairs["part"].to_numpy(), minlength=len(keys)))
+    return NgramIndex(
+        keys=keys,
+        terms=meta["term"].to_numpy(dtype=object),
+        order=meta["n"].to_numpy(dtype=np.int8),
+        indptr=indptr,
+        term_id=pairs["term_id"].to_numpy(dtype=np.int32),
+        freq=pairs["freq"].to_numpy(dtype=np.int32),
+        index=build_filter_index(keys["date"], keys["topic"]),
+    )
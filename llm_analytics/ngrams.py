@@ -0,0 +1,278 @@
+"""Penghitung n-gram streaming dengan memori terbatas.
+
+Teks diproses per chunk dokumen: tiap dokumen ditokenisasi sendiri (n-gram tidak
+melintasi batas percakapan), stopword dibuang, lalu unigram/bigram/(trigram)
+diberi kunci hash 64-bit dan dihitung dengan `np.unique`. Tabel per orde
+(kunci terurut + count) digabung antar chunk; teks n-gram hanya disimpan untuk
+kunci yang ada di tabel. Bila tabel melebihi `capacity`, ekor dengan count
+terkecil dipangkas (gaya Misra–Gries) — count yang dilaporkan menjadi batas
+bawah dengan galat maksimum `error`.
+
+Hasil `top()` setara `pd.Series(tokens + bigrams).value_counts()` versi lama
+(kecuali bigram lintas dokumen yang kini tidak dihitung).
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+TOKEN_PAT = re.compile(r"[a-zA-Z]{3,}")
+
+# Stopwords ringan untuk n-gram
+STOPWORDS = frozenset({
+    "the","and","for","with","that","this","from","your","have","you","will","just","does","did","can","could",
+    "would","there","here","into","them","then","than","what","when","where","which","some","about","like",
+    "been","were","they","their","ours","ourselves",
+    "kami","kita","kamu","anda","yang","dengan","untuk","atau","dari","pada","dalam","akan","saya","dia",
+    "itu","ini","bisa","tidak","iya","dan","atau","jadi","agar","karena","kalau","sehingga"
+})
+
+CHUNK_DOCS = 50_000
+# Batas entri per orde n-gram; None = tanpa batas (eksak)
+DEFAULT_CAPACITY = 1_000_000
+
+_K1 = np.uint64(0x9E3779B97F4A7C15)
+_K2 = np.uint64(0xBF58476D1CE4E5B9)
+
+
+def _hash_strings(values: Sequence[str]) -> np.ndarray:
+    """Hash 64-bit stabil (antar proses) per string."""
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(v.encode("utf-8"), digest_size=8).digest(), "little") for v in values),
+        dtype=np.uint64,
+        count=len(values),
+    )
+
+
+def _combine(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Gabung dua hash (urutan berpengaruh) → hash n-gram."""
+    h = (a * _K1) ^ (b + _K2 + (a << np.uint64(6)) + (a >> np.uint64(2)))
+    return h ^ (h >> np.uint64(31))
+
+
+def tokenize_documents(
+    texts: Iterable[str],
+    stopwords: Iterable[str] = STOPWORDS,
+    token_pattern: re.Pattern = TOKEN_PAT,
+) -> Tuple[np.ndarray, np.ndarray, int]:
+    """Token (lowercase, tanpa stopword) per dokumen → (token datar, id dokumen, jumlah dokumen)."""
+    texts = texts if isinstance(texts, pd.Series) else pd.Series(list(texts), dtype=object)
+    toks = texts.fillna("").astype(str).str.lower().str.findall(token_pattern)
+    lens = toks.str.len().to_numpy(dtype=np.int64)
+    flat = np.fromiter(chain.from_iterable(toks), dtype=object, count=int(lens.sum()))
+    doc = np.repeat(np.arange(len(lens)), lens)
+    stop = stopwords if isinstance(stopwords, (list, np.ndarray)) else list(stopwords)
+    keep = ~pd.Series(flat, dtype=object).isin(stop).to_numpy()
+    return flat[keep], doc[keep], len(lens)
+
+
+def token_hashes(flat: np.ndarray) -> np.ndarray:
+    """Hash per token (dihitung sekali per token unik)."""
+    if not len(flat):
+        return np.empty(0, dtype=np.uint64)
+    codes, uniques = pd.factorize(flat)
+    return _hash_strings(uniques)[codes]
+
+
+def window_keys(hashes: np.ndarray, doc: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """(posisi awal, kunci hash) setiap n-gram yang tidak melintasi batas dokumen."""
+    if len(hashes) < n:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+    # Jendela n token yang awal & akhirnya di dokumen yang sama (doc terurut naik)
+    start = np.flatnonzero(doc[: len(doc) - n + 1] == doc[n - 1:])
+    keys = hashes[start]
+    for j in range(1, n):
+        keys = _combine(keys, hashes[start + j])
+    return start, keys
+
+
+def ngram_text(flat: np.ndarray, start: int, n: int) -> str:
+    return " ".join(flat[start:start + n])
+
+
+class _Table:
+    """Tabel count satu orde n-gram: kunci terurut, count, posisi kemunculan pertama, teks."""
+
+    def __init__(self) -> None:
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.counts = np.empty(0, dtype=np.int64)
+        self.first = np.empty(0, dtype=np.int64)
+        self.names = np.empty(0, dtype=object)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, keys: np.ndarray, counts: np.ndarray, first: np.ndarray, names) -> None:
+        """Tambah kunci unik `keys` (naik); `names(mask)` membangun teks untuk kunci baru."""
+        pos = np.searchsorted(self.keys, keys)
+        found = pos < len(self.keys)
+        found[found] = self.keys[pos[found]] == keys[found]
+        np.add.at(self.counts, pos[found], counts[found])
+        new = ~found
+        if new.any():
+            keys_all = np.concatenate([self.keys, keys[new]])
+            order = np.argsort(keys_all, kind="stable")
+            self.keys = keys_all[order]
+            self.counts = np.concatenate([self.counts, counts[new]])[order]
+            self.first = np.concatenate([self.first, first[new]])[order]
+            self.names = np.concatenate([self.names, np.asarray(names(new), dtype=object)])[order]
+
+    def prune(self, capacity: int) -> int:
+        """Sisakan `capacity` entri dengan count terbesar; kembalikan count terbesar yang dibuang."""
+        if len(self) <= capacity:
+            return 0
+        rank = np.lexsort((self.first, -self.counts))
+        dropped = int(self.counts[rank[capacity:]].max())
+        keep = np.sort(rank[:capacity])
+        self.keys, self.counts = self.keys[keep], self.counts[keep]
+        self.first, self.names = self.first[keep], self.names[keep]
+        return dropped
+
+    def merge(self, other: "_Table", offset: int) -> None:
+        self.add(other.keys, other.counts, other.first + offset, lambda mask: other.names[mask])
+
+
+class NgramCounter:
+    """Hitung n-gram (orde 1..max_n) atas aliran teks; `update()` per chunk dokumen."""
+
+    def __init__(
+        self,
+        max_n: int = 2,
+        stopwords: Iterable[str] = STOPWORDS,
+        capacity: Optional[int] = DEFAULT_CAPACITY,
+        token_pattern: re.Pattern = TOKEN_PAT,
+    ) -> None:
+        self.max_n = max_n
+        self.stopwords = list(stopwords)
+        self.capacity = capacity
+        self.token_pattern = token_pattern
+        self.tables: Dict[int, _Table] = {n: _Table() for n in range(1, max_n + 1)}
+        self.docs = 0
+        self.tokens = 0
+        self.error = 0  # batas atas galat count setelah pemangkasan (0 = eksak)
+
+    def update(self, texts: Iterable[str]) -> None:
+        """Serap satu chunk dokumen."""
+        flat, doc, n_docs = tokenize_documents(texts, self.stopwords, self.token_pattern)
+        self.update_tokens(flat, doc, n_docs)
+
+    def update_tokens(self, flat: np.ndarray, doc: np.ndarray, n_docs: int, hashes: Optional[np.ndarray] = None) -> None:
+        """Serap chunk yang sudah ditokenisasi (`tokenize_documents`); `hashes` opsional dipakai ulang."""
+        hashes = token_hashes(flat) if hashes is None else hashes
+        for n, table in self.tables.items():
+            start, keys = window_keys(hashes, doc, n)
+            if not len(keys):
+                continue
+            uniq, first, inv = np.unique(keys, return_index=True, return_inverse=True)
+            counts = np.bincount(inv, minlength=len(uniq)).astype(np.int64)
+            first_pos = start[first]
+
+            def names(mask, first_pos=first_pos, n=n):
+                return [ngram_text(flat, p, n) for p in first_pos[mask].tolist()]
+
+            table.add(uniq, counts, self.tokens + first_pos, names)
+            if self.capacity is not None:
+                self.error = max(self.error, table.prune(self.capacity))
+        self.docs += n_docs
+        self.tokens += len(flat)
+
+    def update_chunks(self, chunks: Iterable[Iterable[str]]) -> "NgramCounter":
+        for chunk in chunks:
+            self.update(chunk)
+        return self
+
+    def merge(self, other: "NgramCounter") -> "NgramCounter":
+        """Gabungkan hasil counter lain (mis. dari worker paralel) ke counter ini."""
+        for n, table in other.tables.items():
+            self.tables.setdefault(n, _Table()).merge(table, self.tokens)
+            if self.capacity is not None:
+                self.error = max(self.error, self.tables[n].prune(self.capacity))
+        self.docs += other.docs
+        self.tokens += other.tokens
+        self.error = max(self.error, other.error)
+        return self
+
+    def top(self, k: int = 20, orders: Optional[Sequence[int]] = None) -> pd.DataFrame:
+        """Top-k term lintas orde (kolom term, freq); seri: orde lebih kecil, lalu muncul lebih dulu."""
+        parts: List[pd.DataFrame] = []
+        for n in orders or sorted(self.tables):
+            table = self.tables[n]
+            if not len(table):
+                continue
+            sel = np.arange(len(table))
+            if len(table) > k:
+                # Kandidat top-k per orde (termasuk yang seri di batas)
+                kth = np.partition(table.counts, len(table) - k)[len(table) - k]
+                sel = np.flatnonzero(table.counts >= kth)
+            parts.append(pd.DataFrame({
+                "term": table.names[sel],
+                "freq": table.counts[sel],
+                "_n": n,
+                "_first": table.first[sel],
+            }))
+        if not parts:
+            return pd.DataFrame({"term": pd.Series(dtype=object), "freq": pd.Series(dtype="int64")})
+        out = pd.concat(parts, ignore_index=True)
+        out = out.sort_values(["freq", "_n", "_first"], ascending=[False, True, True], kind="stable").head(k)
+        return out[["term", "freq"]].reset_index(drop=True)
+
+
+def _chunks(texts: pd.Series, size: int) -> Iterable[pd.Series]:
+    for start in range(0, len(texts), size):
+        yield texts.iloc[start:start + size]
+
+
+def count_ngrams(
+    texts: pd.Series,
+    max_n: int = 2,
+    stopwords: Iterable[str] = STOPWORDS,
+    chunk_docs: int = CHUNK_DOCS,
+    capacity: Optional[int] = DEFAULT_CAPACITY,
+) -> NgramCounter:
+    """Counter n-gram atas Series teks, diproses per `chunk_docs` dokumen."""
+    counter = NgramCounter(max_n=max_n, stopwords=stopwords, capacity=capacity)
+    return counter.update_chunks(_chunks(texts, chunk_docs))
+
+
+def ngrams_from_csv(
+    path: Path,
+    column: str = "user_text",
+    max_n: int = 2,
+    stopwords: Iterable[str] = STOPWORDS,
+    chunk_docs: int = CHUNK_DOCS,
+    capacity: Optional[int] = DEFAULT_CAPACITY,
+) -> NgramCounter:
+    """Counter n-gram langsung dari CSV (mis. data/usage.csv) tanpa memuat seluruh file."""
+    counter = NgramCounter(max_n=max_n, stopwords=stopwords, capacity=capacity)
+    reader = pd.read_csv(path, usecols=[column], dtype={column: str}, chunksize=chunk_docs)
+    return counter.update_chunks(chunk[column] for chunk in reader)
+
+
+def write_ngrams_csv(counter: NgramCounter, path: Path, top_k: int = 20) -> pd.DataFrame:
+    """Tulis top-k term ke ngrams.csv (kolom term, freq) yang dibaca dashboard."""
+    out = counter.top(top_k)
+    out.to_csv(path, index=False)
+    return out
+
+
+def sanitize_terms(
+    df: pd.DataFrame,
+    use_stopwords: bool,
+    top_k: int,
+    stopwords: Iterable[str] = STOPWORDS,
+) -> pd.DataFrame:
+    """Top-k baris (term, freq) dari ngrams.csv; stopword dibuang bila `use_stopwords`."""
+    if df is None or df.empty:
+        return pd.DataFrame(columns=["term","freq"])
+    work = df.copy()
+    work["term"] = work["term"].astype(str)
+    if use_stopwords:
+        work = work[~work["term"].str.lower().isin(set(stopwords))]
+    work = work.sort_values("freq", ascending=False).head(top_k)
+    return work
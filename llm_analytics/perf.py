@@ -0,0 +1,212 @@
+"""Span waktu & memori untuk jalur panas (muat, normalisasi, filter, tab, figur).
+
+    rec = Recorder(enabled=True)
+    with rec.span("load:usage"):
+        df = load_usage(...)        # di dalam fungsi ter-cache: rec.miss()
+
+Dashboard mengaktifkan satu `Recorder` per rerun (`activate`, per thread skrip);
+fungsi modul `span`/`miss` dan dekorator `traced` selalu menulis ke recorder
+aktif sehingga fungsi ter-cache tidak perlu menerima recorder sebagai argumen:
+
+    @traced(st.cache_data(show_spinner=False))
+    def load_csv(...): ...
+
+Setiap span mencatat durasi (`perf_counter`), RSS proses di akhir span dan
+selisihnya (Linux: /proc/self/statm; lainnya: puncak RSS `getrusage`), serta
+status cache: fungsi ter-cache memanggil `miss()` saat benar-benar menghitung
+(`traced` melakukannya otomatis), sehingga span yang tidak ditandai = hit.
+Span boleh bersarang (`parent`).
+
+Saat `enabled=False`, `span()` mengembalikan satu objek kontekstual kosong yang
+dipakai ulang dan `miss()` langsung kembali — tidak ada alokasi atau pembacaan
+jam/memori. Rekaman bisa diekspor sebagai JSON Lines (`to_jsonl`) dan/atau
+dikirim ke logger `llm_analytics.perf` (satu record JSON per span).
+"""
+from __future__ import annotations
+
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+import pandas as pd
+
+logger = logging.getLogger("llm_analytics.perf")
+
+_NULL = nullcontext()
+_local = threading.local()
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def rss_bytes() -> int:
+    """RSS proses saat ini (fallback: puncak RSS bila /proc tidak tersedia)."""
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * _PAGE
+    except (OSError, IndexError, ValueError):
+        try:
+            import resource
+        except ImportError:
+            return 0
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+@dataclass
+class Span:
+    name: str
+    start: float
+    seconds: float = 0.0
+    rss: int = 0
+    rss_delta: int = 0
+    cache: Optional[str] = None     # "hit" / "miss" / None (bukan fungsi ter-cache)
+    parent: Optional[str] = None
+    meta: Dict[str, Any] = field(default_factory=dict)
+
+    def record(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out["ms"] = round(out.pop("seconds") * 1000, 3)
+        out["rss_mb"] = round(out.pop("rss") / 2**20, 1)
+        out["rss_delta_mb"] = round(out.pop("rss_delta") / 2**20, 1)
+        return out
+
+
+class Recorder:
+    """Kumpulan span untuk satu rerun/sesi; nonaktif = tanpa biaya berarti."""
+
+    def __init__(self, enabled: bool = False, log: bool = False) -> None:
+        self.enabled = enabled
+        self.log = log and enabled
+        self.spans: List[Span] = []
+        self._stack: List[Span] = []
+        self._origin = time.perf_counter()
+
+    def span(self, name: str, cached: bool = False, **meta: Any):
+        """Konteks span `name`; `cached=True` untuk pemanggilan fungsi ter-cache (default hit)."""
+        if not self.enabled:
+            return _NULL
+        return self._span(name, cached, meta)
+
+    @contextmanager
+    def _span(self, name: str, cached: bool, meta: Dict[str, Any]) -> Iterator[Span]:
+        parent = self._stack[-1].name if self._stack else None
+        rss0 = rss_bytes()
+        s = Span(name, time.perf_counter() - self._origin, cache="hit" if cached else None, parent=parent, meta=meta)
+        self._stack.append(s)
+        t0 = time.perf_counter()
+        try:
+            yield s
+        finally:
+            s.seconds = time.perf_counter() - t0
+            s.rss = rss_bytes()
+            s.rss_delta = s.rss - rss0
+            self._stack.pop()
+            self.spans.append(s)
+            if self.log and logger.isEnabledFor(logging.INFO):
+                logger.info(json.dumps(s.record(), default=str))
+
+    def activate(self) -> "Recorder":
+        """Jadikan recorder aktif untuk thread ini (tujuan `span`, `miss`, `traced`)."""
+        _local.recorder = self
+        return self
+
+    def miss(self) -> None:
+        """Tandai span ter-cache terdalam sebagai miss (dipanggil dari badan fungsi ter-cache)."""
+        if self.enabled:
+            for s in reversed(self._stack):
+                if s.cache is not None:
+                    s.cache = "miss"
+                    return
+
+    # ----------------------- Ringkasan & ekspor -----------------------
+    def frame(self) -> pd.DataFrame:
+        """Span (urut mulai) → tabel name, ms, cache, rss_mb, rss_delta_mb, parent."""
+        cols = ["name", "ms", "cache", "rss_mb", "rss_delta_mb", "parent"]
+        rows = [s.record() for s in sorted(self.spans, key=lambda s: s.start)]
+        return pd.DataFrame(rows, columns=cols + ["start", "meta"])[cols] if rows else pd.DataFrame(columns=cols)
+
+    def cache_counts(self) -> Dict[str, int]:
+        counts = {"hit": 0, "miss": 0}
+        for s in self.spans:
+            if s.cache in counts:
+                counts[s.cache] += 1
+        return counts
+
+    def total_seconds(self) -> float:
+        """Jumlah durasi span level atas (span bersarang tidak dihitung dua kali)."""
+        return sum(s.seconds for s in self.spans if s.parent is None)
+
+    def elapsed(self) -> float:
+        """Detik sejak recorder dibuat (≈ durasi rerun sejauh ini)."""
+        return time.perf_counter() - self._origin
+
+    def to_jsonl(self, **context: Any) -> str:
+        """Satu record JSON per span (+ field `context`, mis. id sesi/versi data)."""
+        return "".join(json.dumps({**context, **s.record()}, default=str) + "\n" for s in self.spans)
+
+
+_DISABLED = Recorder()
+
+
+def current() -> Recorder:
+    """Recorder aktif thread ini (recorder nonaktif bila belum ada)."""
+    return getattr(_local, "recorder", _DISABLED)
+
+
+def span(name: str, cached: bool = False, **meta: Any):
+    return current().span(name, cached, **meta)
+
+
+def miss() -> None:
+    current().miss()
+
+
+def traced(
+    cache: Callable[[Callable], Callable],
+    name: Union[str, Callable[..., str], None] = None,
+) -> Callable[[Callable], Callable]:
+    """Bungkus dekorator cache (mis. `st.cache_data(...)`): satu span per panggilan, miss bila badan dijalankan.
+
+    `name` boleh berupa fungsi atas argumen panggilan (mis. nama berkas yang dimuat).
+    Fungsi asli tetap menjadi `__wrapped__`, jadi sumber & signature (parameter
+    berawalan `_` tidak di-hash) yang dilihat dekorator cache tidak berubah.
+    """
+    def decorate(fn: Callable) -> Callable:
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def compute(*args, **kwargs):
+            current().miss()
+            return fn(*args, **kwargs)
+
+        cached = cache(compute)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            rec = current()
+            if not rec.enabled:
+                return cached(*args, **kwargs)
+            with rec.span(label(*args, **kwargs) if callable(label) else label, cached=True):
+                return cached(*args, **kwargs)
+
+        call.clear = getattr(cached, "clear", None)
+        return call
+    return decorate
+
+
+def add_log_handler(target: str) -> logging.Handler:
+    """Kirim record span (JSON per baris) ke berkas `target` atau stderr ("-"); idempoten per target."""
+    for h in logger.handlers:
+        if getattr(h, "perf_target", None) == target:
+            return h
+    handler = logging.StreamHandler(sys.stderr) if target == "-" else logging.FileHandler(target, encoding="utf-8")
+    handler.setFormatter(logging.Formatter("%(message)s"))
+    handler.perf_target = target
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    return handler
@@ -0,0 +1,309 @@
+"""API kueri headless (tanpa Streamlit) untuk agregat di balik setiap tab dashboard.
+
+    engine = QueryEngine.from_dir("data")
+    q = Query(start="2025-06-01", end="2025-06-07", topics=("Coding",))
+    out = engine.query(q, ["solved", "tts", "fit_winners"])
+    out["solved"].head(3)          # model teratas menurut solved rate (+ Wilson CI)
+
+Satu `query` = satu seleksi cube (binary search tanggal + indeks topik + mask
+model) menjadi `Selection`; semua agregat yang diminta dihitung dari sub-cube
+yang sama, dan pengelompokan antara (per model, per topik × model, histogram
+TTS per model) dihitung sekali lalu dipakai bersama oleh agregat yang
+membutuhkannya. `query_many` menjawab banyak kueri sekaligus; kueri dengan
+filter yang sama berbagi `Selection`.
+
+Agregat (`AGGREGATES`): kpis, popularity, trend, topics, tts_hist, tts, solved,
+fit, fit_winners, routing, winrate. Heatmap, juara per topik, dan tabel routing
+dibaca dari satu matriks padat topik × model per seleksi (`fit.FitMatrix`). Dashboard memakai `Selection` yang sama untuk setiap
+tab, jadi angka di UI dan di layanan (mis. routing) selalu identik.
+"""
+from __future__ import annotations
+
+import json
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import cached_property
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from llm_analytics.fit import MIN_N_LEADER, FitMatrix, build_fit_matrix, export_routing
+from llm_analytics.ingest import (
+    USAGE_VIEW_COLUMNS,
+    ensure_battles_schema,
+    ensure_usage_schema,
+    ensure_winrate_schema,
+    read_table,
+    resolve_source,
+)
+from llm_analytics.models import add_model_title, load_aliases, model_title
+from llm_analytics.rollup import RollupCube, build_rollup, tts_histogram, tts_quantiles, tts_summary
+from llm_analytics.stats import wilson_interval
+from llm_analytics.winrate import BattleTable, build_battle_table
+
+DEFAULT_TOP_N = 10
+# Agregat default `QueryEngine.query` (semua kecuali histogram TTS & routing)
+DEFAULT_AGGREGATES = ("kpis", "popularity", "trend", "topics", "tts", "solved", "fit", "fit_winners", "winrate")
+# Jumlah `Selection` terakhir yang di-memo per engine
+SELECTION_CACHE = 64
+
+DateLike = Union[str, pd.Timestamp, None]
+
+
+@dataclass(frozen=True)
+class Query:
+    """Filter + parameter tampilan; `topics`/`models` None = semua."""
+
+    start: DateLike = None
+    end: DateLike = None
+    topics: Optional[Tuple[str, ...]] = None
+    models: Optional[Tuple[str, ...]] = None
+    top_n: int = DEFAULT_TOP_N
+    min_n: int = MIN_N_LEADER
+
+    def filter_key(self) -> tuple:
+        """Kunci seleksi (tanpa `top_n`/`min_n`): kueri dengan kunci sama berbagi `Selection`."""
+        norm = lambda d: None if d is None else pd.Timestamp(d).normalize()
+        sort = lambda v: None if v is None else tuple(sorted(map(str, v)))
+        return norm(self.start), norm(self.end), sort(self.topics), sort(self.models)
+
+
+class Selection:
+    """Sub-cube hasil filter + pengelompokan antara yang dihitung sekali (lazy)."""
+
+    def __init__(self, cube: RollupCube) -> None:
+        self.cube = cube
+
+    @property
+    def keys(self) -> pd.DataFrame:
+        return self.cube.keys
+
+    @property
+    def empty(self) -> bool:
+        return self.cube.empty
+
+    # ----------------------- Pengelompokan bersama -----------------------
+    @cached_property
+    def by_model(self) -> pd.DataFrame:
+        """count, solved_sum, solved_n per model (urutan kategori)."""
+        return self.keys.groupby("model", observed=True)[["count", "solved_sum", "solved_n"]].sum()
+
+    @cached_property
+    def fit_matrix(self) -> FitMatrix:
+        """Hitungan padat topik × model (heatmap, juara, routing) — satu pass per seleksi."""
+        return build_fit_matrix(self.keys)
+
+    @cached_property
+    def tts_by_model(self) -> pd.DataFrame:
+        """n, median, p75, p90 per model (gabungan histogram), urut median naik."""
+        return tts_summary(self.cube)
+
+    # ----------------------- Agregat -----------------------
+    def kpis(self) -> Dict[str, float]:
+        m = self.by_model
+        solved_n = int(m["solved_n"].sum())
+        return {
+            "total": int(m["count"].sum()),
+            "models": int((m["count"] > 0).sum()),
+            "solved_rate": float(m["solved_sum"].sum() / solved_n) if solved_n else np.nan,
+            "median_tts": float(tts_quantiles(self.cube, qs=(0.5,), by=None).iloc[0, 1]),
+        }
+
+    def popularity(self, top_n: Optional[int] = None) -> pd.DataFrame:
+        """Jumlah interaksi per model, urut menurun."""
+        out = self.by_model["count"].reset_index().sort_values("count", ascending=False)
+        return out if top_n is None else out.head(top_n)
+
+    def trend(self, top_n: Optional[int] = None) -> pd.DataFrame:
+        """(date, model, count) untuk top-N model menurut total bertanggal."""
+        ts = self.keys.groupby(["date", "model"], observed=True)["count"].sum().reset_index()
+        if top_n is None:
+            return ts
+        top_models = ts.groupby("model", observed=True)["count"].sum().sort_values(ascending=False).head(top_n).index
+        return ts[ts["model"].isin(top_models)]
+
+    def topics(self) -> pd.DataFrame:
+        return self.keys.groupby("topic", observed=True)["count"].sum().reset_index().sort_values("count", ascending=False)
+
+    def tts_hist(self) -> pd.DataFrame:
+        return tts_histogram(self.cube)
+
+    def tts(self, top_n: Optional[int] = None) -> pd.DataFrame:
+        out = self.tts_by_model
+        return out if top_n is None else out.head(top_n)
+
+    def solved(self, top_n: Optional[int] = None, z: float = 1.96) -> pd.DataFrame:
+        """Solved rate per model + Wilson CI (model, count, solved_n, solved_rate, lo, hi), urut rate turun."""
+        m = self.by_model[self.by_model["solved_n"] > 0]
+        p, lo, hi = wilson_interval(m["solved_sum"].to_numpy(), m["solved_n"].to_numpy(), z)
+        out = pd.DataFrame({
+            "model": m.index.astype(str),
+            "count": m["count"].to_numpy(),
+            "solved_n": m["solved_n"].to_numpy(),
+            "solved_rate": p,
+            "solved_lo": lo,
+            "solved_hi": hi,
+        }).sort_values(["solved_rate", "solved_n"], ascending=False, kind="stable").reset_index(drop=True)
+        return out if top_n is None else out.head(top_n)
+
+    def fit(self, top_n: Optional[int] = DEFAULT_TOP_N) -> pd.DataFrame:
+        """Matriks solved-rate topik × model (kolom = top-N model menurut jumlah interaksi)."""
+        return self.fit_matrix.heatmap(top_n)
+
+    def fit_winners(self, min_n: int = MIN_N_LEADER, z: float = 1.96) -> pd.DataFrame:
+        """Juara per topik menurut batas bawah Wilson, hanya pasangan dengan N ≥ `min_n`."""
+        return self.fit_matrix.leaders(min_n, z)
+
+    def routing(self, min_n: int = MIN_N_LEADER, per_topic: Optional[int] = None) -> pd.DataFrame:
+        """Tabel routing topik → model terurut (lihat `fit.FitMatrix.routing_table`)."""
+        return self.fit_matrix.routing_table(min_n, per_topic=per_topic)
+
+
+def _models_mask(keys: pd.DataFrame, models: Sequence[str]) -> np.ndarray:
+    col = keys["model"]
+    keep = np.append(col.cat.categories.astype(str).isin(list(models)), False)
+    return keep[col.cat.codes.to_numpy()]
+
+
+def select(cube: RollupCube, q: Query) -> Selection:
+    """`Selection` untuk filter `q` (tanggal, topik, model) atas `cube`."""
+    start, end, topics, models = q.filter_key()
+    if (start is None) != (end is None):
+        # Rentang setengah terbuka: lengkapi dengan batas data (indeks butuh keduanya)
+        dates = cube.keys["date"]
+        start = dates.min() if start is None else start
+        end = dates.max() if end is None else end
+    sub = cube.slice(start, end, list(topics) if topics else None)
+    if models is not None:
+        sub = sub.take(np.flatnonzero(_models_mask(sub.keys, models)))
+    return Selection(sub)
+
+
+def winrate_leaderboard(
+    battles: Optional[BattleTable],
+    q: Query,
+    winrate: Optional[pd.DataFrame] = None,
+) -> pd.DataFrame:
+    """Win-rate + Wilson CI (+ Elo) dari battles sesuai filter; fallback tabel winrate.csv statis."""
+    start, end, topics, models = q.filter_key()
+    if battles is not None and not battles.empty:
+        out = battles.leaderboard(battles.select(start, end, list(topics) if topics else None))
+    elif winrate is not None and not winrate.empty:
+        title = winrate["model_title"] if "model_title" in winrate.columns else winrate["model"]
+        out = winrate.assign(model=title.astype(str)).sort_values("win_rate", ascending=False)
+    else:
+        return pd.DataFrame(columns=["model", "win_rate", "wr_lo", "wr_hi"])
+    if models is not None:
+        out = out[out["model"].astype(str).isin(models)]
+    return out.head(q.top_n).reset_index(drop=True)
+
+
+# Nama agregat → fungsi (engine, selection, query)
+AGGREGATES: Dict[str, Callable[["QueryEngine", Selection, Query], Any]] = {
+    "kpis": lambda e, s, q: s.kpis(),
+    "popularity": lambda e, s, q: s.popularity(q.top_n),
+    "trend": lambda e, s, q: s.trend(q.top_n),
+    "topics": lambda e, s, q: s.topics(),
+    "tts_hist": lambda e, s, q: s.tts_hist(),
+    "tts": lambda e, s, q: s.tts(q.top_n),
+    "solved": lambda e, s, q: s.solved(q.top_n),
+    "fit": lambda e, s, q: s.fit(q.top_n),
+    "fit_winners": lambda e, s, q: s.fit_winners(q.min_n),
+    "routing": lambda e, s, q: s.routing(q.min_n),
+    "winrate": lambda e, s, q: winrate_leaderboard(e.battles, q, e.winrate),
+}
+
+
+class QueryEngine:
+    """Cube usage (+ battles/winrate opsional) yang dijawab in-process; aman dipakai banyak thread."""
+
+    def __init__(
+        self,
+        cube: RollupCube,
+        battles: Optional[BattleTable] = None,
+        winrate: Optional[pd.DataFrame] = None,
+    ) -> None:
+        self.cube = cube
+        self.battles = battles
+        self.winrate = winrate
+        self._selections: "OrderedDict[tuple, Selection]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_usage(
+        cls,
+        usage: pd.DataFrame,
+        battles: Optional[pd.DataFrame] = None,
+        winrate: Optional[pd.DataFrame] = None,
+        aliases: Optional[Dict[str, str]] = None,
+    ) -> "QueryEngine":
+        """Dari frame usage (boleh mentah; dinormalisasi dulu) + tabel duel/winrate opsional."""
+        usage = add_model_title(ensure_usage_schema(usage), aliases)
+        table = None
+        if battles is not None and not battles.empty:
+            table = build_battle_table(ensure_battles_schema(battles), normalize=lambda m: model_title(m, aliases))
+        if winrate is not None:
+            winrate = add_model_title(ensure_winrate_schema(winrate), aliases)
+        return cls(build_rollup(usage), table, winrate)
+
+    @classmethod
+    def from_dir(cls, data_dir: Union[str, Path] = "data", aliases: Optional[Dict[str, str]] = None) -> "QueryEngine":
+        """Dari folder data/ dashboard (usage/battles/winrate; CSV, sidecar, atau Parquet)."""
+        data_dir = Path(data_dir)
+        if aliases is None:
+            aliases = load_aliases(data_dir / "model_aliases.json")
+        read = lambda name, **kw: read_table(data_dir / f"{name}.csv", kind=name, **kw) if resolve_source(data_dir / f"{name}.csv") else None
+        return cls.from_usage(
+            read("usage", columns=USAGE_VIEW_COLUMNS),
+            battles=read("battles"),
+            winrate=read("winrate"),
+            aliases=aliases,
+        )
+
+    def select(self, q: Query) -> Selection:
+        """`Selection` untuk filter `q` (di-memo LRU per kunci filter)."""
+        key = q.filter_key()
+        with self._lock:
+            sel = self._selections.get(key)
+            if sel is not None:
+                self._selections.move_to_end(key)
+                return sel
+        sel = select(self.cube, q)
+        with self._lock:
+            self._selections[key] = sel
+            while len(self._selections) > SELECTION_CACHE:
+                self._selections.popitem(last=False)
+        return sel
+
+    def query(self, q: Query, aggregates: Iterable[str] = DEFAULT_AGGREGATES) -> Dict[str, Any]:
+        """Beberapa agregat atas satu seleksi: {nama agregat: hasil}."""
+        names = list(aggregates)
+        unknown = [n for n in names if n not in AGGREGATES]
+        if unknown:
+            raise KeyError(f"Agregat tidak dikenal: {', '.join(unknown)} (pilihan: {', '.join(AGGREGATES)})")
+        sel = self.select(q)
+        return {n: AGGREGATES[n](self, sel, q) for n in names}
+
+    def query_many(self, queries: Sequence[Query], aggregates: Iterable[str] = DEFAULT_AGGREGATES) -> List[Dict[str, Any]]:
+        """`query` untuk setiap kueri; kueri dengan filter sama berbagi satu seleksi."""
+        names = tuple(aggregates)
+        return [self.query(q, names) for q in queries]
+
+    def export_routing(self, path: Union[str, Path], min_n: int = MIN_N_LEADER, per_topic: Optional[int] = None) -> Optional[Path]:
+        """Tabel routing TANPA filter → `path` (Arrow IPC, mis. data/`fit.ROUTING_FILE`; baca dengan `fit.load_routing`)."""
+        return export_routing(self.select(Query()).routing(min_n, per_topic), Path(path))
+
+
+def to_records(result: Dict[str, Any]) -> Dict[str, Any]:
+    """Hasil `query` → struktur JSON-able (DataFrame → list record), mis. untuk respons HTTP."""
+    def conv(v: Any) -> Any:
+        if isinstance(v, pd.DataFrame):
+            frame = v.reset_index() if v.index.name is not None else v
+            return json.loads(frame.to_json(orient="records", date_format="iso"))
+        if isinstance(v, dict):
+            return {k: (None if isinstance(x, float) and np.isnan(x) else x) for k, x in v.items()}
+        return v
+    return {k: conv(v) for k, v in result.items()}
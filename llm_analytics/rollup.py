@@ -0,0 +1,258 @@
+"""Rollup cube usage per (date, model_title, topic).
+
+Cube dibangun sekali per versi dataset. Semua chart & KPI dashboard dijawab dengan
+memotong cube (rentang tanggal + topik) lalu mengagregasi baris kunci — biayanya
+bergantung pada jumlah kunci unik, bukan jumlah interaksi.
+
+Tiap kunci menyimpan: count, solved_sum, solved_n, tts_sum, tts_n, dan histogram
+TTS jarang (sparse) dengan bin bilangan bulat (TTS = jumlah turn). Karena TTS
+praktis bernilai bulat, kuantil dari histogram identik dengan `Series.quantile`.
+Histogram ini adalah sketsa kuantil yang bisa digabung (penjumlahan per bin):
+median/p75/p90 untuk filter apa pun = gabungan histogram kunci terpilih
+(`tts_summary`). Notebook memakai struktur yang sama lewat `llm_analytics.tts`.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from llm_analytics.filters import FilterIndex, build_filter_index
+
+# Batas atas bin TTS; nilai di atasnya dimasukkan ke bin terakhir
+TTS_MAX_BIN = 1024
+# Kuantil ringkasan TTS standar (nama kolom di `tts_summary`)
+TTS_SUMMARY = {0.5: "median", 0.75: "p75", 0.9: "p90"}
+
+KEY_COLUMNS = ["date", "model", "topic"]
+MEASURE_COLUMNS = ["count", "solved_sum", "solved_n", "tts_sum", "tts_n"]
+
+
+@dataclass
+class RollupCube:
+    """Baris kunci teragregasi + histogram TTS jarang (hist_key → baris `keys`)."""
+
+    keys: pd.DataFrame
+    hist_key: np.ndarray
+    hist_bin: np.ndarray
+    hist_count: np.ndarray
+    index: Optional[FilterIndex] = field(default=None, repr=False)
+
+    @property
+    def empty(self) -> bool:
+        return self.keys.empty or int(self.keys["count"].sum()) == 0
+
+    def slice(
+        self,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        topics: Optional[Sequence[str]] = None,
+    ) -> "RollupCube":
+        """Sub-cube untuk rentang tanggal [start, end] dan daftar topik (None/kosong = semua)."""
+        if self.index is None:
+            self.index = build_filter_index(self.keys["date"], self.keys["topic"])
+        return self.take(self.index.select(start, end, topics))
+
+    def take(self, rows: np.ndarray) -> "RollupCube":
+        """Sub-cube dari posisi baris kunci (naik)."""
+        if len(rows) == len(self.keys):
+            return self
+        mask = np.zeros(len(self.keys), dtype=bool)
+        mask[rows] = True
+        new_id = np.cumsum(mask) - 1
+        sel = mask[self.hist_key]
+        return RollupCube(
+            keys=self.keys.take(rows).reset_index(drop=True),
+            hist_key=new_id[self.hist_key[sel]].astype(np.int32),
+            hist_bin=self.hist_bin[sel],
+            hist_count=self.hist_count[sel],
+        )
+
+
+def build_rollup(usage: pd.DataFrame) -> RollupCube:
+    """Bangun cube dari usage yang sudah dinormalisasi (`ensure_usage_schema`).
+
+    Memakai kolom `model_title` (lihat `models.add_model_title`) bila tersedia.
+    """
+    model = usage["model_title"] if "model_title" in usage.columns else usage["model"]
+    if not isinstance(model.dtype, pd.CategoricalDtype):
+        model = model.astype(str).astype("category")
+    frame = pd.DataFrame({
+        "date": usage["date"].dt.normalize(),
+        "model": model.cat.remove_unused_categories(),
+        "topic": usage["topic"].astype("category"),
+        "is_solved": usage["is_solved"].astype("Float64"),
+        "tts": usage["tts"].astype("float64"),
+    })
+    g = frame.groupby(KEY_COLUMNS, observed=True, dropna=False, sort=True)
+    keys = g.agg(
+        count=("tts", "size"),
+        solved_sum=("is_solved", "sum"),
+        solved_n=("is_solved", "count"),
+        tts_sum=("tts", "sum"),
+        tts_n=("tts", "count"),
+    ).reset_index()
+    keys["solved_sum"] = keys["solved_sum"].astype("int64")
+    keys["solved_n"] = keys["solved_n"].astype("int64")
+
+    # Histogram TTS jarang: pasangan (key, bin) unik beserta jumlahnya
+    row_key = g.ngroup().to_numpy()
+    tts = frame["tts"].to_numpy()
+    ok = ~np.isnan(tts)
+    bins = np.clip(np.rint(tts[ok]), 0, TTS_MAX_BIN).astype(np.int64)
+    width = TTS_MAX_BIN + 1
+    pairs, counts = np.unique(row_key[ok].astype(np.int64) * width + bins, return_counts=True)
+    return RollupCube(
+        keys=keys,
+        hist_key=(pairs // width).astype(np.int32),
+        hist_bin=(pairs % width).astype(np.int16),
+        hist_count=counts.astype(np.int64),
+        index=build_filter_index(keys["date"], keys["topic"]),
+    )
+
+
+# ----------------------- Kuantil dari histogram -----------------------
+def _hist_quantiles(matrix: np.ndarray, qs: Sequence[float]) -> np.ndarray:
+    """Kuantil linear (setara `Series.quantile`) per baris matriks hitungan (grup × bin)."""
+    cum = matrix.cumsum(axis=1)
+    n = cum[:, -1] if cum.size else np.zeros(len(matrix))
+    out = np.full((len(matrix), len(qs)), np.nan)
+    has = n > 0
+    for j, q in enumerate(qs):
+        h = (n[has] - 1) * q
+        lo, hi = np.floor(h), np.ceil(h)
+        v_lo = (cum[has] <= lo[:, None]).sum(axis=1)
+        v_hi = (cum[has] <= hi[:, None]).sum(axis=1)
+        out[has, j] = v_lo + (h - lo) * (v_hi - v_lo)
+    return out
+
+
+def _group_histograms(cube: RollupCube, by: Optional[str]) -> tuple:
+    """(label grup, matriks hitungan grup × bin TTS) hasil penggabungan histogram per kunci."""
+    keys = cube.keys
+    if by is None:
+        codes, labels = np.zeros(len(keys), dtype=np.int64), pd.Index(["__all__"])
+    else:
+        present = keys.loc[keys["count"] > 0, by]
+        labels = pd.Index(sorted(present.astype(str).unique()))
+        codes = labels.get_indexer(keys[by].astype(str))
+    width = int(cube.hist_bin.max()) + 1 if len(cube.hist_bin) else 1
+    grp = codes[cube.hist_key].astype(np.int64)
+    ok = grp >= 0
+    flat = np.bincount(
+        grp[ok] * width + cube.hist_bin[ok].astype(np.int64),
+        weights=cube.hist_count[ok],
+        minlength=len(labels) * width,
+    )
+    return labels, flat.astype(np.int64).reshape(len(labels), width)
+
+
+def tts_quantiles(cube: RollupCube, qs: Sequence[float] = (0.5, 0.75), by: Optional[str] = "model") -> pd.DataFrame:
+    """Kuantil TTS per grup (`by`) atau keseluruhan (`by=None`) dari histogram cube."""
+    labels, matrix = _group_histograms(cube, by)
+    vals = _hist_quantiles(matrix, qs)
+    out = pd.DataFrame(vals, columns=[f"q{q:g}" for q in qs])
+    out.insert(0, by or "group", labels)
+    return out
+
+
+def tts_summary(cube: RollupCube, by: Optional[str] = "model") -> pd.DataFrame:
+    """Per grup: n (jumlah nilai TTS), median, p75, p90 — satu penggabungan histogram, urut median naik."""
+    labels, matrix = _group_histograms(cube, by)
+    out = pd.DataFrame(_hist_quantiles(matrix, tuple(TTS_SUMMARY)), columns=list(TTS_SUMMARY.values()))
+    out.insert(0, by or "group", labels)
+    out.insert(1, "n", matrix.sum(axis=1))
+    out = out[out["n"] > 0]
+    return out.sort_values(["median", by or "group"], kind="stable").reset_index(drop=True)
+
+
+def tts_histogram(cube: RollupCube) -> pd.DataFrame:
+    """Jumlah interaksi per nilai TTS (untuk histogram berbobot)."""
+    if not len(cube.hist_bin):
+        return pd.DataFrame({"tts": pd.Series(dtype="float64"), "count": pd.Series(dtype="int64")})
+    counts = np.bincount(cube.hist_bin.astype(np.int64), weights=cube.hist_count).astype(np.int64)
+    nz = np.flatnonzero(counts)
+    return pd.DataFrame({"tts": nz.astype("float64"), "count": counts[nz]})
+
+
+# ----------------------- Agregasi view -----------------------
+def kpis(cube: RollupCube) -> Dict[str, float]:
+    keys = cube.keys
+    solved_n = int(keys["solved_n"].sum())
+    med = tts_quantiles(cube, qs=(0.5,), by=None).iloc[0, 1]
+    return {
+        "total": int(keys["count"].sum()),
+        "models": int(keys.loc[keys["count"] > 0, "model"].nunique()),
+        "solved_rate": float(keys["solved_sum"].sum() / solved_n) if solved_n else np.nan,
+        "median_tts": float(med),
+    }
+
+
+def popularity(cube: RollupCube) -> pd.DataFrame:
+    """Jumlah interaksi per model, urut menurun."""
+    return (
+        cube.keys.groupby("model", observed=True)["count"].sum()
+        .reset_index()
+        .sort_values("count", ascending=False)
+    )
+
+
+def daily_counts(cube: RollupCube) -> pd.DataFrame:
+    """Jumlah interaksi per (date, model); tanggal kosong diabaikan."""
+    return (
+        cube.keys.groupby(["date", "model"], observed=True)["count"].sum()
+        .reset_index()
+    )
+
+
+def topic_counts(cube: RollupCube) -> pd.DataFrame:
+    return (
+        cube.keys.groupby("topic", observed=True)["count"].sum()
+        .reset_index()
+        .sort_values("count", ascending=False)
+    )
+
+
+def solved_rates(cube: RollupCube, models: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Solved-rate per (topic, model) = solved_sum / solved_n (NaN bila tak ada label)."""
+    keys = cube.keys if models is None else cube.keys[cube.keys["model"].isin(models)]
+    agg = keys.groupby(["topic", "model"], observed=True)[["solved_sum", "solved_n", "count"]].sum().reset_index()
+    agg["is_solved"] = (agg["solved_sum"] / agg["solved_n"].where(agg["solved_n"] > 0)).astype("float64")
+    return agg
+
+
+def merge_rollups(*cubes: RollupCube) -> RollupCube:
+    """Gabungkan beberapa cube (mis. cube berjalan + cube chunk baru).
+
+    Biaya sebanding jumlah kunci & pasangan histogram, bukan jumlah baris mentah.
+    """
+    cubes = tuple(c for c in cubes if c is not None and len(c.keys))
+    if not cubes:
+        from llm_analytics.ingest import ensure_usage_schema
+        return build_rollup(ensure_usage_schema(None))
+    if len(cubes) == 1:
+        return cubes[0]
+
+    keys = pd.concat([c.keys for c in cubes], ignore_index=True)
+    for col in ("model", "topic"):
+        keys[col] = keys[col].astype(str).astype("category")
+    g = keys.groupby(KEY_COLUMNS, observed=True, dropna=False, sort=True)
+    merged = g[MEASURE_COLUMNS].sum().reset_index()
+    new_id = g.ngroup().to_numpy().astype(np.int64)
+
+    offsets = np.cumsum([0] + [len(c.keys) for c in cubes])
+    hist_key = np.concatenate([new_id[offsets[i] + c.hist_key] for i, c in enumerate(cubes)])
+    hist_bin = np.concatenate([c.hist_bin for c in cubes]).astype(np.int64)
+    hist_count = np.concatenate([c.hist_count for c in cubes])
+    width = TTS_MAX_BIN + 1
+    pairs, inv = np.unique(hist_key * width + hist_bin, return_inverse=True)
+    counts = np.bincount(inv, weights=hist_count, minlength=len(pairs)).astype(np.int64)
+    return RollupCube(
+        keys=merged,
+        hist_key=(pairs // width).astype(np.int32),
+        hist_bin=(pairs % width).astype(np.int16),
+        hist_count=counts,
+        index=build_filter_index(merged["date"], merged["topic"]),
+    )
@@ -0,0 +1,193 @@
+"""Dataset usage read-only bersama: satu salinan per proses, sesi hanya memegang indeks.
+
+Kolom usage bertipe ditulis sekali ke berkas Arrow IPC (tanpa kompresi) di cache
+artefak lalu di-memory-map. Kolom dibangun langsung di atas buffer Arrow tanpa
+salinan (angka, tanggal, kode categorical; user_text sebagai string Arrow) dan
+ditandai read-only, sehingga:
+- banyak sesi Streamlit dalam satu proses berbagi objek yang sama,
+- beberapa proses/worker berbagi halaman berkas yang sama lewat page cache OS,
+- restart worker cukup memetakan ulang berkas, tanpa parsing CSV/derivasi.
+
+Filter per sesi menghasilkan array posisi baris (`SharedUsage.rows`), bukan
+salinan frame; `take` hanya dipakai untuk potongan kecil yang benar-benar ditampilkan.
+"""
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from llm_analytics.cache import ArtifactCache
+from llm_analytics.filters import FilterIndex, build_filter_index
+from llm_analytics.ingest import HAS_ARROW
+
+if HAS_ARROW:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+
+ARROW_SUFFIX = ".arrow"
+TEXT_COLUMN = "user_text"
+
+
+def _readonly(arr: np.ndarray) -> np.ndarray:
+    arr.flags.writeable = False
+    return arr
+
+
+def _single_chunk(arr) -> pa.Array:
+    return arr.combine_chunks() if isinstance(arr, pa.ChunkedArray) else arr
+
+
+def _to_arrow(s: pd.Series) -> pa.Array:
+    """Kolom pandas → Array Arrow yang bisa dibaca balik tanpa salinan."""
+    dtype = s.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        codes = s.cat.codes.to_numpy()
+        return pa.DictionaryArray.from_arrays(
+            pa.array(codes, mask=codes < 0),
+            pa.array(dtype.categories.astype(str).to_numpy(dtype=object), type=pa.string()),
+        )
+    if isinstance(dtype, pd.ArrowDtype):
+        return _single_chunk(pa.array(s.array))
+    if str(dtype) == "string" or dtype == object:
+        return pa.array(s.astype(object).where(s.notna(), None).to_numpy(), type=pa.string(), from_pandas=True)
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        # Integer/boolean nullable: nilai + bitmap null
+        return pa.array(s.to_numpy(dtype=dtype.numpy_dtype, na_value=0), mask=s.isna().to_numpy())
+    values = s.to_numpy()
+    if values.dtype.kind == "M":
+        # datetime64[ns]: NaT tetap nilai sentinel (bukan null) agar baca balik tanpa salinan
+        return pa.array(values.astype("datetime64[ns]").view(np.int64)).view(pa.timestamp("ns"))
+    # Float: NaN disimpan apa adanya (bukan null)
+    return pa.array(values, from_pandas=False)
+
+
+def _from_arrow(arr: pa.Array, dtype_name: Optional[str]) -> pd.api.extensions.ExtensionArray | np.ndarray:
+    """Array Arrow (satu chunk) → array pandas di atas buffer yang sama bila memungkinkan."""
+    if pa.types.is_dictionary(arr.type):
+        codes = arr.indices
+        if codes.null_count:
+            codes = codes.fill_null(-1)
+        categories = pd.Index(arr.dictionary.to_pandas())
+        return pd.Categorical.from_codes(_readonly(codes.to_numpy(zero_copy_only=False)), dtype=pd.CategoricalDtype(categories))
+    if pa.types.is_string(arr.type) or pa.types.is_large_string(arr.type):
+        return pd.arrays.ArrowExtensionArray(arr)
+    nullable = dtype_name is not None and isinstance(pd.api.types.pandas_dtype(dtype_name), pd.api.extensions.ExtensionDtype)
+    if nullable and pa.types.is_integer(arr.type):
+        # Integer nullable (mis. is_solved Int8): nilai zero-copy + mask
+        width = arr.type.bit_width // 8
+        values = np.frombuffer(arr.buffers()[1], dtype=arr.type.to_pandas_dtype(), count=len(arr), offset=arr.offset * width)
+        mask = ~arr.is_valid().to_numpy(zero_copy_only=False) if arr.null_count else np.zeros(len(arr), dtype=bool)
+        return type(pd.array([], dtype=dtype_name))(_readonly(values), _readonly(mask))
+    try:
+        values = arr.to_numpy(zero_copy_only=True)
+    except pa.ArrowInvalid:
+        # Boolean (bit-packed) / kolom dengan null: perlu salinan
+        values = arr.to_pandas().to_numpy()
+    values = _readonly(values)
+    if dtype_name and dtype_name != str(values.dtype):
+        return pd.array(values, dtype=dtype_name)
+    return values
+
+
+def write_frame(df: pd.DataFrame, path: Path) -> Path:
+    """Tulis frame bertipe ke berkas Arrow IPC (atomik); dtype pandas disimpan di metadata."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    arrays = [_to_arrow(df[c]) for c in df.columns]
+    meta = {f"dtype:{c}": str(df[c].dtype) for c in df.columns}
+    table = pa.Table.from_arrays(arrays, names=[str(c) for c in df.columns]).replace_schema_metadata(meta)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with pa.OSFile(str(tmp), "wb") as sink, ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table, max_chunksize=max(len(table), 1))
+    os.replace(tmp, path)
+    return path
+
+
+def map_frame(path: Path) -> pd.DataFrame:
+    """Memory-map berkas dari `write_frame` → DataFrame read-only di atas halaman berkas."""
+    source = pa.memory_map(str(path), "r")
+    table = ipc.open_file(source).read_all()
+    meta = {k.decode(): v.decode() for k, v in (table.schema.metadata or {}).items()}
+    columns = {}
+    for name in table.column_names:
+        col = table.column(name)
+        arr = col.chunk(0) if col.num_chunks == 1 else col.combine_chunks()
+        columns[name] = _from_arrow(arr, meta.get(f"dtype:{name}"))
+    return pd.DataFrame(columns, copy=False)
+
+
+@dataclass
+class SharedUsage:
+    """Frame usage read-only (+ user_text opsional) yang dibagi semua sesi dalam proses."""
+
+    frame: pd.DataFrame
+    texts: Optional[pd.Series] = None
+    path: Optional[Path] = None
+    index: Optional[FilterIndex] = field(default=None, repr=False)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def nbytes(self) -> int:
+        return int(self.frame.memory_usage(index=False, deep=False).sum())
+
+    def rows(
+        self,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        topics: Optional[Sequence[str]] = None,
+        models: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """Posisi baris yang lolos filter (urut naik); tidak ada frame yang disalin."""
+        if self.index is None:
+            with self._lock:
+                if self.index is None:
+                    self.index = build_filter_index(self.frame["date"], self.frame["topic"])
+        rows = self.index.select(start, end, topics)
+        if models is not None:
+            model = self.frame["model_title"] if "model_title" in self.frame.columns else self.frame["model"]
+            # Cocokkan kategori (sedikit), lalu lookup kode per baris terpilih saja
+            keep = np.append(model.cat.categories.astype(str).isin(models), False)
+            rows = rows[keep[model.cat.codes.to_numpy()[rows]]]
+        return rows
+
+    def take(self, rows: np.ndarray, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Salinan kecil baris terpilih (untuk tampilan/ekspor potongan)."""
+        frame = self.frame if columns is None else self.frame[columns]
+        return frame.take(rows).reset_index(drop=True)
+
+
+def share_frame(df: pd.DataFrame) -> SharedUsage:
+    """Bungkus frame in-memory (tanpa berkas), mis. bila folder cache tidak bisa ditulis."""
+    texts = df.pop(TEXT_COLUMN) if TEXT_COLUMN in df.columns else None
+    return SharedUsage(frame=df, texts=texts)
+
+
+def shared_usage(cache: ArtifactCache, key: str, build: Callable[[], pd.DataFrame]) -> SharedUsage:
+    """Map artefak `key` dari cache (bangun + tulis bila belum ada); fallback in-memory bila gagal."""
+    if not HAS_ARROW:
+        return share_frame(build())
+    path = cache.root / f"{key}{ARROW_SUFFIX}"
+    try:
+        frame = map_frame(path)
+        os.utime(path)
+        cache.record(hit=True)
+    except (OSError, pa.ArrowException):
+        cache.record(hit=False)
+        df = build()
+        try:
+            write_frame(df, path)
+            frame = map_frame(path)
+            cache.evict()
+        except (OSError, pa.ArrowException, TypeError, ValueError):
+            return share_frame(df)
+    texts = frame.pop(TEXT_COLUMN) if TEXT_COLUMN in frame.columns else None
+    return SharedUsage(frame=frame, texts=texts, path=path)
@@ -0,0 +1,28 @@
+"""Utilitas statistik kecil yang dipakai bersama."""
+from __future__ import annotations
+
+from typing import Tuple
+
+import numpy as np
+
+
+def wilson_interval(wins, n, z: float = 1.96) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Versi vektor `wilson_ci`: (p_hat, lo, hi) per elemen; NaN bila n <= 0. Batas di-clamp ke [0, 1]."""
+    wins = np.asarray(wins, dtype="float64")
+    n = np.asarray(n, dtype="float64")
+    ok = n > 0
+    n_safe = np.where(ok, n, 1.0)
+    p = wins / n_safe
+    denom = 1 + z**2/n_safe
+    centre = p + z*z/(2*n_safe)
+    adj = z * np.sqrt(np.maximum(p*(1-p) + z*z/(4*n_safe), 0.0)/n_safe)
+    lo = np.clip((centre - adj)/denom, 0.0, None)
+    hi = np.clip((centre + adj)/denom, None, 1.0)
+    nan = np.float64(np.nan)
+    return np.where(ok, p, nan), np.where(ok, lo, nan), np.where(ok, hi, nan)
+
+
+def wilson_ci(wins: float, n: float, z: float = 1.96) -> Tuple[float, float, float]:
+    """Mengembalikan (p_hat, lo, hi) Wilson 95% CI."""
+    p, lo, hi = wilson_interval(wins, n, z)
+    return float(p), float(lo), float(hi)
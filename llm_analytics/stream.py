@@ -0,0 +1,144 @@
+"""Ingestion inkremental untuk log usage yang terus bertambah (append-only).
+
+Sumber yang dipantau:
+- satu CSV yang di-append (mis. data/usage.csv) → dibaca dari offset byte terakhir,
+- folder part file bertanggal (mis. data/usage_parts/2025-01-01.csv / .parquet)
+  → file baru dibaca sekali, CSV yang masih tumbuh di-tail per offset.
+
+Bila `classifier` diberikan, kolom topic tiap chunk dihitung ulang dari user_text.
+
+Setiap chunk dinormalisasi lewat `ensure_usage_schema` + `add_model_title`, lalu
+dijadikan cube kecil dan digabung ke cube berjalan (`merge_rollups`). Hitungan,
+solved sum, histogram TTS serta tally win/app diperbarui tanpa membaca ulang
+riwayat — biaya refresh sebanding baris baru.
+"""
+from __future__ import annotations
+
+import io
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+
+from llm_analytics.ingest import HAS_ARROW, ensure_usage_schema, ensure_winrate_schema
+from llm_analytics.models import add_model_title
+from llm_analytics.rollup import RollupCube, build_rollup, merge_rollups
+from llm_analytics.topics import TopicClassifier
+
+CHUNK_ROWS = 200_000
+
+
+class UsageStream:
+    """Cube usage berjalan atas sumber append-only; panggil `poll()` untuk menyerap data baru."""
+
+    def __init__(
+        self,
+        source: Path,
+        aliases: Optional[Dict[str, str]] = None,
+        chunk_rows: int = CHUNK_ROWS,
+        classifier: Optional[TopicClassifier] = None,
+    ) -> None:
+        self.source = Path(source)
+        self.aliases = aliases
+        self.classifier = classifier
+        self.chunk_rows = chunk_rows
+        self.cube: RollupCube = merge_rollups()
+        self.rows = 0
+        self.generation = 0  # naik setiap ada data baru (untuk kunci cache)
+        self._offsets: Dict[Path, int] = {}   # CSV → offset byte yang sudah dibaca
+        self._headers: Dict[Path, List[str]] = {}
+        self._seen_parts: Dict[Path, int] = {}  # Parquet → ukuran saat dibaca
+        self._lock = threading.Lock()
+
+    # ---- daftar file ----
+    def _files(self) -> List[Path]:
+        if self.source.is_dir():
+            return sorted(p for p in self.source.iterdir() if p.suffix in (".csv", ".parquet"))
+        return [self.source] if self.source.exists() else []
+
+    def _reset(self) -> None:
+        self.cube = merge_rollups()
+        self.rows = 0
+        self._offsets.clear()
+        self._headers.clear()
+        self._seen_parts.clear()
+
+    # ---- pembacaan chunk ----
+    def _csv_chunks(self, path: Path) -> Iterator[pd.DataFrame]:
+        size = path.stat().st_size
+        offset = self._offsets.get(path, 0)
+        if size <= offset:
+            return
+        with open(path, "rb") as fh:
+            if path not in self._headers:
+                header = fh.readline()
+                if not header.endswith(b"\n"):
+                    return  # header belum lengkap
+                self._headers[path] = pd.read_csv(io.BytesIO(header), nrows=0).columns.tolist()
+                offset = fh.tell()
+            fh.seek(offset)
+            data = fh.read(size - offset)
+        # Baris terakhir yang belum lengkap ditunda ke polling berikutnya
+        cut = data.rfind(b"\n") + 1
+        if cut == 0:
+            self._offsets[path] = offset
+            return
+        self._offsets[path] = offset + cut
+        yield from pd.read_csv(
+            io.BytesIO(data[:cut]),
+            header=None,
+            names=self._headers[path],
+            chunksize=self.chunk_rows,
+        )
+
+    def _parquet_chunks(self, path: Path) -> Iterator[pd.DataFrame]:
+        size = path.stat().st_size
+        if self._seen_parts.get(path) == size or not HAS_ARROW:
+            return
+        self._seen_parts[path] = size
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=self.chunk_rows):
+            yield batch.to_pandas()
+
+    def _needs_reset(self) -> bool:
+        # File CSV menyusut/diganti (rotasi) → bangun ulang dari awal
+        return any(not p.exists() or p.stat().st_size < off for p, off in self._offsets.items())
+
+    # ---- API ----
+    def poll(self) -> int:
+        """Serap baris baru dari sumber; kembalikan jumlah baris yang ditambahkan."""
+        with self._lock:
+            if self._needs_reset():
+                self._reset()
+                self.generation += 1
+            added = 0
+            parts = [self.cube]
+            for path in self._files():
+                reader = self._parquet_chunks if path.suffix == ".parquet" else self._csv_chunks
+                for chunk in reader(path):
+                    chunk = add_model_title(ensure_usage_schema(chunk), self.aliases)
+                    if self.classifier is not None and "user_text" in chunk.columns:
+                        chunk["topic"] = self.classifier.classify(chunk["user_text"]).astype("category")
+                    parts.append(build_rollup(chunk))
+                    added += len(chunk)
+            if added:
+                self.cube = merge_rollups(*parts)
+                self.rows += added
+                self.generation += 1
+            return added
+
+    @property
+    def version(self) -> str:
+        return f"stream:{self.source}:{self.generation}"
+
+    def winrate(self) -> pd.DataFrame:
+        """Tally win/app per model dari cube berjalan (wins = solved, apps = interaksi)."""
+        keys = self.cube.keys
+        tally = (
+            keys.groupby("model", observed=True)
+            .agg(wins=("solved_sum", "sum"), apps=("count", "sum"))
+            .reset_index()
+        )
+        tally["model_title"] = tally["model"]
+        return ensure_winrate_schema(tally)
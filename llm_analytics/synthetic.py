@@ -0,0 +1,263 @@
+"""Generator data sintetis deterministik untuk benchmark & uji skala.
+
+Menghasilkan data/usage.csv, winrate.csv, ngrams.csv dengan skema yang sama
+seperti keluaran notebook (lihat `ingest.USAGE_COLUMNS`), pada skala apa pun
+(10k … 10M baris) tanpa memuat semuanya ke memori: baris dibuat per chunk
+dengan RNG `default_rng([seed, chunk])`, sehingga isi berkas identik untuk
+konfigurasi yang sama, berapa pun ukuran chunk-nya diproses ulang.
+
+Parameter distribusi (`SyntheticConfig`): jumlah model & skew popularitasnya
+(Zipf), skew topik, rata-rata/maksimum TTS (geometrik), solved rate dasar per
+model, dan panjang teks user (jumlah kata). `generate_conversations` membuat
+tabel duel skema arena (conversation_a/b) untuk benchmark derivasi notebook.
+"""
+from __future__ import annotations
+
+import json
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from llm_analytics.derive import OK_PAT, TOPIC_RULES
+from llm_analytics.ngrams import STOPWORDS, NgramCounter, write_ngrams_csv
+from llm_analytics.stats import wilson_interval
+from llm_analytics.topics import DEFAULT_RULES
+
+SCALES = {"10k": 10_000, "100k": 100_000, "1M": 1_000_000, "10M": 10_000_000}
+CHUNK_ROWS = 250_000
+# Teks untuk ngrams.csv diambil dari baris awal saja (cukup untuk top-k yang stabil)
+NGRAM_ROWS = 200_000
+
+MODEL_FAMILIES = (
+    "gpt-4", "gpt-3.5-turbo", "claude-3-opus", "claude-2.1", "llama-3-70b-chat", "llama-2-13b-chat",
+    "mistral-7b-instruct", "mixtral-8x7b-instruct", "gemini-pro", "vicuna-13b", "qwen-72b-chat", "yi-34b-chat",
+)
+TOPICS = ("Coding", "Analisis Data", "Terjemahan", "Penulisan", "Lainnya")
+SOLVED_WORDS = ("thanks", "thank you", "works", "solved", "perfect")
+_SYLLABLES = ("ka", "ri", "to", "ne", "mu", "sa", "lo", "pe", "di", "ga", "ru", "bo", "te", "ya", "ni", "ku")
+
+
+@dataclass(frozen=True)
+class SyntheticConfig:
+    rows: int = 10_000
+    models: int = 12
+    model_skew: float = 1.1          # eksponen Zipf popularitas model (0 = seragam)
+    topics: Tuple[str, ...] = TOPICS
+    topic_skew: float = 0.8          # eksponen Zipf distribusi topik
+    days: int = 365
+    start: str = "2025-01-01"
+    tts_mean: float = 3.0            # rata-rata turn (geometrik, ≥ 1)
+    tts_max: int = 40
+    solved_rate: float = 0.6         # rata-rata; tiap model digeser ±0.15 secara deterministik
+    text_words: Tuple[int, int] = (4, 24)  # (min, max) kata per user_text; (0, 0) = tanpa teks
+    text_rows: Optional[int] = None  # hanya baris awal yang berisi teks (None = semua)
+    vocab: int = 5_000
+    seed: int = 42
+    chunk_rows: int = CHUNK_ROWS
+
+    @property
+    def fingerprint(self) -> str:
+        return json.dumps(asdict(self), sort_keys=True)
+
+
+def parse_scale(value: str) -> int:
+    """'10k' / '1M' / '10M' / '25000' → jumlah baris."""
+    value = str(value).strip()
+    if value in SCALES:
+        return SCALES[value]
+    suffix = {"k": 1_000, "K": 1_000, "m": 1_000_000, "M": 1_000_000}.get(value[-1:])
+    return int(float(value[:-1]) * suffix) if suffix else int(value)
+
+
+def _zipf(n: int, s: float) -> np.ndarray:
+    p = 1.0 / np.arange(1, n + 1) ** s
+    return p / p.sum()
+
+
+def model_names(n: int) -> List[str]:
+    """Nama mentah model; sebagian bersufiks tanggal agar kanonikalisasi judul ikut teruji."""
+    out = []
+    for i in range(n):
+        base = MODEL_FAMILIES[i % len(MODEL_FAMILIES)]
+        name = base if i < len(MODEL_FAMILIES) else f"{base}-v{i // len(MODEL_FAMILIES) + 1}"
+        out.append(f"{name}-2024{(i % 12) + 1:02d}01" if i % 3 == 2 else name)
+    return out
+
+
+def vocabulary(n: int, seed: int) -> np.ndarray:
+    """Kata semu (≥ 3 huruf, unik) + stopword umum; urutan = peringkat frekuensi Zipf.
+
+    Kata yang cocok OK_PAT atau aturan topik dibuang agar solved/topik hanya
+    ditentukan oleh kata yang disisipkan generator.
+    """
+    rng = np.random.default_rng([seed, 7])
+    syl = np.array(_SYLLABLES)
+    words = {"".join(rng.choice(syl, size=rng.integers(2, 5))) for _ in range(n * 2)}
+    words = sorted(w for w in words if not _reserved(w))[:n]
+    rng.shuffle(words)
+    stop = sorted(w for w in STOPWORDS if not _reserved(w))[:20]
+    return np.array(stop + words, dtype=object)
+
+
+def _reserved(word: str) -> bool:
+    return bool(OK_PAT.search(word)) or any(p.search(word) for p in TOPIC_RULES.values())
+
+
+def _topic_keywords(topics: Sequence[str]) -> Dict[str, List[str]]:
+    """Kata kunci polos (tanpa regex) per topik dari aturan bawaan; topik lain → kosong."""
+    return {t: [k for k in DEFAULT_RULES.get(t, []) if k.isalpha()] for t in topics}
+
+
+def _texts(rng: np.random.Generator, n: int, cfg: SyntheticConfig, vocab: np.ndarray, p_vocab: np.ndarray) -> np.ndarray:
+    lo, hi = cfg.text_words
+    if hi <= 0:
+        return np.full(n, "", dtype=object)
+    lens = rng.integers(max(lo, 1), hi + 1, size=n)
+    words = vocab[rng.choice(len(vocab), size=int(lens.sum()), p=p_vocab)]
+    ends = np.cumsum(lens)
+    return np.array([" ".join(words[e - k:e]) for e, k in zip(ends.tolist(), lens.tolist())], dtype=object)
+
+
+def _add_keywords(rng: np.random.Generator, text: np.ndarray, labels: np.ndarray, keywords: Dict[str, List[str]]) -> None:
+    """80% teks diawali satu kata kunci topiknya (klasifikasi ulang tetap bermakna); in-place."""
+    lucky = rng.random(len(text)) < 0.8
+    for t, kws in keywords.items():
+        rows = np.flatnonzero((labels == t) & lucky)
+        if kws and len(rows):
+            picked = np.array(kws, dtype=object)[rng.integers(0, len(kws), size=len(rows))]
+            text[rows] = picked + " " + text[rows]
+
+
+def usage_chunks(cfg: SyntheticConfig) -> Iterator[pd.DataFrame]:
+    """Baris usage per chunk (kolom = ingest.USAGE_COLUMNS), deterministik per (seed, chunk)."""
+    names = np.array(model_names(cfg.models), dtype=object)
+    p_model = _zipf(cfg.models, cfg.model_skew)
+    topics = np.array(cfg.topics, dtype=object)
+    p_topic = _zipf(len(topics), cfg.topic_skew)
+    keywords = _topic_keywords(cfg.topics)
+    quality = cfg.solved_rate + 0.15 * np.sin(np.arange(cfg.models) * 2.1)
+    vocab = vocabulary(cfg.vocab, cfg.seed)
+    p_vocab = _zipf(len(vocab), 1.05)
+    start = np.datetime64(cfg.start, "D")
+
+    for i, lo in enumerate(range(0, cfg.rows, cfg.chunk_rows)):
+        n = min(cfg.chunk_rows, cfg.rows - lo)
+        rng = np.random.default_rng([cfg.seed, i])
+        model = rng.choice(cfg.models, size=n, p=p_model)
+        topic = rng.choice(len(topics), size=n, p=p_topic)
+        tts = np.minimum(rng.geometric(1.0 / max(cfg.tts_mean, 1.0), size=n), cfg.tts_max)
+        solved = (rng.random(n) < np.clip(quality[model], 0.02, 0.98)).astype(np.int8)
+        n_text = n if cfg.text_rows is None else min(n, max(cfg.text_rows - lo, 0))
+        text = np.full(n, "", dtype=object)
+        if n_text and cfg.text_words[1] > 0:
+            text[:n_text] = _texts(rng, n_text, cfg, vocab, p_vocab)
+            _add_keywords(rng, text[:n_text], topics[topic[:n_text]], keywords)
+        yield pd.DataFrame({
+            "date": (start + rng.integers(0, max(cfg.days, 1), size=n).astype("timedelta64[D]")).astype(str),
+            "model": names[model],
+            "user_text": text,
+            "topic": topics[topic],
+            "tts": tts,
+            "is_solved": solved,
+            "fit_score": solved.astype(np.float32) * 100,
+        })
+
+
+def generate_usage(cfg: SyntheticConfig) -> pd.DataFrame:
+    """Seluruh usage sebagai satu frame (untuk skala kecil; skala besar pakai `write_dataset`)."""
+    return pd.concat(list(usage_chunks(cfg)), ignore_index=True)
+
+
+def winrate_table(tally: pd.DataFrame) -> pd.DataFrame:
+    """(index model; wins, apps) → winrate.csv (model, wins, apps, win_rate, wr_lo, wr_hi)."""
+    wr = tally.astype("int64").rename_axis("model").reset_index()
+    wr["win_rate"], wr["wr_lo"], wr["wr_hi"] = wilson_interval(wr["wins"], wr["apps"])
+    return wr
+
+
+def write_dataset(cfg: SyntheticConfig, out_dir: Path, ngram_rows: int = NGRAM_ROWS) -> Dict[str, Path]:
+    """Tulis usage.csv (streaming per chunk), winrate.csv, ngrams.csv, dan synthetic.json (konfigurasi)."""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    paths = {k: out_dir / f"{k}.csv" for k in ("usage", "winrate", "ngrams")}
+    tally = pd.DataFrame(columns=["wins", "apps"], dtype="int64")
+    counter = NgramCounter(max_n=2, stopwords=STOPWORDS)
+    seen = 0
+    tmp = paths["usage"].with_name("usage.csv.tmp")
+    with open(tmp, "w", encoding="utf-8", newline="") as fh:
+        for i, chunk in enumerate(usage_chunks(cfg)):
+            chunk.to_csv(fh, index=False, header=i == 0)
+            part = chunk.groupby("model", sort=False)["is_solved"].agg(["sum", "size"])
+            tally = tally.add(part.rename(columns={"sum": "wins", "size": "apps"}), fill_value=0)
+            if seen < ngram_rows and cfg.text_words[1] > 0:
+                counter.update(chunk["user_text"].iloc[:ngram_rows - seen])
+            seen += len(chunk)
+    tmp.replace(paths["usage"])
+    winrate_table(tally).to_csv(paths["winrate"], index=False)
+    write_ngrams_csv(counter, paths["ngrams"], top_k=50)
+    (out_dir / "synthetic.json").write_text(cfg.fingerprint, encoding="utf-8")
+    return paths
+
+
+def ensure_dataset(cfg: SyntheticConfig, out_dir: Path) -> Dict[str, Path]:
+    """Seperti `write_dataset`, tetapi dilewati bila folder sudah berisi data untuk konfigurasi yang sama."""
+    out_dir = Path(out_dir)
+    marker = out_dir / "synthetic.json"
+    if marker.exists() and marker.read_text(encoding="utf-8") == cfg.fingerprint:
+        return {k: out_dir / f"{k}.csv" for k in ("usage", "winrate", "ngrams")}
+    for stale in out_dir.glob("*.typed.parquet"):
+        stale.unlink()
+    return write_dataset(cfg, out_dir)
+
+
+def _conversation(user: Sequence[str], reply: str) -> List[dict]:
+    msgs = []
+    for u in user:
+        msgs.append({"role": "user", "content": u})
+        msgs.append({"role": "assistant", "content": reply})
+    return msgs
+
+
+def generate_conversations(cfg: SyntheticConfig, n: int) -> pd.DataFrame:
+    """Tabel duel skema arena (model_a/b, conversation_a/b, winner_model_a/b, winner_tie).
+
+    Jumlah pesan user per sisi ~ geometrik(`tts_mean`); pesan user pertama membawa
+    kata kunci topik duel, pesan user terakhir membawa kata 'beres' (OK_PAT) bila
+    sisi tersebut solved.
+    """
+    rng = np.random.default_rng([cfg.seed, 1_000_003])
+    names = np.array(model_names(cfg.models), dtype=object)
+    p_model = _zipf(cfg.models, cfg.model_skew)
+    vocab = vocabulary(cfg.vocab, cfg.seed)
+    p_vocab = _zipf(len(vocab), 1.05)
+    quality = cfg.solved_rate + 0.15 * np.sin(np.arange(cfg.models) * 2.1)
+    topics = np.array(cfg.topics, dtype=object)
+    labels = topics[rng.choice(len(topics), size=n, p=_zipf(len(topics), cfg.topic_skew))]
+    keywords = _topic_keywords(cfg.topics)
+
+    out = {}
+    for side in ("a", "b"):
+        model = rng.choice(cfg.models, size=n, p=p_model)
+        turns = np.minimum(rng.geometric(1.0 / max(cfg.tts_mean, 1.0), size=n), cfg.tts_max)
+        solved = rng.random(n) < np.clip(quality[model], 0.02, 0.98)
+        texts = _texts(rng, int(turns.sum()), cfg, vocab, p_vocab)
+        ends = np.cumsum(turns)
+        if cfg.text_words[1] > 0:
+            first = ends - turns
+            opening = texts[first]
+            _add_keywords(rng, opening, labels, keywords)
+            texts[first] = opening
+        closing = np.array(SOLVED_WORDS, dtype=object)[rng.integers(0, len(SOLVED_WORDS), size=n)]
+        texts[ends[solved] - 1] = texts[ends[solved] - 1] + " " + closing[solved]
+        out[f"model_{side}"] = names[model]
+        out[f"conversation_{side}"] = [_conversation(texts[e - k:e], "ok") for e, k in zip(ends.tolist(), turns.tolist())]
+        out[f"_solved_{side}"] = solved
+    a, b = out.pop("_solved_a"), out.pop("_solved_b")
+    df = pd.DataFrame(out)
+    df["winner_model_a"] = (a & ~b).astype(np.int8)
+    df["winner_model_b"] = (b & ~a).astype(np.int8)
+    df["winner_tie"] = (a == b).astype(np.int8)
+    return df
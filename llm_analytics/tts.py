@@ -0,0 +1,55 @@
+"""TTS (turns-to-solve) untuk notebook di atas struktur yang sama dengan dashboard.
+
+Sampel TTS = TTS eksak percakapan yang "beres" (kolom `tts` dari `turns`: pesan
+sampai konfirmasi pertama; fallback kolom `turn` = panjang percakapan), dengan
+TTS ≥ `min_turn`; skema pairwise selalu 2 turn. Kurva solve per turn user ada di
+`turns.solve_curve`. Sampel dimasukkan ke `RollupCube` per (date, model,
+topic) sehingga median/p75/p90 dihitung dari histogram yang sama dengan
+dashboard (`rollup.tts_summary`), bukan `groupby(...).quantile` per grup.
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+from llm_analytics.rollup import RollupCube, build_rollup, tts_summary
+
+PAIRWISE_TURNS = 2
+
+
+def effective_min_turn(min_turn: int, schema: str) -> int:
+    return PAIRWISE_TURNS if schema == "pairwise" else min_turn
+
+
+def get_tts_samples(df_in: pd.DataFrame, min_turn: int = 3, schema: str = "conversation") -> pd.DataFrame:
+    """Baris percakapan solved dengan turn ≥ batas efektif → kolom model_norm, turn, topic_category."""
+    cols = [c for c in ("model_norm", "turn", "topic_category", "date") if c in df_in.columns]
+    source = "tts" if "tts" in df_in.columns and schema != "pairwise" else "turn"
+    turn = pd.to_numeric(df_in[source], errors="coerce")
+    solved = df_in["is_solved"].fillna(False).astype(bool)
+    keep = solved & (turn >= effective_min_turn(min_turn, schema))
+    out = df_in.loc[keep, cols].reset_index(drop=True)
+    out["turn"] = turn[keep].to_numpy()
+    return out
+
+
+def tts_cube(samples: pd.DataFrame) -> RollupCube:
+    """Cube (date, model, topic) berisi histogram TTS dari `get_tts_samples`."""
+    n = len(samples)
+    frame = pd.DataFrame({
+        "date": pd.to_datetime(samples["date"]) if "date" in samples.columns else pd.Series(pd.NaT, index=samples.index, dtype="datetime64[ns]"),
+        "model": samples["model_norm"].astype(str).astype("category"),
+        "topic": (samples["topic_category"] if "topic_category" in samples.columns else pd.Series("Lainnya", index=samples.index)).astype(str).astype("category"),
+        "tts": samples["turn"].astype("float64"),
+        "is_solved": pd.array(np.ones(n, dtype=np.int8), dtype="Int8"),
+    })
+    return build_rollup(frame)
+
+
+def compute_tts(df_in: pd.DataFrame, min_turn: int = 3, schema: str = "conversation") -> pd.DataFrame:
+    """Ringkasan TTS per model (index model_norm): median, p75, p90, n_solved; urut median naik."""
+    summary = tts_summary(tts_cube(get_tts_samples(df_in, min_turn, schema)))
+    return (
+        summary.rename(columns={"model": "model_norm", "n": "n_solved"})
+        .set_index("model_norm")[["median", "p75", "p90", "n_solved"]]
+    )
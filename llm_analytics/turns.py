@@ -0,0 +1,156 @@
+"""Metrik tingkat turn di atas tabel pesan yang diratakan (`derive.flatten_conversations`).
+
+    msgs = flatten_conversations(df["conversation"])
+    turns = turn_table(msgs)                      # turn_idx + `ok` (OK_PAT) per pesan
+    m = turn_metrics(turns, len(df))              # per percakapan: solved, solve_turn, tts
+    solve_curve(m.solve_turn, df["model_norm"])   # kurva solve kumulatif per model
+
+OK_PAT dievaluasi SEKALI per pesan user, tervektorisasi: `pyarrow.compute`
+(RE2, case-insensitive) bila tersedia, selain itu `str.contains` atas teks
+lowercase. Metrik per percakapan adalah reduksi NumPy per grup atas array yang
+terurut (row, pos), tanpa loop Python per percakapan:
+- `solved`: pesan user TERAKHIR cocok OK_PAT (definisi `is_solved`);
+- `solve_turn`: urutan turn user (1 = pesan user pertama) dari konfirmasi 'beres'
+  pertama, NaN bila tidak ada. Konfirmasi hanya dihitung SETELAH balasan pertama
+  model, jadi prompt pembuka yang kebetulan cocok OK_PAT tidak pernah 'beres' di
+  turn 1. Regresi: ["Can you look at this bug?", "sure", "still broken", "try x"]
+  dulu solve_turn=1, tts=1 ("look" memuat "ok"); kini solve_turn=2, tts=3 (OK_PAT
+  tanpa batas kata juga cocok di "broken" — itu definisi proxy notebook);
+- `tts`: TTS eksak = jumlah pesan sampai dan termasuk konfirmasi pertama (unit sama
+  dengan kolom `turn`); tanpa konfirmasi = panjang percakapan.
+`solve_curve` = proporsi percakapan per model yang sudah 'beres' pada turn user ≤ k.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from llm_analytics.derive import OK_PAT, _OK_LOWER, non_capturing
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    HAS_ARROW = True
+except Exception:
+    HAS_ARROW = False
+
+# Panjang default kurva solve (turn user)
+CURVE_MAX_TURN = 10
+TURN_COLUMNS = ["row", "pos", "turn_idx", "is_user", "ok"]
+CURVE_COLUMNS = ["model", "turn", "n", "solved", "rate"]
+
+
+def _starts(keys: np.ndarray) -> np.ndarray:
+    """True pada elemen pertama setiap grup (keys terurut)."""
+    return np.r_[True, keys[1:] != keys[:-1]] if len(keys) else np.zeros(0, dtype=bool)
+
+
+def _ends(keys: np.ndarray) -> np.ndarray:
+    """True pada elemen terakhir setiap grup (keys terurut)."""
+    return np.r_[keys[1:] != keys[:-1], True] if len(keys) else np.zeros(0, dtype=bool)
+
+
+def _group_cumsum(keys: np.ndarray, flags: np.ndarray) -> np.ndarray:
+    """Jumlah kumulatif `flags` yang diulang dari nol di awal setiap grup (keys terurut)."""
+    cum = np.cumsum(flags)
+    starts = _starts(keys)
+    return cum - (cum - flags)[starts][np.cumsum(starts) - 1]
+
+
+def ok_matches(text: pd.Series) -> np.ndarray:
+    """OK_PAT per teks (bool); RE2 lewat Arrow, fallback regex Python atas teks lowercase."""
+    text = text.fillna("").astype(str)
+    if HAS_ARROW:
+        try:
+            arr = pa.array(text.to_numpy(dtype=object), type=pa.string())
+            hit = pc.match_substring_regex(arr, non_capturing(OK_PAT.pattern), ignore_case=True)
+            return hit.fill_null(False).to_numpy(zero_copy_only=False)
+        except (pa.ArrowException, TypeError):
+            pass
+    return text.str.lower().str.contains(_OK_LOWER, regex=True).to_numpy()
+
+
+def turn_table(msgs: pd.DataFrame) -> pd.DataFrame:
+    """Tabel pesan → (row, pos, turn_idx, is_user, ok); OK_PAT hanya pada pesan user.
+
+    `turn_idx` = jumlah pesan user sampai pesan ini dalam percakapannya (pesan
+    assistant mewarisi turn user sebelumnya).
+    """
+    rows = msgs["row"].to_numpy()
+    user = (msgs["role"] == "user").to_numpy()
+    ok = np.zeros(len(rows), dtype=bool)
+    ok[user] = ok_matches(msgs["content"][user])
+    return pd.DataFrame({
+        "row": rows,
+        "pos": msgs["pos"].to_numpy(),
+        "turn_idx": _group_cumsum(rows, user).astype(np.int32),
+        "is_user": user,
+        "ok": ok,
+    })
+
+
+@dataclass(frozen=True)
+class TurnMetrics:
+    """Metrik per percakapan (array panjang n, sejajar baris sumber)."""
+
+    n_messages: np.ndarray
+    n_user: np.ndarray
+    solved: np.ndarray
+    solve_turn: np.ndarray
+    tts: np.ndarray
+
+
+def turn_metrics(turns: pd.DataFrame, n: int) -> TurnMetrics:
+    """Reduksi per percakapan dari `turn_table` (baris terurut row, pos)."""
+    rows = turns["row"].to_numpy()
+    user = turns["is_user"].to_numpy()
+    ok = turns["ok"].to_numpy()
+    n_messages = np.bincount(rows, minlength=n)
+
+    # solved: status OK pesan user terakhir per percakapan
+    u_rows = rows[user]
+    last = _ends(u_rows)
+    solved = np.zeros(n, dtype=bool)
+    solved[u_rows[last]] = ok[user][last]
+
+    # Konfirmasi pertama per percakapan (hanya setelah ada balasan model) → turn user & posisinya
+    confirm = ok & (_group_cumsum(rows, ~user) > 0)
+    o_rows = rows[confirm]
+    first = _starts(o_rows)
+    solve_turn = np.full(n, np.nan)
+    solve_turn[o_rows[first]] = turns["turn_idx"].to_numpy()[confirm][first]
+    tts = n_messages.astype(np.float64)
+    tts[o_rows[first]] = turns["pos"].to_numpy()[confirm][first] + 1
+    return TurnMetrics(
+        n_messages=n_messages,
+        n_user=np.bincount(u_rows, minlength=n),
+        solved=solved,
+        solve_turn=solve_turn,
+        tts=tts,
+    )
+
+
+def solve_curve(solve_turn, model: pd.Series, max_turn: int = CURVE_MAX_TURN) -> pd.DataFrame:
+    """Kurva solve per model: (model, turn 1..max_turn, n, solved ≤ turn, rate); satu bincount."""
+    cat = model if isinstance(model.dtype, pd.CategoricalDtype) else model.astype(str).astype("category")
+    codes = cat.cat.codes.to_numpy().astype(np.int64)
+    keep = codes >= 0
+    st = np.asarray(solve_turn, dtype=np.float64)[keep]
+    # Bin 1..max_turn = turn solve; bin max_turn+1 = belum/tidak solve dalam jendela
+    bins = np.where(np.isnan(st) | (st > max_turn), max_turn + 1, np.nan_to_num(st)).astype(np.int64)
+    width = max_turn + 2
+    m = len(cat.cat.categories)
+    counts = np.bincount(codes[keep] * width + bins, minlength=m * width).reshape(m, width)
+    n = counts.sum(axis=1)
+    has = np.flatnonzero(n > 0)
+    solved = counts[has, 1:max_turn + 1].cumsum(axis=1)
+    total = np.repeat(n[has], max_turn)
+    return pd.DataFrame({
+        "model": np.repeat(cat.cat.categories.astype(str).to_numpy(dtype=object)[has], max_turn),
+        "turn": np.tile(np.arange(1, max_turn + 1, dtype=np.int32), len(has)),
+        "n": total.astype(np.int64),
+        "solved": solved.ravel().astype(np.int64),
+        "rate": solved.ravel() / np.maximum(total, 1),
+    }, columns=CURVE_COLUMNS)
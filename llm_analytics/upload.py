@@ -0,0 +1,244 @@
+"""Ingestion berkas CSV unggahan: dibaca per chunk, divalidasi, dibatasi ukurannya.
+
+    frame, report = read_upload(fh, "usage", progress=lambda f, msg: bar.progress(f, msg))
+    report.rows, report.sample_fraction, report.invalid   # ringkasan untuk UI
+
+Setiap chunk (`chunk_rows` baris) melewati `ensure_*_schema` yang sama dengan
+jalur lokal, lalu chunk digabung dengan `union_categoricals` sehingga kolom
+kategori tetap categorical tanpa salinan string. Validasi:
+- header harus memuat kolom wajib per jenis (`REQUIRED_COLUMNS`), kolom lain
+  di luar skema diabaikan;
+- nilai yang tidak bisa diparse (tanggal/angka) dihitung per kolom di
+  `UploadReport.invalid` (nilainya menjadi NaN/NaT, seperti jalur lokal).
+
+Batas (`UploadLimits`): berkas di atas `max_bytes` ditolak (`ValueError`);
+bila perkiraan jumlah baris (dari ukuran berkas & chunk pertama) melebihi
+`max_rows`, baris diambil sampel Bernoulli acak berbiji tetap (deterministik per
+isi berkas) atau ditolak bila `oversize="reject"`. Hasil dengan sampel
+menandai `UploadReport.sample_fraction` < 1 agar UI bisa memberi peringatan.
+
+Modul ini tidak bergantung pada Streamlit. `UploadCache` menyimpan hasil parse
+per digest isi (`upload_digest`): rerun setelah unggah (slider, filter) tidak
+membaca berkas lagi, dan berkas yang ditolak tidak diparse ulang.
+"""
+from __future__ import annotations
+
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from llm_analytics.ingest import SCHEMAS
+
+CHUNK_ROWS = 100_000
+MAX_UPLOAD_BYTES = 200 << 20
+MAX_UPLOAD_ROWS = 2_000_000
+# Kolom minimal agar berkas dianggap jenis yang benar (sisanya diisi default skema)
+REQUIRED_COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "usage": ("model",),
+    "winrate": ("model",),
+    "ngrams": ("term", "freq"),
+    "battles": ("model_a", "model_b"),
+}
+# Kolom yang divalidasi: nilai tak kosong yang gagal diparse dihitung sebagai invalid
+_PARSED = ("datetime64[ns]", "float32", "float64", "Int8", "int64")
+
+ProgressFn = Callable[[float, str], None]
+
+
+@dataclass(frozen=True)
+class UploadLimits:
+    max_bytes: int = MAX_UPLOAD_BYTES
+    max_rows: int = MAX_UPLOAD_ROWS
+    oversize: str = "sample"     # "sample" | "reject" bila baris > max_rows
+    chunk_rows: int = CHUNK_ROWS
+
+
+@dataclass
+class UploadReport:
+    kind: str
+    bytes: int
+    rows_read: int = 0
+    rows: int = 0
+    chunks: int = 0
+    sample_fraction: float = 1.0
+    ignored_columns: List[str] = field(default_factory=list)
+    invalid: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def sampled(self) -> bool:
+        return self.sample_fraction < 1.0
+
+
+def upload_digest(data: bytes) -> str:
+    """Digest isi unggahan (kunci cache: isi yang sama → hasil parse yang sama)."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _concat(chunks: List[pd.DataFrame]) -> pd.DataFrame:
+    """Gabung chunk; kolom categorical disatukan kategorinya (tetap categorical)."""
+    if len(chunks) == 1:
+        return chunks[0]
+    out = {}
+    for col in chunks[0].columns:
+        parts = [c[col] for c in chunks]
+        if all(isinstance(p.dtype, pd.CategoricalDtype) for p in parts):
+            out[col] = pd.Series(union_categoricals([p.array for p in parts]), name=col)
+        else:
+            out[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(out)
+
+
+def _estimate_rows(fh: BinaryIO, size: int, probe: int = 1 << 16) -> float:
+    """Perkiraan jumlah baris data dari panjang rata-rata baris di awal berkas."""
+    head = fh.read(probe)
+    fh.seek(0)
+    lines = head.count(b"\n") + (0 if head.endswith(b"\n") else 1)
+    if len(head) >= size or lines <= 1:
+        return max(lines - 1, 0)
+    return size / (len(head) / lines) - 1
+
+
+def _count_invalid(present: Dict[str, np.ndarray], norm: pd.DataFrame, invalid: Dict[str, int]) -> None:
+    """Nilai yang ada di CSV (`present`) tetapi kosong setelah normalisasi = gagal diparse."""
+    for col, mask in present.items():
+        bad = int((mask & norm[col].isna().to_numpy()).sum())
+        if bad:
+            invalid[col] = invalid.get(col, 0) + bad
+
+
+def read_upload(
+    fh: BinaryIO,
+    kind: str,
+    limits: UploadLimits = UploadLimits(),
+    progress: Optional[ProgressFn] = None,
+    seed: int = 0,
+) -> Tuple[pd.DataFrame, UploadReport]:
+    """Parse CSV unggahan `kind` per chunk → (frame ternormalisasi, laporan). ValueError bila ditolak."""
+    columns, dtypes, normalize = SCHEMAS[kind]
+    fh.seek(0, io.SEEK_END)
+    size = fh.tell()
+    fh.seek(0)
+    report = UploadReport(kind=kind, bytes=size)
+    if size > limits.max_bytes:
+        raise ValueError(f"Berkas {size / 2**20:,.1f} MB melebihi batas {limits.max_bytes / 2**20:,.1f} MB.")
+    if size == 0:
+        return normalize(None), report
+
+    try:
+        header = pd.read_csv(fh, nrows=0).columns.astype(str).tolist()
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f"Berkas bukan CSV yang valid: {e}") from e
+    missing = [c for c in REQUIRED_COLUMNS.get(kind, ()) if c not in header]
+    if missing:
+        raise ValueError(f"Kolom wajib untuk {kind}.csv tidak ada: {', '.join(missing)} (kolom berkas: {', '.join(header[:10])}).")
+    usecols = [c for c in header if c in columns]
+    report.ignored_columns = [c for c in header if c not in columns]
+    # Kolom teks dibaca sebagai kategori/string per chunk; angka & tanggal lewat `normalize`
+    text_dtypes = {c: t for c, t in dtypes.items() if c in usecols and t in ("category", "string")}
+
+    fh.seek(0)
+    est_rows = _estimate_rows(fh, size)
+    if est_rows > limits.max_rows and limits.oversize == "reject":
+        raise ValueError(f"Berkas ±{est_rows:,.0f} baris melebihi batas {limits.max_rows:,} baris.")
+    # Sedikit di atas batas agar sampel jarang kurang; kelebihannya dipangkas acak di akhir
+    fraction = min(1.0, 1.05 * limits.max_rows / est_rows) if est_rows else 1.0
+    rng = np.random.default_rng([seed, size])
+    chunks: List[pd.DataFrame] = []
+    try:
+        reader = pd.read_csv(fh, usecols=usecols, dtype=text_dtypes, chunksize=limits.chunk_rows)
+        for raw in reader:
+            report.chunks += 1
+            report.rows_read += len(raw)
+            if fraction < 1.0:
+                raw = raw[rng.random(len(raw)) < fraction].reset_index(drop=True)
+            present = {c: raw[c].notna().to_numpy() for c in usecols if dtypes.get(c) in _PARSED}
+            norm = normalize(raw)
+            _count_invalid(present, norm, report.invalid)
+            chunks.append(norm)
+            if progress is not None:
+                progress(min(fh.tell() / size, 1.0), f"{report.rows_read:,} baris dibaca")
+    except (pd.errors.ParserError, UnicodeDecodeError) as e:
+        raise ValueError(f"Gagal mem-parse baris sekitar {report.rows_read:,}: {e}") from e
+
+    frame = _concat(chunks) if chunks else normalize(None)
+    if len(frame) > limits.max_rows:
+        if limits.oversize == "reject":
+            raise ValueError(f"Berkas {report.rows_read:,} baris melebihi batas {limits.max_rows:,} baris.")
+        keep = np.sort(rng.choice(len(frame), size=limits.max_rows, replace=False))
+        frame = frame.take(keep).reset_index(drop=True)
+    report.rows = len(frame)
+    report.sample_fraction = report.rows / report.rows_read if report.rows_read else 1.0
+    if progress is not None:
+        progress(1.0, f"{report.rows:,} baris siap")
+    return frame, report
+
+
+@dataclass
+class ParsedUpload:
+    frame: Optional[pd.DataFrame]
+    report: Optional[UploadReport]
+    error: Optional[str] = None
+
+
+class UploadCache:
+    """Hasil `read_upload` per digest isi, dibagi antar rerun & sesi (LRU kecil, aman antar thread).
+
+    Frame usage cukup diambil sekali (`take`) untuk dibangun menjadi frame bersama;
+    setelah itu hanya laporannya yang disimpan.
+    """
+
+    def __init__(self, max_entries: int = 16) -> None:
+        self.max_entries = max_entries
+        self._items: "OrderedDict[str, ParsedUpload]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[ParsedUpload]:
+        with self._lock:
+            item = self._items.get(key)
+            if item is not None:
+                self._items.move_to_end(key)
+            return item
+
+    def parse(
+        self,
+        key: str,
+        fh: BinaryIO,
+        kind: str,
+        limits: UploadLimits = UploadLimits(),
+        progress: Optional[ProgressFn] = None,
+    ) -> ParsedUpload:
+        """Parse sekali per `key`; berkas yang ditolak disimpan sebagai `error` (tidak diparse ulang)."""
+        item = self.get(key)
+        if item is not None:
+            return item
+        try:
+            item = ParsedUpload(*read_upload(fh, kind, limits, progress))
+        except ValueError as e:
+            item = ParsedUpload(None, None, str(e))
+        with self._lock:
+            self._items[key] = item
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+        return item
+
+    def frame(self, key: str, fh: BinaryIO, kind: str, limits: UploadLimits = UploadLimits()) -> Optional[pd.DataFrame]:
+        """Salinan dangkal frame (aman ditambah kolom); parse ulang bila sudah diambil `take`."""
+        item = self.parse(key, fh, kind, limits)
+        if item.frame is None and item.error is None:
+            item.frame = read_upload(fh, kind, limits)[0]
+        return None if item.frame is None else item.frame.copy(deep=False)
+
+    def take(self, key: str, fh: BinaryIO, kind: str, limits: UploadLimits = UploadLimits()) -> Optional[pd.DataFrame]:
+        """Ambil frame lalu lepaskan dari cache (dipakai sekali untuk membangun frame bersama)."""
+        frame = self.frame(key, fh, kind, limits)
+        item = self.get(key)
+        if item is not None:
+            item.frame = None
+        return frame
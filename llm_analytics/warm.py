@@ -0,0 +1,70 @@
+"""Pemanasan latar belakang: pekerjaan berat dimulai lebih awal, diambil saat dibutuhkan.
+
+    w = Warmer()
+    w.submit(("ngram_index", version), build)       # mulai di thread latar belakang
+    ...
+    index = w.get(("ngram_index", version), build)  # tunggu hasil yang sama / hitung langsung
+
+Dashboard menyerahkan artefak yang belum dibutuhkan untuk tampilan awal (indeks
+n-gram, tabel duel, impor plotly) ke `Warmer` setelah shell & KPI terkirim;
+loader ter-cache memanggil `get` dengan nama yang sama sehingga pekerjaan tidak
+pernah dihitung dua kali. Setiap nama hanya dijalankan sekali per proses.
+Kegagalan di latar belakang tidak dilempar ke thread pemanggil: `get` menghitung
+ulang di thread itu sendiri (pesan galat asli muncul di sana).
+
+Fungsi yang diserahkan tidak boleh memanggil API Streamlit (thread latar
+belakang tidak punya konteks skrip) — oper objek seperti `ArtifactCache` langsung.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Set
+
+logger = logging.getLogger("llm_analytics.warm")
+
+# Hasil pemanasan yang belum diambil disimpan paling banyak sejumlah ini (terlama dibuang)
+MAX_PENDING = 8
+
+
+class Warmer:
+    """Antrean pemanasan satu-per-nama di atas thread pool kecil (default satu worker)."""
+
+    def __init__(self, max_workers: int = 1, enabled: bool = True) -> None:
+        self.enabled = enabled
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="warm") if enabled else None
+        self._pending: "OrderedDict[Hashable, Future]" = OrderedDict()
+        self._seen: Set[Hashable] = set()
+        self._lock = threading.Lock()
+
+    def submit(self, name: Hashable, fn: Callable[[], Any]) -> None:
+        """Jalankan `fn` di latar belakang bila `name` belum pernah diserahkan."""
+        if not self.enabled:
+            return
+        with self._lock:
+            if name in self._seen:
+                return
+            self._seen.add(name)
+            self._pending[name] = self._pool.submit(fn)
+            while len(self._pending) > MAX_PENDING:
+                self._pending.popitem(last=False)
+
+    def get(self, name: Hashable, fn: Callable[[], Any]) -> Any:
+        """Hasil pemanasan `name` (menunggu bila masih berjalan); tanpa pemanasan = `fn()` langsung."""
+        with self._lock:
+            future = self._pending.pop(name, None)
+        if future is not None:
+            try:
+                return future.result()
+            except Exception:
+                logger.warning("Pemanasan %r gagal; dihitung ulang", name, exc_info=True)
+        return fn()
+
+    def status(self) -> Dict[str, str]:
+        """Status hasil yang belum diambil: nama → "running" / "done" / "failed"."""
+        with self._lock:
+            items = list(self._pending.items())
+        state = lambda f: "running" if not f.done() else ("failed" if f.exception() else "done")
+        return {str(name): state(f) for name, f in items}
@@ -0,0 +1,301 @@
+"""Mesin win-rate atas baris duel (pairwise battles).
+
+Duel (model_a, model_b, winner) diagregasi sekali per versi dataset menjadi
+kunci (date, topic, triple) dengan `count`, di mana triple = (kode model_a,
+kode model_b, hasil). Semua statistik untuk filter tanggal/topik dihitung dari
+vektor count per triple (`np.bincount` atas kunci terpilih):
+- Wilson CI: `stats.wilson_interval` (tervektorisasi) atas wins/apps per model,
+- bootstrap: resampling duel = multinomial atas triple (setara resampling baris),
+  diproses per blok replikasi sebagai matriks,
+- Bradley–Terry/Elo: iterasi MM tertumpuk atas matriks menang (..., K, K).
+
+Semantik wins/apps mengikuti notebook: seri menambah apps tetapi bukan wins.
+Untuk Bradley–Terry seri dihitung setengah menang bagi kedua sisi.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Callable, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from llm_analytics.filters import FilterIndex, build_filter_index
+from llm_analytics.ingest import ensure_battles_schema
+from llm_analytics.stats import wilson_interval
+
+OUTCOMES = ("model_a", "model_b", "tie")
+KEY_COLUMNS = ["date", "topic"]
+# Batas elemen matriks per blok bootstrap (replikasi × triple / K²)
+BOOT_BLOCK_ELEMS = 4_000_000
+ELO_SCALE = 400.0
+ELO_BASE = 1000.0
+
+
+def battles_from_raw(df: pd.DataFrame, normalize: Optional[Callable[[str], str]] = None) -> pd.DataFrame:
+    """Tabel duel (model_a, model_b, winner[, date, topic]) dari data mentah arena.
+
+    Mendukung skema percakapan (`winner` = model_a/model_b/tie…, atau `winner_model`
+    = nama pemenang) dan skema pairwise (flag `winner_model_a/b`, `winner_tie`).
+    """
+    a = df["model_a"].astype(str)
+    b = df["model_b"].astype(str)
+    if "winner" in df.columns:
+        w = df["winner"].astype(str).str.strip().str.lower().to_numpy()
+        outcome = np.where(w == "model_a", 0, np.where(w == "model_b", 1, 2))
+    elif {"winner_model_a", "winner_model_b"}.issubset(df.columns):
+        flag = lambda c: pd.to_numeric(df[c], errors="coerce").fillna(0).to_numpy() == 1  # noqa: E731
+        tie = flag("winner_tie") if "winner_tie" in df.columns else np.zeros(len(df), dtype=bool)
+        outcome = np.where(flag("winner_model_a") & ~tie, 0, np.where(flag("winner_model_b") & ~tie, 1, 2))
+    elif "winner_model" in df.columns:
+        wm = df["winner_model"].astype(str).to_numpy()
+        outcome = np.where(wm == a.to_numpy(), 0, np.where(wm == b.to_numpy(), 1, 2))
+    else:
+        raise ValueError("Kolom pemenang tidak ditemukan (winner / winner_model / winner_model_a,b).")
+    out = pd.DataFrame({
+        "model_a": a.astype("category"),
+        "model_b": b.astype("category"),
+        "winner": pd.Categorical.from_codes(outcome, categories=list(OUTCOMES)),
+    })
+    if normalize is not None:
+        for c in ("model_a", "model_b"):
+            # Nama unik saja; kategori hasil normalisasi boleh bergabung
+            mapped = pd.Index(out[c].cat.categories).map(normalize).to_numpy(dtype=object)
+            out[c] = pd.Categorical(mapped[out[c].cat.codes.to_numpy()])
+    for c in ("date", "topic"):
+        if c in df.columns:
+            out[c] = df[c].to_numpy()
+    return out
+
+
+def elo_scale(strength: np.ndarray, scale: float = ELO_SCALE, base: float = ELO_BASE) -> np.ndarray:
+    """Kekuatan Bradley–Terry → skala Elo (rata-rata geometrik 1 → `base`)."""
+    with np.errstate(divide="ignore"):
+        return base + scale*np.log10(strength)
+
+
+def bradley_terry(
+    wins: np.ndarray,
+    prior: float = 1.0,
+    max_iter: int = 500,
+    tol: float = 1e-8,
+) -> np.ndarray:
+    """Kekuatan Bradley–Terry dari matriks menang (..., K, K) lewat iterasi MM tertumpuk.
+
+    `wins[..., i, j]` = kemenangan i atas j (seri = 0.5 untuk keduanya). `prior` =
+    duel seri semu per pasangan yang pernah bertemu agar model tanpa kalah/menang
+    tetap berhingga. Model tanpa duel → NaN. Dinormalisasi: rata-rata geometrik 1.
+    """
+    w = np.array(wins, dtype="float64")
+    k = w.shape[-1]
+    w[..., np.arange(k), np.arange(k)] = 0.0
+    n = w + np.swapaxes(w, -1, -2)
+    if prior:
+        w = w + 0.5*prior*(n > 0)
+        n = w + np.swapaxes(w, -1, -2)
+    total = w.sum(axis=-1)
+    played = n.sum(axis=-1) > 0
+    count = np.maximum(played.sum(axis=-1, keepdims=True), 1)
+    p = np.ones(w.shape[:-1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(max_iter):
+            denom = (n / (p[..., :, None] + p[..., None, :])).sum(axis=-1)
+            new = np.where(played & (denom > 0), total/denom, 1.0)
+            log = np.where(played & (new > 0), np.log(new), 0.0)
+            new = np.where(played, new/np.exp(log.sum(axis=-1, keepdims=True)/count), 1.0)
+            done = np.nanmax(np.abs(new - p)) < tol if new.size else True
+            p = new
+            if done:
+                break
+    return np.where(played, p, np.nan)
+
+
+@dataclass
+class BattleTable:
+    """Duel teragregasi: baris `keys` (date, topic, count) → `pair` (id triple)."""
+
+    models: np.ndarray          # kode → nama model
+    keys: pd.DataFrame          # date, topic, count
+    pair: np.ndarray            # id triple per baris kunci
+    triples: np.ndarray         # (T, 3): kode model_a, kode model_b, hasil (0=a, 1=b, 2=seri)
+    index: Optional[FilterIndex] = field(default=None, repr=False)
+
+    @property
+    def empty(self) -> bool:
+        return self.keys.empty or int(self.keys["count"].sum()) == 0
+
+    def select(
+        self,
+        start: Optional[pd.Timestamp] = None,
+        end: Optional[pd.Timestamp] = None,
+        topics: Optional[Sequence[str]] = None,
+    ) -> np.ndarray:
+        """Posisi baris kunci yang lolos filter tanggal [start, end] & topik."""
+        if self.index is None:
+            self.index = build_filter_index(self.keys["date"], self.keys["topic"])
+        return self.index.select(start, end, topics)
+
+    def counts(self, rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Jumlah duel per triple atas baris kunci `rows` (None = semua)."""
+        sel = slice(None) if rows is None else rows
+        return np.bincount(
+            self.pair[sel], weights=self.keys["count"].to_numpy()[sel], minlength=len(self.triples)
+        ).astype(np.int64)
+
+    # ---- blok bangunan atas count per triple ----
+    def _incidence(self, tri: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Matriks (T, k) kontribusi triple ke wins dan apps per model."""
+        win = np.zeros((len(tri), k))
+        app = np.zeros((len(tri), k))
+        t = np.arange(len(tri))
+        np.add.at(app, (t, tri[:, 0]), 1.0)
+        np.add.at(app, (t, tri[:, 1]), 1.0)
+        win[t[tri[:, 2] == 0], tri[tri[:, 2] == 0, 0]] = 1.0
+        win[t[tri[:, 2] == 1], tri[tri[:, 2] == 1, 1]] = 1.0
+        return win, app
+
+    def _pair_cells(self, tri: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Sel datar (i*k + j) dan bobot menang per triple; seri → dua sel bobot 0.5."""
+        a, b, o = tri[:, 0], tri[:, 1], tri[:, 2]
+        first = np.where(o == 1, b*k + a, a*k + b)
+        second = b*k + a
+        cells = np.concatenate([first, second])
+        weight = np.concatenate([np.where(o == 2, 0.5, 1.0), np.where(o == 2, 0.5, 0.0)])
+        return cells, weight
+
+    def _compact(self, counts: np.ndarray):
+        """Triple ber-count > 0 dengan kode model dipadatkan ke model yang muncul."""
+        live = np.flatnonzero(counts)
+        tri = self.triples[live]
+        present, codes = np.unique(tri[:, :2], return_inverse=True)
+        tri = np.column_stack([codes.reshape(-1, 2), tri[:, 2]])
+        return counts[live], tri, present
+
+    def win_matrix(self, rows: Optional[np.ndarray] = None) -> pd.DataFrame:
+        """Matriks menang (baris menang atas kolom; seri = 0.5) atas model yang muncul."""
+        c, tri, present = self._compact(self.counts(rows))
+        k = len(present)
+        cells, weight = self._pair_cells(tri, k)
+        m = np.bincount(cells, weights=np.tile(c, 2)*weight, minlength=k*k).reshape(k, k)
+        names = self.models[present]
+        return pd.DataFrame(m, index=names, columns=names)
+
+    def tally(self, rows: Optional[np.ndarray] = None, z: float = 1.96) -> pd.DataFrame:
+        """Per model: wins, apps, win_rate, wr_lo, wr_hi (Wilson) atas baris kunci `rows`."""
+        c = self.counts(rows)
+        a, b, o = self.triples[:, 0], self.triples[:, 1], self.triples[:, 2]
+        k = len(self.models)
+        wins = np.bincount(a, c*(o == 0), k) + np.bincount(b, c*(o == 1), k)
+        apps = np.bincount(a, c, k) + np.bincount(b, c, k)
+        keep = np.flatnonzero(apps)
+        p, lo, hi = wilson_interval(wins[keep], apps[keep], z)
+        return pd.DataFrame({
+            "model": self.models[keep],
+            "wins": wins[keep],
+            "apps": apps[keep],
+            "win_rate": p,
+            "wr_lo": lo,
+            "wr_hi": hi,
+        })
+
+    def elo(self, rows: Optional[np.ndarray] = None, prior: float = 1.0) -> pd.DataFrame:
+        """Rating Elo (Bradley–Terry) per model atas baris kunci `rows`."""
+        m = self.win_matrix(rows)
+        return pd.DataFrame({"model": m.index.to_numpy(), "elo": elo_scale(bradley_terry(m.to_numpy(), prior))})
+
+    def bootstrap(
+        self,
+        rows: Optional[np.ndarray] = None,
+        n_boot: int = 1000,
+        alpha: float = 0.05,
+        seed: int = 0,
+        elo: bool = False,
+        prior: float = 1.0,
+    ) -> pd.DataFrame:
+        """Interval persentil bootstrap win-rate (boot_lo, boot_hi) dan opsional Elo (elo_lo, elo_hi).
+
+        Resampling duel dengan pengembalian = multinomial(n duel, proporsi triple),
+        dihitung per blok replikasi sebagai perkalian matriks (tanpa loop per duel).
+        """
+        c, tri, present = self._compact(self.counts(rows))
+        k = len(present)
+        total = int(c.sum())
+        rng = np.random.default_rng(seed)
+        win_inc, app_inc = self._incidence(tri, k)
+        if elo:
+            cells, weight = self._pair_cells(tri, k)
+        per_rep = max(len(tri), k*k if elo else 0, 1)
+        block = max(1, min(n_boot, BOOT_BLOCK_ELEMS // per_rep))
+        rates, ratings = [], []
+        for done in range(0, n_boot if total else 0, block):
+            reps = min(block, n_boot - done)
+            draw = rng.multinomial(total, c/total, size=reps).astype("float64")
+            with np.errstate(divide="ignore", invalid="ignore"):
+                rates.append((draw @ win_inc) / (draw @ app_inc))
+            if elo:
+                flat = (np.arange(reps)[:, None]*k*k + np.tile(cells, (reps, 1))).ravel()
+                m = np.bincount(flat, weights=(np.tile(draw, 2)*weight).ravel(), minlength=reps*k*k)
+                ratings.append(elo_scale(bradley_terry(m.reshape(reps, k, k), prior)))
+        out = pd.DataFrame({"model": self.models[present]})
+        q = [100*alpha/2, 100*(1 - alpha/2)]
+        if rates:
+            out["boot_lo"], out["boot_hi"] = np.nanpercentile(np.vstack(rates), q, axis=0)
+        else:
+            out["boot_lo"] = out["boot_hi"] = np.nan
+        if elo:
+            if ratings:
+                out["elo_lo"], out["elo_hi"] = np.nanpercentile(np.vstack(ratings), q, axis=0)
+            else:
+                out["elo_lo"] = out["elo_hi"] = np.nan
+        return out
+
+    def leaderboard(
+        self,
+        rows: Optional[np.ndarray] = None,
+        z: float = 1.96,
+        n_boot: int = 0,
+        seed: int = 0,
+        prior: float = 1.0,
+    ) -> pd.DataFrame:
+        """`tally` + kolom `elo` (+ interval bootstrap bila `n_boot` > 0), urut win_rate turun."""
+        out = self.tally(rows, z).merge(self.elo(rows, prior), on="model", how="left")
+        if n_boot:
+            out = out.merge(self.bootstrap(rows, n_boot, seed=seed, elo=True, prior=prior), on="model", how="left")
+        return out.sort_values("win_rate", ascending=False, kind="stable").reset_index(drop=True)
+
+
+def build_battle_table(battles: pd.DataFrame, normalize: Optional[Callable[[str], str]] = None) -> BattleTable:
+    """Agregasikan tabel duel (lihat `battles_from_raw` / battles.csv) per (date, topic, triple).
+
+    `normalize` memetakan nama model mentah → nama tampilan (dihitung atas nama unik).
+    """
+    battles = ensure_battles_schema(battles.copy())
+    names = pd.Index(battles["model_a"].cat.categories).union(pd.Index(battles["model_b"].cat.categories))
+    titles = names.map(normalize) if normalize is not None else names
+    title_codes, models = pd.factorize(np.asarray(titles, dtype=object), sort=True)
+    k = max(len(models), 1)
+
+    def codes(col: str) -> np.ndarray:
+        own = names.get_indexer(battles[col].cat.categories)
+        return title_codes[own][battles[col].cat.codes.to_numpy()]
+
+    outcome = battles["winner"].cat.set_categories(list(OUTCOMES)).cat.codes.to_numpy()
+    outcome = np.where(outcome < 0, 2, outcome)
+    triple_key = (codes("model_a").astype(np.int64)*k + codes("model_b"))*3 + outcome
+    frame = pd.DataFrame({
+        "date": battles["date"].dt.normalize(),
+        "topic": battles["topic"].astype("category"),
+        "triple": triple_key,
+    })
+    keys = frame.groupby(KEY_COLUMNS + ["triple"], observed=True, dropna=False, sort=True).size().rename("count").reset_index()
+    pair, uniq = pd.factorize(keys.pop("triple").to_numpy())
+    uniq = np.asarray(uniq, dtype=np.int64)
+    triples = np.column_stack([uniq // 3 // k, uniq // 3 % k, uniq % 3]).astype(np.int64)
+    keys["count"] = keys["count"].astype(np.int64)
+    return BattleTable(
+        models=np.asarray(models, dtype=object),
+        keys=keys,
+        pair=pair.astype(np.int64),
+        triples=triples.reshape(-1, 3),
+        index=build_filter_index(keys["date"], keys["topic"]),
+    )
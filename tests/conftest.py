@@ -0,0 +1,19 @@
+"""Fixture bersama: data sintetis deterministik kecil (lihat `llm_analytics.synthetic`)."""
+from __future__ import annotations
+
+import sys
+from dataclasses import replace
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from llm_analytics.synthetic import SyntheticConfig  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def cfg() -> SyntheticConfig:
+    return replace(SyntheticConfig(), rows=4_000, days=60, models=8, vocab=400)
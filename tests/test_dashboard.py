@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+import shutil
+from dataclasses import replace
+
+import pytest
+
+pytest.importorskip("plotly")
+AppTest = pytest.importorskip("streamlit.testing.v1").AppTest
+
+from conftest import ROOT  # noqa: E402
+from llm_analytics.synthetic import write_dataset  # noqa: E402
+
+VIEW_COUNT = 6
+
+
+@pytest.fixture(scope="module")
+def app_path(tmp_path_factory, cfg):
+    # Salinan dashboard.py di samping folder data/ sintetis (APP_DIR/data), bukan data lokal repo
+    app_dir = tmp_path_factory.mktemp("app")
+    shutil.copy(ROOT / "dashboard.py", app_dir / "dashboard.py")
+    write_dataset(replace(cfg, days=45), app_dir / "data")
+    return app_dir / "dashboard.py"
+
+
+@pytest.fixture
+def app(app_path, monkeypatch):
+    monkeypatch.setenv("LLM_ANALYTICS_WARM", "0")
+    at = AppTest.from_file(str(app_path), default_timeout=300)
+    at.run()
+    assert not at.exception, [e.value for e in at.exception]
+    return at
+
+
+def test_lazy_mode_renders_every_view(app):
+    views = app.radio(key="active_view").options
+    assert len(views) == VIEW_COUNT
+    with_charts = 0
+    for view in views:
+        app.radio(key="active_view").set_value(view)
+        app.run()
+        assert not app.exception, (view, [e.value for e in app.exception])
+        assert not app.error, (view, [e.value for e in app.error])
+        with_charts += bool(app.get("plotly_chart"))
+    # Semua tampilan kecuali Kesimpulan berisi chart
+    assert with_charts == VIEW_COUNT - 1
+
+
+def test_eager_mode_renders_all_tabs(app):
+    next(t for t in app.sidebar.toggle if t.label.startswith("Hitung hanya")).set_value(False)
+    app.run()
+    assert not app.exception, [e.value for e in app.exception]
+    assert len(app.tabs) == VIEW_COUNT
+    assert len(app.get("plotly_chart")) >= VIEW_COUNT
@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+from dataclasses import replace
+from datetime import date
+
+import pandas as pd
+import pytest
+
+pytest.importorskip("pyarrow")
+
+from llm_analytics import export  # noqa: E402
+from llm_analytics.export import export_dataset  # noqa: E402
+from llm_analytics.fit import ROUTING_FILE, load_routing, main as fit_main  # noqa: E402
+from llm_analytics.ingest import read_table  # noqa: E402
+from llm_analytics.models import add_model_title  # noqa: E402
+from llm_analytics.query import Query, QueryEngine  # noqa: E402
+from llm_analytics.synthetic import generate_conversations  # noqa: E402
+
+TODAY = date(2025, 6, 30)
+
+
+def _arena(tmp_path, cfg, n, models):
+    path = tmp_path / "arena.parquet"
+    generate_conversations(replace(cfg, models=models), n).to_parquet(path, index=False)
+    return path
+
+
+def test_export_many_models(tmp_path, cfg):
+    # 40 model × 90 hari per batch jauh di atas batas partisi bawaan pyarrow (1024)
+    src = _arena(tmp_path, cfg, 20_000, models=40)
+    out = tmp_path / "out"
+    res = export_dataset(src, out, n_jobs=1, today=TODAY)
+    assert res.battles == 20_000
+    assert res.usage_rows == 40_000
+    assert res.models > 12
+    assert not (out / "usage.parquet.tmp").exists() and not (out / "battles.parquet.tmp").exists()
+    usage = read_table(out / "usage.csv", kind="usage")
+    assert len(usage) == res.usage_rows
+    assert usage["model"].nunique() == res.models
+
+
+def test_export_failure_leaves_no_partial_output(tmp_path, cfg, monkeypatch):
+    src = _arena(tmp_path, cfg, 500, models=4)
+    out = tmp_path / "out"
+    calls = []
+
+    def boom(*args, **kwargs):
+        calls.append(1)
+        if len(calls) > 1:
+            raise RuntimeError("gagal")
+        return real(*args, **kwargs)
+
+    real = export.process_batch
+    monkeypatch.setattr(export, "process_batch", boom)
+    with pytest.raises(RuntimeError):
+        export_dataset(src, out, n_jobs=1, batch_rows=100, today=TODAY)
+    assert sorted(p.name for p in out.iterdir()) == []
+
+
+
+def test_export_writes_unfiltered_routing(tmp_path, cfg):
+    src = _arena(tmp_path, cfg, 3_000, models=4)
+    out = tmp_path / "out"
+    res = export_dataset(src, out, n_jobs=1, today=TODAY)
+    assert res.routing == out / ROUTING_FILE
+    expected = QueryEngine.from_dir(out).select(Query()).routing()
+    assert not expected.empty
+    pd.testing.assert_frame_equal(load_routing(res.routing), expected.reset_index(drop=True), check_categorical=False)
+
+    # Entry point CLI menulis tabel yang sama ke path stabil
+    (out / ROUTING_FILE).unlink()
+    assert fit_main(["--data-dir", str(out)]) == 0
+    pd.testing.assert_frame_equal(load_routing(out / ROUTING_FILE), expected.reset_index(drop=True), check_categorical=False)
+
+
+def test_export_roundtrip_query_engine(tmp_path, cfg):
+    src = _arena(tmp_path, cfg, 1_000, models=5)
+    out = tmp_path / "out"
+    res = export_dataset(src, out, n_jobs=1, today=TODAY)
+    engine = QueryEngine.from_dir(out)
+    got = engine.query(Query(), ["kpis", "popularity", "winrate"])
+    assert got["kpis"]["total"] == res.usage_rows
+    assert got["kpis"]["models"] == res.models
+    assert int(got["popularity"]["count"].sum()) == res.usage_rows
+    battles = read_table(out / "battles.csv", kind="battles")
+    assert len(battles) == res.battles
+    assert int(got["winrate"]["apps"].sum()) == 2 * res.battles
+    # apps per model dari battles.parquet = apps winrate.csv (wins di sana = is_solved, semantik notebook)
+    exported = add_model_title(read_table(out / "winrate.csv", kind="winrate"))
+    wr = got["winrate"].set_index("model")
+    assert wr["apps"].to_dict() == exported.set_index(exported["model_title"].astype(str))["apps"].to_dict()
+    usage = add_model_title(read_table(out / "usage.csv", kind="usage"))
+    assert dict(zip(got["popularity"]["model"].astype(str), got["popularity"]["count"])) == (
+        usage["model_title"].astype(str).value_counts().to_dict()
+    )
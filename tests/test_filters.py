@@ -0,0 +1,57 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from llm_analytics.filters import build_filter_index
+
+TOPICS = ["Coding", "Math", "Writing", "Other"]
+
+
+def _frame(sort: bool, n: int = 2_000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2025-01-01") + pd.to_timedelta(rng.integers(0, 60, n), unit="D")
+    df = pd.DataFrame({"date": dates, "topic": rng.choice(TOPICS, n)})
+    df.loc[rng.random(n) < 0.05, "date"] = pd.NaT
+    return df.sort_values("date", kind="stable", na_position="last", ignore_index=True) if sort else df
+
+
+def _expected(df: pd.DataFrame, start, end, topics) -> np.ndarray:
+    mask = pd.Series(True, index=df.index)
+    if start is not None and end is not None:
+        mask &= (df["date"] >= start) & (df["date"] <= end)
+    if topics:
+        mask &= df["topic"].isin(topics)
+    return np.flatnonzero(mask.to_numpy())
+
+
+CASES = [
+    (None, None, None),
+    (pd.Timestamp("2025-01-10"), pd.Timestamp("2025-02-05"), None),
+    (None, None, ["Math", "Other"]),
+    (pd.Timestamp("2025-01-10"), pd.Timestamp("2025-01-10"), ["Coding"]),
+    (pd.Timestamp("2025-01-20"), pd.Timestamp("2025-02-10"), ["Writing", "Tidak Ada"]),
+    (pd.Timestamp("2024-01-01"), pd.Timestamp("2024-12-31"), None),
+    (pd.Timestamp("2025-02-01"), pd.Timestamp("2025-01-01"), None),
+    (None, None, ["Tidak Ada"]),
+]
+
+
+@pytest.mark.parametrize("sort", [True, False], ids=["sorted", "unsorted"])
+@pytest.mark.parametrize("start,end,topics", CASES)
+def test_select_matches_boolean_mask(sort, start, end, topics):
+    df = _frame(sort)
+    index = build_filter_index(df["date"], df["topic"])
+    assert (index.order is None) == sort
+    got = index.select(start, end, topics)
+    np.testing.assert_array_equal(got, _expected(df, start, end, topics))
+    assert np.all(np.diff(got) > 0)
+
+
+def test_nat_rows_only_without_date_filter():
+    df = _frame(sort=False)
+    index = build_filter_index(df["date"], df["topic"])
+    nat = set(np.flatnonzero(df["date"].isna().to_numpy()))
+    assert nat <= set(index.select())
+    assert not nat & set(index.select(df["date"].min(), df["date"].max()))
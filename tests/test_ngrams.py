@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from llm_analytics.ingest import ensure_usage_schema
+from llm_analytics.ngram_index import build_ngram_index
+from llm_analytics.ngrams import count_ngrams
+from llm_analytics.synthetic import generate_usage
+
+ALL = 10 ** 6
+
+
+@pytest.fixture(scope="module")
+def usage(cfg) -> pd.DataFrame:
+    return ensure_usage_schema(generate_usage(cfg))
+
+
+def _freqs(top: pd.DataFrame) -> dict:
+    return dict(zip(top["term"], top["freq"]))
+
+
+def test_index_top_matches_count_ngrams_on_filtered_subset(usage):
+    index = build_ngram_index(usage, min_count=1, capacity=None)
+    day = usage["date"].dt.normalize()
+    lo, hi = day.min() + pd.Timedelta(days=10), day.max() - pd.Timedelta(days=10)
+    topics = sorted(usage["topic"].astype(str).unique())[:3]
+    models = sorted(usage["model"].astype(str).unique())[:5]
+    rows = index.select(lo, hi, topics, models)
+    mask = (day >= lo) & (day <= hi) & usage["topic"].astype(str).isin(topics) & usage["model"].astype(str).isin(models)
+    assert 0 < mask.sum() < len(usage)
+
+    expected = count_ngrams(usage["user_text"][mask], capacity=None)
+    pd.testing.assert_frame_equal(index.top(rows, k=20), expected.top(20))
+    assert _freqs(index.top(rows, k=ALL)) == _freqs(expected.top(ALL))
+
+
+def test_index_min_count_drops_rare_terms(usage):
+    exact = _freqs(count_ngrams(usage["user_text"], capacity=None).top(ALL))
+    index = build_ngram_index(usage, capacity=None)
+    assert _freqs(index.top(k=ALL)) == {t: f for t, f in exact.items() if f >= 2}
+
+
+@pytest.mark.parametrize("compact_rows", [2_000_000, 50])
+def test_index_pruning_is_bounded_lower_bound(usage, compact_rows):
+    # Kapasitas kecil: kosakata = kunci yang disimpan counter berkapasitas sama (≤ capacity per orde),
+    # dan frekuensi indeks berada di antara count counter (Misra–Gries) dan count eksak.
+    capacity, chunk_docs = 200, 200
+    counter = count_ngrams(usage["user_text"], capacity=capacity, chunk_docs=chunk_docs)
+    assert counter.error > 0
+    index = build_ngram_index(usage, min_count=1, capacity=capacity, chunk_docs=chunk_docs, compact_rows=compact_rows)
+    assert np.bincount(index.order).max() <= capacity
+
+    got = _freqs(index.top(k=ALL))
+    kept = _freqs(counter.top(ALL))
+    exact = _freqs(count_ngrams(usage["user_text"], capacity=None).top(ALL))
+    assert set(got) == set(kept)
+    assert all(kept[t] <= got[t] <= exact[t] for t in got)
+    # Term teratas jauh di atas galat pemangkasan tetap eksak
+    pd.testing.assert_frame_equal(index.top(k=10), count_ngrams(usage["user_text"], capacity=None).top(10))
@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from llm_analytics.ingest import ensure_usage_schema
+from llm_analytics.models import add_model_title
+from llm_analytics.query import Query, QueryEngine
+from llm_analytics.synthetic import generate_usage
+
+TOP_N = 5
+
+
+@pytest.fixture(scope="module")
+def usage(cfg) -> pd.DataFrame:
+    df = add_model_title(ensure_usage_schema(generate_usage(cfg)))
+    # Beberapa label solved kosong, seperti data nyata
+    df.loc[df.index % 17 == 0, "is_solved"] = pd.NA
+    return df
+
+
+@pytest.fixture(scope="module")
+def engine(usage) -> QueryEngine:
+    return QueryEngine.from_usage(usage.drop(columns="model_title"))
+
+
+def _filtered(usage: pd.DataFrame, q: Query) -> pd.DataFrame:
+    """Filter baseline dashboard lama atas baris mentah; kolom model = model_title."""
+    day = usage["date"].dt.normalize()
+    mask = pd.Series(True, index=usage.index)
+    if q.start is not None:
+        mask &= (day >= pd.Timestamp(q.start)) & (day <= pd.Timestamp(q.end))
+    if q.topics is not None:
+        mask &= usage["topic"].astype(str).isin(q.topics)
+    if q.models is not None:
+        mask &= usage["model_title"].astype(str).isin(q.models)
+    out = usage[mask].assign(model=lambda d: d["model_title"].astype(str), topic=lambda d: d["topic"].astype(str))
+    return out.assign(is_solved=out["is_solved"].astype("float64"))
+
+
+def _queries(usage: pd.DataFrame):
+    day = usage["date"].dt.normalize()
+    lo, hi = day.min() + pd.Timedelta(days=7), day.max() - pd.Timedelta(days=7)
+    topics = tuple(sorted(usage["topic"].astype(str).unique())[:3])
+    models = tuple(sorted(usage["model_title"].astype(str).unique())[:4])
+    return [
+        Query(top_n=TOP_N),
+        Query(start=lo, end=hi, top_n=TOP_N),
+        Query(start=lo, end=hi, topics=topics, top_n=TOP_N),
+        Query(topics=topics, models=models, top_n=TOP_N),
+    ]
+
+
+@pytest.fixture(scope="module", params=range(4), ids=["all", "dates", "dates+topics", "topics+models"])
+def case(request, usage, engine):
+    q = _queries(usage)[request.param]
+    return q, _filtered(usage, q), engine.query(q, ["kpis", "popularity", "tts", "fit"])
+
+
+def test_kpis_match_raw_rows(case):
+    _, raw, got = case
+    kpis = got["kpis"]
+    assert kpis["total"] == len(raw)
+    assert kpis["models"] == raw["model"].nunique()
+    assert kpis["solved_rate"] == pytest.approx(raw["is_solved"].mean())
+    assert kpis["median_tts"] == pytest.approx(raw["tts"].median())
+
+
+def test_popularity_matches_groupby(case):
+    q, raw, got = case
+    expected = raw.groupby("model").size().sort_values(ascending=False)
+    pop = got["popularity"]
+    assert len(pop) == min(q.top_n, len(expected))
+    assert all(expected[m] == c for m, c in zip(pop["model"].astype(str), pop["count"]))
+    assert pop["count"].tolist() == expected.head(q.top_n).tolist()
+
+
+def test_tts_quantiles_match_series_quantile(case):
+    _, raw, got = case
+    expected = raw.groupby("model")["tts"].agg(
+        median="median", p75=lambda s: s.quantile(0.75), p90=lambda s: s.quantile(0.9),
+    )
+    tts = got["tts"].set_index(got["tts"]["model"].astype(str))
+    assert len(tts)
+    for col in ("median", "p75", "p90"):
+        np.testing.assert_allclose(tts[col].to_numpy(), expected.loc[tts.index, col].to_numpy())
+    assert tts["median"].is_monotonic_increasing
+
+
+def test_fit_heatmap_matches_pivot(case):
+    q, raw, got = case
+    top = raw.groupby("model").size().sort_values(ascending=False).head(q.top_n).index
+    work = raw[raw["model"].isin(top)]
+    expected = (
+        work.groupby(["topic", "model"])["is_solved"].mean().reset_index()
+        .pivot(index="topic", columns="model", values="is_solved")
+        .reindex(index=sorted(work["topic"].unique()))
+    )
+    heat = got["fit"]
+    heat = heat.set_axis(heat.columns.astype(str), axis=1).set_axis(heat.index.astype(str), axis=0)
+    assert sorted(heat.columns) == sorted(top)
+    pd.testing.assert_frame_equal(
+        heat[sorted(heat.columns)], expected[sorted(heat.columns)], check_names=False, check_dtype=False,
+    )
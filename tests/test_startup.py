@@ -0,0 +1,16 @@
+from __future__ import annotations
+
+from llm_analytics.bench import DASHBOARD_IMPORTS, DEFERRED_IMPORTS, IMPORT_BUDGET_S, _fresh_time
+
+STARTUP_STMT = f"import {', '.join(DASHBOARD_IMPORTS)}"
+
+
+def test_dashboard_imports_defer_plotly():
+    _, eager = _fresh_time(STARTUP_STMT, watch=DEFERRED_IMPORTS)
+    assert "plotly.express" not in eager
+
+
+def test_dashboard_imports_within_budget():
+    # Terbaik dari 3 interpreter baru, sama seperti `best_s` di bench (meredam noise CI)
+    best = min(_fresh_time(STARTUP_STMT)[0] for _ in range(3))
+    assert best <= IMPORT_BUDGET_S, f"impor jalur start dashboard {best:.3f} s > anggaran {IMPORT_BUDGET_S} s"
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from llm_analytics.derive import OK_PAT, flatten_conversations
+from llm_analytics.turns import solve_curve, turn_metrics, turn_table
+
+PHRASES = ["Can you look at this bug?", "sure", "still broken", "try x", "thanks, that works", "nope",
+           "Terima kasih!", "what about y", "", "OKE sip", "explain again"]
+
+
+def _conv(*texts, first="user"):
+    roles = ["user", "assistant"] if first == "user" else ["assistant", "user"]
+    return [{"role": roles[i % 2], "content": t} for i, t in enumerate(texts)]
+
+
+def _reference(conv):
+    """Definisi per percakapan dengan loop Python: (solved, solve_turn, tts)."""
+    msgs = conv if isinstance(conv, list) else []
+    users = [m for m in msgs if m["role"] == "user"]
+    solved = bool(users) and bool(OK_PAT.search(users[-1]["content"] or ""))
+    seen_reply, turn = False, 0
+    for pos, m in enumerate(msgs):
+        if m["role"] != "user":
+            seen_reply = True
+            continue
+        turn += 1
+        if seen_reply and OK_PAT.search(m["content"] or ""):
+            return solved, float(turn), float(pos + 1)
+    return solved, np.nan, float(len(msgs))
+
+
+def _metrics(convs):
+    msgs = flatten_conversations(pd.Series(convs, dtype=object))
+    return turn_metrics(turn_table(msgs), len(convs))
+
+
+def test_opening_prompt_is_not_a_confirmation():
+    # Regresi: "look" memuat "ok"; konfirmasi hanya dihitung setelah balasan pertama model
+    m = _metrics([_conv("Can you look at this bug?", "sure", "still broken", "try x")])
+    assert m.solve_turn[0] == 2 and m.tts[0] == 3
+    m = _metrics([_conv("ok", "hello"), _conv("hi", "hello", first="assistant")])
+    assert np.isnan(m.solve_turn[0]) and m.tts[0] == 2 and m.solved[0]
+    assert np.isnan(m.solve_turn[1]) and not m.solved[1]
+
+
+def test_metrics_match_reference_loop():
+    rng = np.random.default_rng(0)
+    convs = [
+        _conv(*rng.choice(PHRASES, rng.integers(1, 9)), first=rng.choice(["user", "assistant"]))
+        for _ in range(400)
+    ] + [[], None, _conv("thanks", "you're welcome", "thanks again")]
+    m = _metrics(convs)
+    ref = [_reference(c) for c in convs]
+    np.testing.assert_array_equal(m.solved, [r[0] for r in ref])
+    np.testing.assert_array_equal(m.solve_turn, [r[1] for r in ref])
+    np.testing.assert_array_equal(m.tts, [r[2] for r in ref])
+    np.testing.assert_array_equal(m.n_messages, [len(c) if c else 0 for c in convs])
+    assert np.isfinite(m.solve_turn).sum() > 50
+
+
+@pytest.mark.parametrize("max_turn", [1, 3])
+def test_solve_curve_is_cumulative_share(max_turn):
+    solve_turn = np.array([1, 2, np.nan, 3, 1, np.nan, 5])
+    model = pd.Series(["a", "a", "a", "b", "b", "b", "b"])
+    curve = solve_curve(solve_turn, model, max_turn=max_turn)
+    assert len(curve) == 2 * max_turn
+    for (name, k), row in curve.set_index(["model", "turn"]).iterrows():
+        st = solve_turn[(model == name).to_numpy()]
+        assert row["n"] == len(st)
+        assert row["solved"] == int((st <= k).sum())
+        assert row["rate"] == pytest.approx((st <= k).mean())
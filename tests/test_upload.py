@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import io
+
+import pandas as pd
+import pytest
+
+from llm_analytics.ingest import ensure_usage_schema
+from llm_analytics.synthetic import generate_usage
+from llm_analytics.upload import UploadCache, UploadLimits, read_upload, upload_digest
+
+
+@pytest.fixture(scope="module")
+def usage_csv(cfg) -> bytes:
+    return generate_usage(cfg).to_csv(index=False).encode("utf-8")
+
+
+def _fh(data: bytes) -> io.BytesIO:
+    return io.BytesIO(data)
+
+
+def test_chunked_read_matches_whole_file(usage_csv):
+    frame, report = read_upload(_fh(usage_csv), "usage", UploadLimits(chunk_rows=512))
+    expected = ensure_usage_schema(pd.read_csv(_fh(usage_csv)))
+    assert report.chunks > 1 and report.rows == report.rows_read == len(expected)
+    assert not report.sampled and not report.invalid and not report.ignored_columns
+    assert isinstance(frame["model"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(frame[expected.columns], expected, check_categorical=False)
+
+
+def test_rejects_oversized_and_invalid_files(usage_csv):
+    with pytest.raises(ValueError, match="melebihi batas"):
+        read_upload(_fh(usage_csv), "usage", UploadLimits(max_bytes=1024))
+    with pytest.raises(ValueError, match="Kolom wajib"):
+        read_upload(_fh(b"date,tts\n2025-01-01,3\n"), "usage")
+    with pytest.raises(ValueError, match="baris"):
+        read_upload(_fh(usage_csv), "usage", UploadLimits(max_rows=1_000, oversize="reject"))
+    frame, report = read_upload(_fh(b""), "usage")
+    assert frame.empty and report.rows == 0
+
+
+def test_counts_unparseable_values_and_ignored_columns():
+    data = b"date,model,tts,extra\n2025-01-01,gpt-4,3,a\nbukan-tanggal,gpt-4,x,b\n2025-01-03,claude,,c\n"
+    frame, report = read_upload(_fh(data), "usage", UploadLimits(chunk_rows=1))
+    assert report.chunks == 3 and report.rows == 3
+    assert report.invalid == {"date": 1, "tts": 1}
+    assert report.ignored_columns == ["extra"]
+    assert frame["date"].isna().tolist() == [False, True, False]
+
+
+def test_oversize_sample_is_bounded_and_deterministic(usage_csv):
+    limits = UploadLimits(max_rows=1_000, chunk_rows=700)
+    a, rep = read_upload(_fh(usage_csv), "usage", limits)
+    b, _ = read_upload(_fh(usage_csv), "usage", limits)
+    assert rep.sampled and len(a) == rep.rows <= 1_000
+    assert rep.sample_fraction == pytest.approx(rep.rows / rep.rows_read)
+    pd.testing.assert_frame_equal(a, b)
+
+
+def test_upload_cache_parses_once_and_keeps_errors(usage_csv):
+    cache = UploadCache(max_entries=2)
+    key = upload_digest(usage_csv)
+    first = cache.parse(key, _fh(usage_csv), "usage")
+    # Hit: berkas tidak dibaca lagi (handle kosong pun tetap mengembalikan hasil yang sama)
+    assert cache.parse(key, _fh(b""), "usage") is first
+
+    bad = b"date\n2025-01-01\n"
+    err = cache.parse(upload_digest(bad), _fh(bad), "usage")
+    assert err.frame is None and "Kolom wajib" in err.error
+    assert cache.frame(upload_digest(bad), _fh(bad), "usage") is None
+
+    taken = cache.take(key, _fh(usage_csv), "usage")
+    assert len(taken) == first.report.rows and cache.get(key).frame is None
+    # Setelah `take`, `frame` mem-parse ulang dari handle
+    assert len(cache.frame(key, _fh(usage_csv), "usage")) == len(taken)
+
+    cache.parse("lain", _fh(usage_csv), "usage")
+    assert cache.get(upload_digest(bad)) is None  # LRU: entri terlama dibuang
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import math
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from llm_analytics.stats import wilson_interval
+from llm_analytics.winrate import OUTCOMES, battles_from_raw, bradley_terry, build_battle_table, elo_scale
+
+MODELS = ["alpha", "beta", "gamma", "delta"]
+STRENGTH = np.array([4.0, 2.0, 1.0, 0.5])
+
+
+def _wilson_scalar(wins: float, n: float, z: float = 1.96):
+    """Rumus skalar dashboard lama (referensi)."""
+    if n <= 0:
+        return np.nan, np.nan, np.nan
+    p = wins / n
+    denom = 1 + z**2/n
+    centre = p + z*z/(2*n)
+    adj = z * math.sqrt((p*(1-p) + z*z/(4*n))/n)
+    return p, max(0.0, (centre - adj)/denom), min(1.0, (centre + adj)/denom)
+
+
+def _battles(n: int = 6_000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    a = rng.integers(0, len(MODELS), n)
+    b = (a + rng.integers(1, len(MODELS), n)) % len(MODELS)
+    p_a = STRENGTH[a] / (STRENGTH[a] + STRENGTH[b])
+    u = rng.random(n)
+    winner = np.where(u < 0.1, "tie", np.where(u < 0.1 + 0.9*p_a, "model_a", "model_b"))
+    return pd.DataFrame({
+        "date": pd.Timestamp("2025-03-01") + pd.to_timedelta(rng.integers(0, 30, n), unit="D"),
+        "topic": rng.choice(["Coding", "Math", "Writing"], n),
+        "model_a": np.asarray(MODELS, dtype=object)[a],
+        "model_b": np.asarray(MODELS, dtype=object)[b],
+        "winner": winner,
+    })
+
+
+def _naive_tally(df: pd.DataFrame) -> pd.DataFrame:
+    wins = {m: 0 for m in MODELS}
+    apps = {m: 0 for m in MODELS}
+    for a, b, w in zip(df["model_a"], df["model_b"], df["winner"]):
+        apps[a] += 1
+        apps[b] += 1
+        if w == "model_a":
+            wins[a] += 1
+        elif w == "model_b":
+            wins[b] += 1
+    return pd.DataFrame({"wins": wins, "apps": apps})
+
+
+@pytest.fixture(scope="module")
+def battles() -> pd.DataFrame:
+    return _battles()
+
+
+def test_wilson_interval_matches_scalar_formula():
+    wins = np.array([0, 1, 5, 30, 99, 100, 0])
+    n = np.array([0, 1, 10, 40, 100, 100, 5])
+    p, lo, hi = wilson_interval(wins, n)
+    for i in range(len(n)):
+        np.testing.assert_allclose([p[i], lo[i], hi[i]], _wilson_scalar(wins[i], n[i]), equal_nan=True)
+
+
+@pytest.mark.parametrize("topics", [None, ["Math", "Writing"]])
+def test_tally_matches_row_loop(battles, topics):
+    table = build_battle_table(battles)
+    lo, hi = pd.Timestamp("2025-03-05"), pd.Timestamp("2025-03-20")
+    rows = table.select(lo, hi, topics)
+    sub = battles[(battles["date"] >= lo) & (battles["date"] <= hi)]
+    if topics:
+        sub = sub[sub["topic"].isin(topics)]
+    expected = _naive_tally(sub)
+    got = table.tally(rows).set_index("model")
+    assert got[["wins", "apps"]].to_dict() == expected.loc[got.index].to_dict()
+    for m, r in got.iterrows():
+        np.testing.assert_allclose([r["win_rate"], r["wr_lo"], r["wr_hi"]], _wilson_scalar(r["wins"], r["apps"]))
+
+
+def test_battles_from_raw_schemas_agree(battles):
+    base = battles_from_raw(battles)
+    by_name = battles.assign(
+        winner_model=np.where(battles["winner"] == "model_a", battles["model_a"],
+                              np.where(battles["winner"] == "model_b", battles["model_b"], "")),
+    ).drop(columns="winner")
+    flags = battles.assign(
+        winner_model_a=(battles["winner"] == "model_a").astype(int),
+        winner_model_b=(battles["winner"] == "model_b").astype(int),
+        winner_tie=(battles["winner"] == "tie").astype(int),
+    ).drop(columns="winner")
+    for other in (by_name, flags):
+        assert battles_from_raw(other)["winner"].tolist() == base["winner"].tolist()
+    assert list(base["winner"].cat.categories) == list(OUTCOMES)
+    with pytest.raises(ValueError):
+        battles_from_raw(battles.drop(columns="winner"))
+
+
+def test_bradley_terry_two_models_closed_form():
+    # Tanpa prior: p0/p1 = wins0/wins1; dinormalisasi ke rata-rata geometrik 1
+    p = bradley_terry(np.array([[0.0, 30.0], [10.0, 0.0]]), prior=0)
+    assert p[0] / p[1] == pytest.approx(3.0, rel=1e-6)
+    assert np.prod(p) == pytest.approx(1.0)
+    elo = elo_scale(p)
+    assert elo.mean() == pytest.approx(1000.0)
+    assert elo[0] - elo[1] == pytest.approx(400*math.log10(3), rel=1e-6)
+
+
+def test_bradley_terry_recovers_strengths_and_fixed_point(battles):
+    # Seri acak (½ menang untuk keduanya) menarik kekuatan ke tengah; pakai duel yang berpemenang
+    table = build_battle_table(battles[battles["winner"] != "tie"])
+    m = table.win_matrix()
+    assert list(m.index) == sorted(MODELS)
+    w = m.to_numpy()
+    p = bradley_terry(w, prior=0, tol=1e-12)
+    n = w + w.T
+    # Persamaan MLE: kemenangan (seri = ½) = ekspektasi model per baris
+    np.testing.assert_allclose((n * p[:, None] / (p[:, None] + p[None, :])).sum(axis=1), w.sum(axis=1), rtol=1e-6)
+    truth = pd.Series(STRENGTH, index=MODELS).loc[m.index].to_numpy()
+    truth = truth / np.exp(np.log(truth).mean())
+    np.testing.assert_allclose(np.log(p), np.log(truth), atol=0.15)
+
+
+def test_bradley_terry_stacked_and_unplayed():
+    rng = np.random.default_rng(1)
+    stack = rng.integers(0, 20, size=(3, 4, 4)).astype(float)
+    stack[2, 3, :] = stack[2, :, 3] = 0  # model 3 tidak pernah bertanding di matriks ketiga
+    batched = bradley_terry(stack)
+    for i in range(len(stack)):
+        np.testing.assert_allclose(batched[i], bradley_terry(stack[i]), rtol=1e-6, equal_nan=True)
+    assert np.isnan(batched[2, 3]) and np.isfinite(batched[2, :3]).all()
+
+
+def test_leaderboard_with_bootstrap_is_deterministic(battles):
+    table = build_battle_table(battles)
+    a = table.leaderboard(n_boot=200, seed=3)
+    b = table.leaderboard(n_boot=200, seed=3)
+    pd.testing.assert_frame_equal(a, b)
+    assert a["win_rate"].is_monotonic_decreasing
+    assert list(a["model"]) == ["alpha", "beta", "gamma", "delta"]
+    assert (a["boot_lo"] <= a["win_rate"]).all() and (a["win_rate"] <= a["boot_hi"]).all()
+    assert (a["elo_lo"] <= a["elo"]).all() and (a["elo"] <= a["elo_hi"]).all()